@@ -0,0 +1,210 @@
+# adaptive_threshold.py  – per‑paddle noise floor tracking and automatic hit thresholds
+import time
+
+class P2Quantile:
+    """Streaming estimate of one quantile in O(1) time and memory (Jain & Chlamtac P²)."""
+    def __init__(self, p):
+        self.p      = p
+        self.count  = 0
+        self._first = []                      # first five samples, until markers exist
+        self._q     = None                    # marker heights
+        self._n     = [0, 1, 2, 3, 4]         # marker positions
+        self._np    = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._dn    = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        self.count += 1
+        if self._q is None:
+            self._first.append(x)
+            if len(self._first) == 5:
+                self._q = sorted(self._first)
+            return
+
+        q, n, np_ = self._q, self._n, self._np
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            np_[i] += self._dn[i]
+
+        # Nudge the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self):
+        if self._q is not None:
+            return self._q[2]
+        if not self._first:
+            return None
+        s = sorted(self._first)
+        return s[int(self.p * (len(s) - 1))]
+
+
+class Ewma:
+    """Exponentially weighted mean and variance."""
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.mean  = None
+        self.var   = 0.0
+        self.count = 0
+
+    def add(self, x):
+        self.count += 1
+        if self.mean is None:
+            self.mean = x
+            return
+        diff = x - self.mean
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+
+    @property
+    def std(self):
+        return self.var ** 0.5
+
+
+class AthleteHitStats:
+    """Online distribution of one athlete's hit peaks on one paddle."""
+    def __init__(self):
+        self.low    = P2Quantile(0.10)   # a weak-but-real kick for this athlete
+        self.median = P2Quantile(0.50)
+        self.ewma   = Ewma(0.1)
+
+    def add(self, peak):
+        self.low.add(peak)
+        self.median.add(peak)
+        self.ewma.add(peak)
+
+    @property
+    def count(self):
+        return self.low.count
+
+
+class AdaptiveThreshold:
+    """Works out hit and drill thresholds for one paddle from the data it sends.
+
+    Idle noise (reported with each heartbeat) sets a floor the hit threshold must
+    stay above; the current athlete's own hit distribution – reported hits plus
+    sub-threshold contact seen in heartbeats – pulls the thresholds down for
+    kids and up for adults.  The thresholds are plain attributes that are
+    only recomputed when a heartbeat or hit arrives, so per-tick readers pay nothing.
+    on_push(threshold) is called when the firmware's hit threshold should change.
+    """
+    def __init__(self, default_hit=220.0, default_drill=300.0, min_hit=40.0,
+                 noise_k=6.0, hit_fraction=0.5, drill_fraction=0.6,
+                 warmup=10, push_interval=5.0, on_push=None):
+        self.default_hit    = default_hit
+        self.default_drill  = default_drill
+        self.min_hit        = min_hit         # never trigger below this, whatever the data says
+        self.noise_k        = noise_k         # hit threshold ≥ noise mean + k·σ
+        self.hit_fraction   = hit_fraction    # hit threshold ≈ this × athlete's 10th percentile
+        self.drill_fraction = drill_fraction  # drill threshold ≈ this × athlete's median
+        self.warmup         = warmup          # samples needed before data overrides defaults
+        self.push_interval  = push_interval   # seconds between threshold pushes to the paddle
+        self.on_push        = on_push
+
+        self.hit   = default_hit
+        self.drill = default_drill
+        self.noise = Ewma(0.05)
+        self._athletes = {}
+        self._athlete  = None
+        self._pushed   = default_hit           # threshold the firmware is running with
+        self._last_push = float("-inf")   # so the first real change is pushed at once
+
+    # ---------- inputs ----------
+    @property
+    def athlete(self):
+        return self._athlete
+
+    @athlete.setter
+    def athlete(self, name):
+        self._athlete = name
+        self._recompute()
+
+    def observe_noise(self, idle_peak):
+        """Peak force seen while idle (outside hit windows) since the last heartbeat.
+
+        The firmware only reports hits above its threshold, so hit peaks alone
+        are censored from below and could only ever push the threshold up.  An
+        idle peak clearly above the noise floor but under the hit threshold is
+        contact the firmware didn't count – a kick too weak for the threshold
+        it is running with – so it goes into the athlete's hit distribution (one per
+        heartbeat, the strongest) instead of the noise estimate.  A peak at or
+        above that threshold was part of a hit the firmware reported (older
+        firmware counted a hit's first sample as idle) and is dropped.
+        """
+        if idle_peak >= self._pushed:
+            return
+        if self._floor() < idle_peak:
+            self.observe_hit(idle_peak)
+            return
+        self.noise.add(idle_peak)
+        self._recompute()
+
+    def observe_hit(self, peak):
+        """Peak force of a completed hit window."""
+        stats = self._athletes.get(self._athlete)
+        if stats is None:
+            stats = self._athletes[self._athlete] = AthleteHitStats()
+        stats.add(peak)
+        self._recompute()
+
+    def push_now(self):
+        """Send the current hit threshold to the paddle regardless of rate limits (on connect)."""
+        if self.on_push is not None:
+            self._last_push = time.monotonic()
+            self._pushed = self.hit
+            self.on_push(self.hit)
+
+    def stats(self, athlete=None):
+        return self._athletes.get(self._athlete if athlete is None else athlete)
+
+    def reset(self):
+        self.noise = Ewma(0.05)
+        self._athletes = {}
+        self.hit, self.drill = self.default_hit, self.default_drill
+
+    # ---------- derivation ----------
+    def _floor(self):
+        # Lowest allowed hit threshold: min_hit, or noise mean + k·σ once the noise is known
+        if self.noise.count >= self.warmup:
+            return max(self.min_hit, self.noise.mean + self.noise_k * self.noise.std)
+        return self.min_hit
+
+    def _recompute(self):
+        floor = self._floor()
+        hit, drill = self.default_hit, self.default_drill
+        stats = self._athletes.get(self._athlete)
+        if stats is not None and stats.count >= self.warmup:
+            hit = self.hit_fraction * stats.low.value
+            drill = self.drill_fraction * stats.median.value
+        hit = max(floor, hit)
+        self.hit = hit
+        self.drill = max(hit, drill)
+
+        # Push to the paddle only on a real change (>5 %) and at a limited rate
+        if self.on_push is not None and abs(hit - self._pushed) > 0.05 * self._pushed:
+            now = time.monotonic()
+            if now - self._last_push >= self.push_interval:
+                self._last_push = now
+                self._pushed = hit
+                self.on_push(hit)
@@ -0,0 +1,194 @@
+# app_log.py  – structured logging that keeps formatting and I/O off the BLE / UI threads
+#
+#   from app_log import get_logger
+#   log = get_logger("ble")
+#   log.debug("hit", extra={"device": name, "forces": forces})
+#
+# Call setup_logging() once at start-up (main.py does, driven by PADDLE_LOG_LEVEL and
+# PADDLE_LOG_JSON); until then only warnings reach stderr, as with plain logging.
+import atexit, json, logging, os, queue, sys, threading
+
+ROOT = "paddle"
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suppressed"}
+
+
+def get_logger(subsystem):
+    """Logger for one subsystem ("ble", "cmd", "link", "drill", "ui", ...)."""
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per subsystem: `rate` records/s with bursts of `burst`.
+
+    Dropped records are counted and the next record let through carries the
+    count as record.suppressed.  Runs on the caller's thread, so it sticks to a
+    couple of float operations and a dict lookup – no locks; concurrent threads
+    can at worst miscount a token.
+    """
+    def __init__(self, rate=20.0, burst=50):
+        super().__init__()
+        self.rate  = rate
+        self.burst = burst
+        self._buckets = {}   # logger name -> [tokens, last time, dropped]
+
+    def filter(self, record):
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = [self.burst, record.created, 0]
+        tokens = min(self.burst, bucket[0] + (record.created - bucket[1]) * self.rate)
+        bucket[1] = record.created
+        if tokens < 1.0:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return False
+        bucket[0] = tokens - 1.0
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class _EnqueueHandler(logging.Handler):
+    """Hands the raw record to the writer thread; no formatting on the caller's thread.
+
+    queue.SimpleQueue.put is a single C call with no Python-level lock, so a
+    bleak callback pays about a microsecond per record that passes its level.
+    Messages are formatted later, so arguments should be values, not objects
+    that change after the call.
+    """
+    def __init__(self, q):
+        super().__init__()
+        self.queue = q
+
+    def handle(self, record):
+        # Skip logging.Handler's per-handler lock; filters are lock-free
+        if self.filter(record):
+            self.queue.put(record)
+        return True
+
+    def emit(self, record):
+        self.queue.put(record)
+
+
+class ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text}  (+{suppressed} suppressed)" if suppressed else text
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, subsystem, message and any extra= fields."""
+    def format(self, record):
+        entry = {
+            "t":      round(record.created, 6),
+            "level":  record.levelname,
+            "sub":    record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name,
+            "msg":    record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD:
+                entry[key] = value
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LogWriter(threading.Thread):
+    """Background thread that drains the queue in batches and writes to the sinks.
+
+    Each sink (a StreamHandler) gets a batch as one string: one write() and one
+    flush per batch rather than per record, so a burst of hits costs one
+    write() to the terminal or file.
+    """
+    BATCH = 256
+
+    def __init__(self, q, handlers):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue    = q
+        self.handlers = handlers
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.BATCH:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            stop = None in batch
+            if stop:
+                batch = batch[:batch.index(None)]
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        for handler in self.handlers:
+            lines = []
+            for record in batch:
+                if record.levelno >= handler.level:
+                    try:
+                        lines.append(handler.format(record) + handler.terminator)
+                    except Exception:
+                        pass   # a broken record or sink must never take the app down
+            try:
+                if lines:
+                    handler.stream.write("".join(lines))
+                handler.flush()
+            except Exception:
+                pass
+
+    def stop(self):
+        self.queue.put(None)
+        self.join(timeout=2.0)
+
+
+_writer = None
+
+
+def setup_logging(level=None, json_path=None, console=True, rate=20.0, burst=50):
+    """Route every "paddle.*" logger through the queue to the console and/or a JSON-lines file.
+
+    level      minimum level (name or number); defaults to $PADDLE_LOG_LEVEL or INFO
+    json_path  JSON-lines sink, off unless given or $PADDLE_LOG_JSON is set
+    rate/burst per-subsystem rate limit, records per second
+    """
+    global _writer
+    if _writer is not None:
+        return _writer
+    level = level or os.environ.get("PADDLE_LOG_LEVEL", "INFO")
+    json_path = json_path or os.environ.get("PADDLE_LOG_JSON")
+
+    sinks = []
+    if console:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(ConsoleFormatter())
+        sinks.append(stream)
+    if json_path:
+        # Big buffer: the writer flushes once per batch anyway
+        sink = logging.StreamHandler(open(json_path, "a", buffering=1 << 16, encoding="utf-8"))
+        sink.setFormatter(JsonLinesFormatter())
+        sinks.append(sink)
+
+    q = queue.SimpleQueue()
+    enqueue = _EnqueueHandler(q)
+    enqueue.addFilter(RateLimitFilter(rate, burst))
+    root = logging.getLogger(ROOT)
+    root.setLevel(level)
+    root.addHandler(enqueue)
+    root.propagate = False
+
+    _writer = LogWriter(q, sinks)
+    _writer.start()
+    atexit.register(_writer.stop)
+    return _writer
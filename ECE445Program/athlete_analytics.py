@@ -0,0 +1,185 @@
+# athlete_analytics.py  – streaming per-athlete / per-kick statistics and in-session fatigue detection
+from collections import deque
+from adaptive_threshold import P2Quantile, Ewma
+
+
+class Welford:
+    """Running mean and variance (Welford), O(1) per value."""
+    __slots__ = ("count", "mean", "_m2", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean  = 0.0
+        self._m2   = 0.0
+        self.max   = None
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if self.max is None or x > self.max:
+            self.max = x
+
+    @property
+    def var(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return self.var ** 0.5
+
+
+class SlidingTrend:
+    """Least-squares line through the last `window` values, updated in O(1).
+
+    Keeps running sums of x, y, xy and x² over the window (x = the value's
+    index in the stream) and subtracts whatever falls out, so a new value
+    never rescans the window.  x is taken relative to the first value ever
+    added to keep the sums well conditioned.
+    """
+    def __init__(self, window=20):
+        self.window = window
+        self._values = deque()
+        self._next_x = 0
+        self._sx = self._sy = self._sxy = self._sxx = 0.0
+
+    def add(self, y):
+        x = self._next_x
+        self._next_x += 1
+        self._values.append(y)
+        self._sx += x
+        self._sy += y
+        self._sxy += x * y
+        self._sxx += x * x
+        if len(self._values) > self.window:
+            old_x = x - self.window
+            old_y = self._values.popleft()
+            self._sx -= old_x
+            self._sy -= old_y
+            self._sxy -= old_x * old_y
+            self._sxx -= old_x * old_x
+
+    def __len__(self):
+        return len(self._values)
+
+    def fit(self):
+        """(slope, fitted value at the oldest point, at the newest) or None with < 3 points."""
+        n = len(self._values)
+        if n < 3:
+            return None
+        denom = n * self._sxx - self._sx * self._sx
+        if denom == 0:
+            return None
+        slope = (n * self._sxy - self._sx * self._sy) / denom
+        intercept = (self._sy - slope * self._sx) / n
+        last_x = self._next_x - 1
+        first_x = last_x - n + 1
+        return slope, intercept + slope * first_x, intercept + slope * last_x
+
+    def change(self):
+        """Relative change of the fitted line across the window (−0.15 = dropped 15 %)."""
+        fit = self.fit()
+        if fit is None or fit[1] <= 0:
+            return None
+        return (fit[2] - fit[1]) / fit[1]
+
+
+class MetricStats:
+    """Everything tracked for one metric of one athlete (and kick type)."""
+    def __init__(self, window=20, alpha=0.2):
+        self.totals = Welford()
+        self.ewma   = Ewma(alpha)
+        self.median = P2Quantile(0.5)
+        self.p90    = P2Quantile(0.9)
+        self.trend  = SlidingTrend(window)
+
+    def add(self, x):
+        self.totals.add(x)
+        self.ewma.add(x)
+        self.median.add(x)
+        self.p90.add(x)
+        self.trend.add(x)
+
+    @property
+    def count(self):
+        return self.totals.count
+
+    def summary(self):
+        return {"n": self.totals.count, "mean": self.totals.mean, "std": self.totals.std,
+                "max": self.totals.max, "recent": self.ewma.mean, "median": self.median.value,
+                "p90": self.p90.value, "trend": self.trend.change()}
+
+
+ALL_KICKS = "*"
+
+
+class AthleteAnalytics:
+    """Live session statistics for every athlete, overall and per kick type.
+
+    Each kick updates its athlete's force and accuracy MetricStats for the kick
+    type and for ALL_KICKS, each in O(1): Welford totals, an EWMA of recent
+    kicks, P² median/90th percentile and a sliding least-squares trend over
+    the last `window` kicks.  fatigue() reads the force trend: once the window
+    is full, a fitted drop of at least `drop_alert` is reported.
+    """
+    def __init__(self, window=20, drop_alert=0.15):
+        self.window     = window
+        self.drop_alert = drop_alert
+        self._force     = {}   # (athlete, kick) -> MetricStats
+        self._accuracy  = {}
+        self._reaction  = {}   # athlete -> MetricStats of reaction times, ms
+
+    def _stats(self, table, key):
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = MetricStats(self.window)
+        return stats
+
+    def add_kick(self, athlete, event, kick=None):
+        """One finished kick (HitEvent); kick is its type if known."""
+        for k in (ALL_KICKS, kick) if kick else (ALL_KICKS,):
+            self._stats(self._force, (athlete, k)).add(event.max_force)
+            self._stats(self._accuracy, (athlete, k)).add(event.accuracy)
+
+    def add_reaction(self, athlete, rt_ms):
+        self._stats(self._reaction, athlete).add(rt_ms)
+
+    def athletes(self):
+        return sorted({a for a, _ in self._force} | set(self._reaction))
+
+    def kicks(self, athlete):
+        return sorted(k for a, k in self._force if a == athlete and k != ALL_KICKS)
+
+    def summary(self, athlete, kick=ALL_KICKS):
+        force = self._force.get((athlete, kick))
+        accuracy = self._accuracy.get((athlete, kick))
+        reaction = self._reaction.get(athlete)
+        return {"athlete": athlete, "kick": kick,
+                "force": force.summary() if force else None,
+                "accuracy": accuracy.summary() if accuracy else None,
+                "reaction_ms": reaction.summary() if reaction else None,
+                "fatigue": self.fatigue(athlete, kick)}
+
+    def fatigue(self, athlete, kick=ALL_KICKS):
+        """Fitted force change over the last `window` kicks if it dropped by drop_alert or more, else None."""
+        force = self._force.get((athlete, kick))
+        if force is None or len(force.trend) < self.window:
+            return None
+        change = force.trend.change()
+        return change if change is not None and change <= -self.drop_alert else None
+
+    def status_line(self, athlete):
+        """One-line live summary for the drill screens."""
+        force = self._force.get((athlete, ALL_KICKS))
+        if force is None or not force.count:
+            return ""
+        parts = [f"{athlete}: {force.count} kicks", f"avg {force.totals.mean:.0f} N",
+                 f"recent {force.ewma.mean:.0f} N"]
+        reaction = self._reaction.get(athlete)
+        if reaction is not None and reaction.count:
+            parts.append(f"reaction {reaction.median.value:.0f} ms")
+        drop = self.fatigue(athlete)
+        if drop is not None:
+            parts.append(f"⚠ power dropped {-drop:.0%} over the last {self.window} kicks")
+        return "  ·  ".join(parts)
@@ -0,0 +1,312 @@
+# bench.py  – benchmarks for the ingest-to-display pipeline, no hardware needed
+#
+#   python bench.py                                   # run everything, print a table
+#   python bench.py --only decode,drills              # just some benchmarks
+#   python bench.py --json bench.json                 # also write machine-readable results
+#   python bench.py --history bench_history.jsonl     # append this run to a history file
+#   python bench.py --save-baseline bench_baseline.json
+#   python bench.py --baseline bench_baseline.json    # compare; exit status 1 on a regression
+#   python bench.py --notifications session.txt       # decode recorded notifications (one per line)
+#
+# Inputs are synthetic (VirtualPaddle notifications, random hits) and seeded, so runs
+# are comparable.  The UI benchmarks need PySide6 and run offscreen; without it they are
+# reported as skipped.  Numbers are per machine: record a baseline on the machine that
+# compares against it.
+import argparse, json, os, platform, random, statistics, sys, time
+from bluetooth_handler import BluetoothHandler
+from combo_matcher import ComboMatcher, DEFAULT_COMBOS
+from drills import HitEvent, ReactionDrill, SpeedDrill, TargetDrill, ComboDrill, DrillDispatcher
+from hit_localisation import HitLocaliser, LEGACY_LAYOUT
+from kick_classifier import KickClassifier, extract_features
+from kick_sequence import KickAggregator
+from paddle_state import PaddleTable
+from virtual_paddle import VirtualPaddle
+
+BENCHMARKS = ("decode", "scoring", "drills", "ui")
+KICKS = ["Front Kick", "Roundhouse Kick", "Back Kick", "Front Hook Kick", "Back Hook kick", "Axe Kick", "Tornado Kick"]
+
+
+def _result(name, value, unit, better, **params):
+    return {"name": name, "value": value, "unit": unit, "better": better, "params": params}
+
+
+def _best_rate(fn, count, repeat=5):
+    """Items per second for the fastest of `repeat` runs of fn() processing `count` items."""
+    best = min(_timed(fn) for _ in range(repeat))
+    return count / best
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def _p99(values):
+    return sorted(values)[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+# ---------- synthetic inputs ----------
+def virtual_notifications(seconds=60.0, seed=1, num_sensors=2):
+    """[(time_ms, text)] from a virtual paddle kicked about once a second."""
+    rng = random.Random(seed)
+    vp = VirtualPaddle(num_sensors=num_sensors, seed=seed)
+    t = 500.0
+    while t < seconds * 1000:
+        vp.kick(int(t), rng.uniform(250, 1200), rng.uniform(6, 40))
+        t += rng.uniform(400, 1600)
+    return vp.run_until(int(seconds * 1000))
+
+
+def raw_stream_packets(count=2000, channels=2, batch=5, seed=1):
+    rng = random.Random(seed)
+    return [f"r={channels}:" + ",".join(str(rng.randrange(1500)) for _ in range(channels * batch))
+            for _ in range(count)]
+
+
+def random_hits(count, paddles, seed=1, start=0.0):
+    """HitEvents spread over `paddles`, a few hundred ms apart, with waveform features."""
+    rng = random.Random(seed)
+    t = start
+    hits = []
+    for i in range(count):
+        t += rng.uniform(0.05, 0.4)
+        forces = (rng.uniform(100, 900), rng.uniform(100, 900))
+        features = extract_features(forces, (rng.randint(3, 15), rng.randint(8, 40), rng.uniform(2, 20)))
+        hits.append(HitEvent(paddle=rng.randrange(paddles), hit_id=i + 1, t=t, forces=forces,
+                             max_force=max(forces), accuracy=rng.uniform(0, 100), features=features))
+    return hits
+
+
+def trained_classifier(seed=1):
+    rng = random.Random(seed)
+    clf = KickClassifier()
+    for k, kick in enumerate(KICKS):
+        for _ in range(5):
+            forces = (rng.uniform(200, 900), rng.uniform(200, 900))
+            clf.learn("Athlete 1", kick, extract_features(forces, (3 + k, 10 + 3 * k, 2.0 + k)))
+    return clf
+
+
+# ---------- benchmarks ----------
+def bench_decode(notifications=None):
+    """BluetoothHandler._notify_cb on hit/heartbeat notifications and raw-stream packets."""
+    if notifications is None:
+        notifications = [text for _, text in virtual_notifications()]
+    messages = [bytearray(text.encode()) for text in notifications]
+    repeats = max(1, 20000 // max(1, len(messages)))
+    messages = messages * repeats
+    handler = BluetoothHandler("bench")
+    cb = handler._notify_cb
+    def decode():
+        for m in messages:
+            cb(None, m)
+    stream = [bytearray(p.encode()) for p in raw_stream_packets()]
+    def decode_stream():
+        for m in stream:
+            cb(None, m)
+    return [
+        _result("decode", _best_rate(decode, len(messages)), "msg/s", "higher", messages=len(messages)),
+        _result("decode_stream", _best_rate(decode_stream, len(stream)), "msg/s", "higher",
+                messages=len(stream), batch=5),
+    ]
+
+
+def bench_scoring(paddles=8, count=20000):
+    """Per-hit scoring: localise a frame, extract features, classify the kick type."""
+    rng = random.Random(2)
+    localiser = HitLocaliser({i: LEGACY_LAYOUT for i in range(paddles)})
+    clf = trained_classifier()
+    frames = [{i: (rng.uniform(0, 900), rng.uniform(0, 900)) for i in range(paddles)}
+              for _ in range(count // paddles)]
+    waveform = (6, 20, 8.5)
+    def score():
+        for frame in frames:
+            for loc in localiser.localise_batch(frame).values():
+                clf.classify("Athlete 1", extract_features(loc.forces, waveform))
+    return [_result("scoring", _best_rate(score, len(frames) * paddles), "hit/s", "higher", paddles=paddles)]
+
+
+def bench_drills(paddles=8, count=20000):
+    """Kick merging plus every drill type on a dispatcher, fed in frame-sized batches."""
+    hits = random_hits(count, paddles, seed=3)
+    matcher = ComboMatcher(DEFAULT_COMBOS)
+    clf = trained_classifier()
+    classify = lambda e: clf.classify("Athlete 1", e.features)[0] if e.features is not None else None
+    threshold = lambda _paddle: 150.0
+    def run():
+        random.seed(4)
+        table = PaddleTable(paddles)
+        kicks = KickAggregator(table, 0.5)
+        dispatcher = DrillDispatcher(on_session_update=lambda s: s.snapshot())
+        sessions = []
+        for p in range(0, paddles, 2):
+            pair = [p, min(p + 1, paddles - 1)]
+            sessions.append(ReactionDrill([p], threshold, min_delay=0.0, max_delay=0.2))
+            sessions.append(SpeedDrill([pair[-1]], threshold, KICKS, time_limit=5.0,
+                                       kick_check=lambda expected, e: (True, expected)))
+            if pair[0] != pair[1]:
+                sessions.append(TargetDrill(pair, threshold, rounds=10 ** 6, min_delay=0.0, max_delay=0.1))
+        sessions.append(ComboDrill(range(paddles), threshold, matcher, classify=classify, prompted=False))
+        for s in sessions:
+            dispatcher.add(s)
+            s.start(0.0)
+        for i in range(0, len(hits), paddles):
+            frame = hits[i:i + paddles]
+            now = frame[-1].t
+            dispatcher.dispatch_frame(kicks.add_frame(frame) + kicks.tick(now))
+            dispatcher.tick(now)
+            for s in sessions:
+                if not s.active:
+                    s.start(now)
+    return [_result("drills", _best_rate(run, len(hits), repeat=3), "event/s", "higher", paddles=paddles)]
+
+
+def bench_ui(sizes=(2, 8, 32), ticks=300):
+    """MainWindow._update_readings (tick) and tick + repaint (frame) with N paddles, offscreen."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6 import QtWidgets
+        from main import MainWindow
+    except ImportError as e:
+        return [{"name": f"ui_{kind}_{n}p", "skipped": f"needs PySide6 ({e})"}
+                for n in sizes for kind in ("tick", "frame")]
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    results = []
+    for n in sizes:
+        handlers = [BluetoothHandler(f"ESP32_{i+1}") for i in range(n)]
+        window = MainWindow(paddles=handlers)
+        window.update_timer.stop()
+        for handler in handlers:
+            handler.is_connected = True
+        window.stack.setCurrentWidget(window.force_screen)
+        window.show()
+        app.processEvents()
+        feeds = [virtual_notifications(seconds=ticks / 100.0 + 1, seed=i + 1) for i in range(n)]
+        cursors = [0] * n
+        tick_ms, frame_ms = [], []
+        start = time.perf_counter()
+        for k in range(ticks):
+            # Real-time pacing: drills and kick merging run on perf_counter()
+            due = start + k * 0.01
+            while time.perf_counter() < due:
+                pass
+            until = k * 10
+            for i, feed in enumerate(feeds):
+                while cursors[i] < len(feed) and feed[cursors[i]][0] <= until:
+                    handlers[i]._notify_cb(None, bytearray(feed[cursors[i]][1].encode()))
+                    cursors[i] += 1
+            t0 = time.perf_counter()
+            window._update_readings()
+            t1 = time.perf_counter()
+            app.processEvents()
+            t2 = time.perf_counter()
+            tick_ms.append((t1 - t0) * 1000)
+            frame_ms.append((t2 - t0) * 1000)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+        for kind, values in (("tick", tick_ms), ("frame", frame_ms)):
+            results.append(_result(f"ui_{kind}_{n}p", statistics.mean(values), "ms", "lower",
+                                   paddles=n, ticks=ticks, p99_ms=_p99(values)))
+    return results
+
+
+# ---------- reports ----------
+def run(only=BENCHMARKS, notifications=None, ui_ticks=300):
+    results = []
+    for name in only:
+        if name == "decode":
+            results += bench_decode(notifications)
+        elif name == "scoring":
+            results += bench_scoring()
+        elif name == "drills":
+            results += bench_drills()
+        elif name == "ui":
+            results += bench_ui(ticks=ui_ticks)
+    return {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "machine": platform.node(), "platform": platform.platform(), "results": results}
+
+
+def compare(report, baseline, tolerance):
+    """Annotate each result with its change from the baseline; returns the names that regressed."""
+    base = {r["name"]: r for r in baseline.get("results", []) if "value" in r}
+    regressed = []
+    for r in report["results"]:
+        old = base.get(r["name"])
+        if "value" not in r or old is None or not old["value"]:
+            continue
+        change = (r["value"] - old["value"]) / old["value"]
+        r["baseline"] = old["value"]
+        r["change"] = change
+        if (change < -tolerance) if r["better"] == "higher" else (change > tolerance):
+            r["regressed"] = True
+            regressed.append(r["name"])
+    return regressed
+
+
+def print_table(report):
+    print(f"{'benchmark':26}{'value':>14}  {'unit':8}{'vs baseline':>12}")
+    for r in report["results"]:
+        if "skipped" in r:
+            print(f"{r['name']:26}{'skipped':>14}  {r['skipped']}")
+            continue
+        change = f"{r['change']:+.1%}" if "change" in r else ""
+        flag = "  REGRESSED" if r.get("regressed") else ""
+        print(f"{r['name']:26}{r['value']:>14.3f}  {r['unit']:8}{change:>12}{flag}")
+
+
+def add_report_args(ap):
+    """The --json/--history/--baseline/--tolerance/--save-baseline options finish_report() reads."""
+    ap.add_argument("--json", help="write the report to this file")
+    ap.add_argument("--history", help="append the report as one JSON line to this file")
+    ap.add_argument("--baseline", help="compare against this report")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--save-baseline", help="write the report here as the new baseline")
+
+
+def finish_report(report, args):
+    """Compare with the baseline, print the table and write the report files; returns the exit status."""
+    regressed = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressed = compare(report, json.load(f), args.tolerance)
+    print_table(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if regressed:
+        print(f"Regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ingest-to-display benchmarks")
+    ap.add_argument("--only", help="comma-separated subset of " + ",".join(BENCHMARKS))
+    ap.add_argument("--notifications", help="recorded notification texts, one per line, for the decode benchmark")
+    ap.add_argument("--ui-ticks", type=int, default=300, help="UI ticks (10 ms each) per paddle count")
+    add_report_args(ap)
+    args = ap.parse_args(argv)
+
+    only = args.only.split(",") if args.only else BENCHMARKS
+    unknown = set(only) - set(BENCHMARKS)
+    if unknown:
+        ap.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    notifications = None
+    if args.notifications:
+        with open(args.notifications, encoding="utf-8") as f:
+            notifications = [line.strip() for line in f if line.strip()]
+
+    report = run(only, notifications, args.ui_ticks)
+    return finish_report(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
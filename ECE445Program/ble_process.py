@@ -0,0 +1,560 @@
+# ble_process.py  – optional BLE ingest in a child process, shared with the GUI through shared‑memory rings
+#
+#   python main.py --ble-process      (or PADDLE_BLE_PROCESS=1)
+#
+# The child owns the bleak loops, decoding, link monitoring and reconnects.  Every
+# decoded hit/heartbeat goes into a per-paddle ShmRing, and the raw STREAM samples
+# into a per-paddle ShmSamples; the GUI's RemotePaddle objects read both in place,
+# so repaints and notification bursts no longer fight over one GIL.  Commands and
+# status (rare, small) use ordinary mp queues.
+import atexit, itertools, multiprocessing as mp, struct, threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from adaptive_threshold import AdaptiveThreshold
+from link_monitor import LinkHealth
+from paddle_profiles import PROFILES, apply_profile
+from sample_ring import SampleRing
+from app_log import get_logger
+
+log = get_logger("ingest")
+
+MAX_SENSORS    = 8
+KIND_HEARTBEAT = 0
+KIND_HIT       = 1
+
+
+class ShmRing:
+    """Single-producer ring of fixed-size hit/heartbeat records in shared memory.
+
+    A 64-byte header holds the number of records ever written (head); slot k
+    holds record number n where k = (n - 1) % capacity.  Each slot starts with
+    its record number: the writer zeroes it, writes the body, then stores the
+    number (a seqlock), so a reader that has been lapped sees a mismatch rather
+    than a torn record.  Readers keep their own position and never write.
+    """
+    HEADER      = struct.Struct("<QI")      # head, capacity
+    HEADER_SIZE = 64
+    STAMP       = struct.Struct("<Q")
+    # t, kind, sensors, time_since_last, time_since_hit, rise, duration, impulse,
+    # idle peak, firmware seq, hit count, forces[8]
+    BODY        = struct.Struct(f"<dBBxxiiiiffiI{MAX_SENSORS}f")
+    SLOT_SIZE   = 88
+
+    def __init__(self, shm, capacity, owner):
+        self.shm      = shm
+        self.capacity = capacity
+        self._owner   = owner
+        self._buf     = shm.buf
+        self._head    = self.HEADER.unpack_from(self._buf, 0)[0]
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, capacity=4096):
+        shm = shared_memory.SharedMemory(create=True, size=cls.HEADER_SIZE + capacity * cls.SLOT_SIZE)
+        cls.HEADER.pack_into(shm.buf, 0, 0, capacity)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        # The spawned child shares the parent's resource tracker, so the segment
+        # stays registered once and is unlinked only by the creator
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, cls.HEADER.unpack_from(shm.buf, 0)[1], owner=False)
+
+    # ---------- producer ----------
+    def write(self, kind, t, forces, time_since_last, time_since_hit, waveform, idle_peak, seq, hit_count):
+        n = self._head + 1
+        off = self.HEADER_SIZE + ((n - 1) % self.capacity) * self.SLOT_SIZE
+        buf = self._buf
+        rise, duration, impulse = waveform or (-1, -1, 0.0)
+        padded = (tuple(forces) + (0.0,) * MAX_SENSORS)[:MAX_SENSORS]
+        self.STAMP.pack_into(buf, off, 0)
+        self.BODY.pack_into(buf, off + 8, t, kind, min(len(forces), MAX_SENSORS),
+                            time_since_last or 0, time_since_hit or 0, rise, duration, impulse,
+                            idle_peak or 0.0, -1 if seq is None else seq, hit_count, *padded)
+        self.STAMP.pack_into(buf, off, n)
+        self._head = n
+        self.STAMP.pack_into(buf, 0, n)   # publish
+
+    # ---------- consumer ----------
+    def head(self):
+        return self.STAMP.unpack_from(self._buf, 0)[0]
+
+    def read(self, after):
+        """Records numbered after+1 .. head as BODY tuples: (records, new position, dropped)."""
+        head = self.head()
+        if head == after:
+            return (), after, 0
+        start = max(after, head - self.capacity)
+        dropped = start - after
+        out = []
+        buf, stamp, body, size = self._buf, self.STAMP, self.BODY, self.SLOT_SIZE
+        for n in range(start + 1, head + 1):
+            off = self.HEADER_SIZE + ((n - 1) % self.capacity) * size
+            if stamp.unpack_from(buf, off)[0] != n:
+                dropped += 1
+                continue
+            record = body.unpack_from(buf, off + 8)
+            if stamp.unpack_from(buf, off)[0] != n:
+                dropped += 1   # overwritten while we read it
+                continue
+            out.append(record)
+        return out, head, dropped
+
+    def close(self):
+        self._buf = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class ShmSampleRing(SampleRing):
+    """A SampleRing whose samples and count live in a ShmSamples segment.
+
+    Plots and history recorders read it like any SampleRing; the child's
+    handler writes it through the inherited extend(), which only publishes
+    count after a batch is stored.
+    """
+    COUNT = struct.Struct("<Q")
+
+    def __init__(self, shared, channels):
+        self.channels = channels
+        self.capacity = shared.capacity
+        self._buf     = shared.shm.buf
+        self._floats  = self._buf[shared.HEADER_SIZE:].cast('f')
+        cap = self.capacity
+        self.data     = [self._floats[c * cap:(c + 1) * cap] for c in range(channels)]
+        self._views   = self.data
+
+    @property
+    def count(self):
+        return self.COUNT.unpack_from(self._buf, 0)[0]
+
+    @count.setter
+    def count(self, n):
+        self.COUNT.pack_into(self._buf, 0, n)
+
+    def release(self):
+        for view in self.data:
+            view.release()
+        self._floats.release()
+        self.data = self._views = []
+
+
+class ShmSamples:
+    """One paddle's raw sample stream (firmware STREAM mode) in shared memory.
+
+    A 64-byte header holds the sample count, the channel count and a
+    generation number, followed by MAX_SENSORS channels of `capacity` float32
+    samples.  The producer calls start() whenever a stream with a new channel
+    count begins, which bumps the generation; current() on the consumer side
+    then hands out a new ShmSampleRing, so plots and recorders see a new ring
+    and restart, as they do when a local handler replaces its SampleRing.
+    """
+    HEADER      = struct.Struct("<QII")   # count, channels, generation
+    HEADER_SIZE = 64
+
+    def __init__(self, shm, capacity, owner):
+        self.shm      = shm
+        self.capacity = capacity
+        self._owner   = owner
+        self._gen     = 0
+        self._ring    = None
+        self._rings   = []    # every view handed out, released on close
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @classmethod
+    def create(cls, capacity=8192):
+        shm = shared_memory.SharedMemory(create=True, size=cls.HEADER_SIZE + MAX_SENSORS * capacity * 4)
+        cls.HEADER.pack_into(shm.buf, 0, 0, 0, 0)
+        return cls(shm, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name, capacity=8192):
+        return cls(shared_memory.SharedMemory(name=name), capacity, owner=False)
+
+    def start(self, channels):
+        """Producer: begin a new stream of `channels` channels; returns the ring to extend()."""
+        _count, _channels, gen = self.HEADER.unpack_from(self.shm.buf, 0)
+        self.HEADER.pack_into(self.shm.buf, 0, 0, channels, gen + 1)
+        return self._view(channels, gen + 1)
+
+    def current(self):
+        """Consumer: the ring of the stream being written, or None before the first one."""
+        _count, channels, gen = self.HEADER.unpack_from(self.shm.buf, 0)
+        if gen != self._gen:
+            self._view(channels, gen)
+        return self._ring
+
+    def _view(self, channels, gen):
+        self._gen = gen
+        self._ring = ShmSampleRing(self, channels)
+        self._rings.append(self._ring)
+        return self._ring
+
+    def close(self):
+        for ring in self._rings:
+            ring.release()
+        self._rings = []
+        self._ring = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+class Doorbell:
+    """Coalescing wake-up for consumers that want to block instead of polling.
+
+    The producer only writes a byte when a consumer has said it is about to
+    sleep, so a burst of records costs one flag check each and at most one pipe
+    write.  The GUI doesn't need it (its QTimer polls the rings); the publisher
+    and other headless consumers do.
+    """
+    def __init__(self, ctx):
+        self._waiting = ctx.Value("b", 0, lock=False)
+        self._r, self._w = ctx.Pipe(duplex=False)
+
+    def ring(self):
+        if self._waiting.value:
+            self._waiting.value = 0
+            self._w.send_bytes(b"\0")
+
+    def wait(self, ready, timeout=None):
+        """Block until ready() is true or `timeout` passes; returns ready()."""
+        if ready():
+            return True
+        self._waiting.value = 1
+        # Re-check after arming, or a record written in between would be missed
+        if not ready() and self._r.poll(timeout):
+            while self._r.poll():
+                self._r.recv_bytes()
+        self._waiting.value = 0
+        return ready()
+
+
+# ---------- child process ----------
+# Handler methods the GUI may call remotely; each returns a command Future
+_REMOTE_CALLS = {"send_command", "cue_led", "buzz", "set_threshold", "set_sample_interval",
+                 "set_window", "set_heartbeat", "set_stream"}
+
+
+def _child_main(names, ring_names, sample_names, doorbell, commands, replies):
+    from app_log import setup_logging
+    from bluetooth_handler import BluetoothHandler
+    setup_logging()
+
+    class _RingHandler(BluetoothHandler):
+        def __init__(self, device_name, ring, shared_samples):
+            super().__init__(device_name)
+            self.ring = ring
+            self.shared_samples = shared_samples
+            self.thresholds.on_push = None   # the GUI's RemotePaddle owns thresholds
+
+        def _new_samples(self, channels):
+            # Raw stream straight into shared memory for the GUI's plots and history
+            if channels > MAX_SENSORS:
+                return super()._new_samples(channels)
+            return self.shared_samples.start(channels)
+
+        def _notify_cb(self, char_uuid, data):
+            ctx = self._ctx
+            before = ctx.hit_count + ctx.heartbeats
+            super()._notify_cb(char_uuid, data)
+            ctx = self._ctx
+            if ctx.hit_count + ctx.heartbeats == before or ctx.last_forces is None:
+                return   # ACK, or nothing decodable
+            if ctx.time_since_hit:
+                self.ring.write(KIND_HIT, ctx.hit_time, ctx.last_forces, ctx.time_since_last,
+                                ctx.time_since_hit, ctx.waveform, None, ctx.seq, ctx.hit_count)
+            else:
+                self.ring.write(KIND_HEARTBEAT, 0.0, ctx.last_forces, ctx.time_since_last, 0,
+                                None, ctx.idle_peak, ctx.seq, ctx.hit_count)
+            doorbell.ring()
+
+    rings = [ShmRing.attach(n) for n in ring_names]
+    samples = [ShmSamples.attach(n) for n in sample_names]
+    handlers = [_RingHandler(name, ring, shared) for name, ring, shared in zip(names, rings, samples)]
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(0.5):
+            for idx, h in enumerate(handlers):
+                replies.put(("status", idx, h.is_connected, h.link_health(), h.rx_stats(), h.reconnects))
+
+    def connect(idx, profile):
+        handlers[idx].profile = profile
+        ok = handlers[idx].connect()
+        replies.put(("connected", idx, ok, handlers[idx].simulated))
+
+    threading.Thread(target=report, daemon=True).start()
+    while True:
+        msg = commands.get()
+        op, idx = msg[0], msg[1] if len(msg) > 1 else None
+        try:
+            if op == "stop":
+                break
+            elif op == "connect":
+                threading.Thread(target=connect, args=(idx, msg[2]), daemon=True).start()
+            elif op == "disconnect":
+                handlers[idx].disconnect()
+                replies.put(("connected", idx, False, handlers[idx].simulated))
+            elif op == "profile":
+                handlers[idx].profile = msg[2]
+            elif op == "call":
+                _, idx, reply_id, method, args, kwargs = msg
+                if method not in _REMOTE_CALLS:
+                    raise ValueError(f"not a remote call: {method}")
+                fut = getattr(handlers[idx], method)(*args, **kwargs)
+                fut.add_done_callback(lambda f, rid=reply_id: replies.put(
+                    ("reply", rid, f.exception(), None if f.exception() else f.result())))
+        except Exception as e:
+            log.error("Ingest command %r failed: %s", msg, e)
+            if op == "call":
+                replies.put(("reply", msg[2], e, None))
+    stop.set()
+    for h in handlers:
+        if h.is_connected:
+            h.disconnect()
+    for ring in rings + samples:
+        ring.close()
+
+
+# ---------- GUI side ----------
+class RemotePaddle:
+    """Stands in for a BluetoothHandler whose BLE work runs in the ingest process.
+
+    Same surface the app uses – connect(), hit_count, get_force_readings(),
+    thresholds, profile, command helpers... – but readings come from the
+    paddle's shared-memory ring, decoded lazily whenever one is asked for.
+    """
+    def __init__(self, proc, idx, device_name, ring, shared_samples):
+        self.device_name  = device_name
+        self.is_connected = False
+        self.simulated    = False
+        self.thresholds   = AdaptiveThreshold(on_push=self._push_threshold)
+        self.heartbeat_ms = PROFILES["default"].window_ms
+        self.reconnects   = 0
+        self.dropped      = 0      # records lost because the GUI fell a whole ring behind
+        self._proc        = proc
+        self._idx         = idx
+        self._ring        = ring
+        self._samples     = shared_samples
+        self._profile     = PROFILES["default"]
+        self._connected   = threading.Event()
+        self._health      = LinkHealth("unknown", (), 0.0, 0.0, 0.0, 0.0, 0, None, None)
+        self._rx_bytes    = 0
+        self._records     = 0
+        self._beats       = 0
+        self._hit_count   = 0
+        self._reset()
+
+    def _reset(self):
+        # Counters (_records, _beats, _hit_count) are kept, as BluetoothHandler keeps its
+        # own across reconnects: the UI compares them with the last values it drew
+        self._pos       = self._ring.head()   # skip anything from an earlier connection
+        self._forces    = None
+        self._tsl       = 0
+        self._tsh       = 0
+        self._hit_time  = None
+        self._waveform  = None
+
+    # ---------- ring ----------
+    def poll(self):
+        """Decode everything new in the ring; cheap when nothing arrived."""
+        records, self._pos, dropped = self._ring.read(self._pos)
+        self.dropped += dropped
+        for (t, kind, n, tsl, tsh, rise, duration, impulse, idle_peak, _seq, hit_count, *forces) in records:
+            self._records += 1
+            self._forces = tuple(forces[:n])
+            self._tsl, self._tsh = tsl, tsh
+            if kind == KIND_HIT:
+                self._hit_count = hit_count
+                self._hit_time = t
+                self._waveform = (rise, duration, impulse) if rise >= 0 else None
+                self.thresholds.observe_hit(max(self._forces))
+            else:
+                self._beats += 1
+                self.thresholds.observe_noise(idle_peak)
+        return bool(records)
+
+    def pending(self):
+        return self._ring.head() != self._pos
+
+    def get_force_readings(self):
+        if not self.is_connected:
+            return None, 0, 0
+        self.poll()
+        return self._forces, self._tsl, self._tsh
+
+    @property
+    def hit_count(self):
+        self.poll()
+        return self._hit_count
+
+    @property
+    def hit_time(self):
+        return self._hit_time
+
+    @property
+    def waveform(self):
+        return self._waveform
+
+    @property
+    def samples(self):
+        """Raw STREAM samples (a SampleRing written by the ingest process), or None."""
+        return self._samples.current()
+
+    def rx_stats(self):
+        self.poll()
+        return self._records, self._rx_bytes, self._beats
+
+    def link_health(self):
+        return self._health
+
+    # ---------- connection ----------
+    def connect(self) -> bool:
+        if self.is_connected:
+            return True
+        self._connected.clear()
+        self._proc.send(("connect", self._idx, self._profile))
+        self._connected.wait(timeout=25)
+        if self.is_connected and not self.simulated:
+            self._reset()
+            self.thresholds.push_now()
+        return self.is_connected
+
+    def disconnect(self):
+        if self.is_connected:
+            self._connected.clear()
+            self._proc.send(("disconnect", self._idx))
+            self._connected.wait(timeout=10)
+
+    # ---------- profile / commands ----------
+    @property
+    def profile(self):
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile):
+        self._profile = profile
+        self._proc.send(("profile", self._idx, profile))
+
+    def apply_profile(self, profile):
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        return apply_profile(self, profile)
+
+    def _call(self, method, *args, **kwargs) -> Future:
+        if not self.is_connected or self.simulated:
+            fut = Future()
+            fut.set_exception(ConnectionError(f"{self.device_name} not connected"))
+            return fut
+        return self._proc.call(self._idx, method, args, kwargs)
+
+    def send_command(self, name, *args, retries=None, timeout=None):
+        return self._call("send_command", name, *args, retries=retries, timeout=timeout)
+
+    def cue_led(self, duration_ms=300):
+        return self._call("cue_led", duration_ms)
+
+    def buzz(self, freq_hz=2000, duration_ms=150):
+        return self._call("buzz", freq_hz, duration_ms)
+
+    def set_threshold(self, newtons):
+        return self._call("set_threshold", newtons)
+
+    def set_sample_interval(self, interval_ms):
+        return self._call("set_sample_interval", interval_ms)
+
+    def set_window(self, window_ms):
+        self.heartbeat_ms = int(window_ms)
+        return self._call("set_window", window_ms)
+
+    def set_heartbeat(self, interval_ms):
+        self.heartbeat_ms = int(interval_ms)
+        return self._call("set_heartbeat", interval_ms)
+
+    def set_stream(self, batch):
+        return self._call("set_stream", batch)
+
+    def _push_threshold(self, threshold):
+        if self.is_connected and not self.simulated:
+            self.set_threshold(threshold)
+
+
+class BleProcess:
+    """Starts the ingest child and hands out one RemotePaddle per device name."""
+    def __init__(self, device_names, capacity=4096):
+        ctx = mp.get_context("spawn")
+        self._rings    = [ShmRing.create(capacity) for _ in device_names]
+        self._samples  = [ShmSamples.create() for _ in device_names]
+        self.doorbell  = Doorbell(ctx)
+        self._commands = ctx.Queue()
+        self._replies  = ctx.Queue()
+        self._futures  = {}
+        self._ids      = itertools.count(1)
+        self._closed   = False
+        self._proc = ctx.Process(target=_child_main, name="ble-ingest", daemon=True,
+                                 args=(list(device_names), [r.name for r in self._rings],
+                                       [s.name for s in self._samples],
+                                       self.doorbell, self._commands, self._replies))
+        self._proc.start()
+        self.paddles = [RemotePaddle(self, i, name, ring, shared)
+                        for i, (name, ring, shared) in enumerate(zip(device_names, self._rings, self._samples))]
+        threading.Thread(target=self._pump_replies, name="ble-ingest-replies", daemon=True).start()
+        atexit.register(self.close)
+
+    def send(self, msg):
+        self._commands.put(msg)
+
+    def call(self, idx, method, args, kwargs) -> Future:
+        fut = Future()
+        reply_id = next(self._ids)
+        self._futures[reply_id] = fut
+        self.send(("call", idx, reply_id, method, args, kwargs))
+        return fut
+
+    def wait(self, timeout=None):
+        """Block until any paddle's ring has unread records (for headless consumers)."""
+        return self.doorbell.wait(lambda: any(p.pending() for p in self.paddles), timeout)
+
+    def _pump_replies(self):
+        while True:
+            try:
+                msg = self._replies.get()
+            except (EOFError, OSError):
+                return
+            op = msg[0]
+            if op == "reply":
+                _, reply_id, exc, result = msg
+                fut = self._futures.pop(reply_id, None)
+                if fut is not None:
+                    fut.set_exception(exc) if exc is not None else fut.set_result(result)
+            elif op == "connected":
+                _, idx, ok, simulated = msg
+                paddle = self.paddles[idx]
+                paddle.is_connected, paddle.simulated = ok, simulated
+                paddle._connected.set()
+            elif op == "status":
+                _, idx, connected, health, rx, reconnects = msg
+                paddle = self.paddles[idx]
+                paddle._health = health
+                paddle._rx_bytes = rx[1]
+                paddle.reconnects = reconnects
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.send(("stop",))
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        for ring in self._rings + self._samples:
+            ring.close()
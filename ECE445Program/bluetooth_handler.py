@@ -1,6 +1,15 @@
 # bluetooth_handler.py  – BLE UART implementation (falls back to simulation)
-import asyncio, threading, time, random, sys
-from dataclasses import dataclass
+import asyncio, logging, threading, time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from adaptive_threshold import AdaptiveThreshold
+from paddle_profiles import PROFILES, apply_profile
+from link_monitor import LinkMonitor
+from sample_ring import SampleRing
+from app_log import get_logger
+
+log     = get_logger("ble")
+cmd_log = get_logger("cmd")
 
 # Nordic‑UART UUIDs
 NUS_SERVICE      = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
@@ -11,29 +20,68 @@ try:
     from bleak import BleakScanner, BleakClient
     BLE_READY = True
 except ImportError:
+    BleakScanner = BleakClient = None   # referenced in annotations below
     BLE_READY = False
-    print("Bleak not installed – using simulation.")
+    log.warning("Bleak not installed – using simulation.")
 
 @dataclass
 class _BleContext:
     client:      BleakClient = None
     last_force:  float       = None
     last_force2: float       = None
+    last_forces: tuple       = None   # every sensor on the paddle, in firmware order
+    hit_count:   int         = 0      # bumps once per hit window received (never reset)
+    waveform:    tuple       = None   # (rise_ms, duration_ms, impulse) of the last hit window
+    hit_time:    float       = None   # perf_counter() at the start of the last hit window
     time_since_last: int     = None
     time_since_hit: int      = None
     rx_char:     str         = None
     tx_char:     str         = None
     continuous_mode: bool    = False
+    command_seq: int         = 0      # last sequence number handed out
+    pending:     dict        = field(default_factory=dict)  # seq -> _PendingCommand (loop thread only)
+    rx_count:    int         = 0      # notifications received (link measurements)
+    rx_bytes:    int         = 0
+    heartbeats:  int         = 0
+    idle_peak:   float       = None   # noise peak from the last heartbeat
+    seq:         int         = None   # firmware sequence number of the last notification
+
+@dataclass
+class _PendingCommand:
+    payload:  bytes
+    future:   Future
+    retries:  int
+    timeout:  float
+    attempts: int = 0
+    sent_at:  float = 0.0   # loop time of the latest attempt
+    timer:    asyncio.TimerHandle = None
 
 class BluetoothHandler:
     """Public API identical to the old class: connect(), disconnect(), get_force_reading()"""
+    COMMAND_TIMEOUT = 0.25   # seconds to wait for an ACK before resending
+    COMMAND_RETRIES = 3      # resends before a command's future fails
+    RECONNECT_MIN   = 1.0    # seconds between reconnect attempts, doubling up to...
+    RECONNECT_MAX   = 30.0
+
     def __init__(self, device_name: str):
         self.device_name   = device_name
         self.is_connected  = False
         self.simulated     = not BLE_READY
         self._ctx          = _BleContext()
         self._loop         = None   # background asyncio loop
-
+        # Per-paddle auto thresholds; fed from notifications, pushed back to the paddle
+        self.thresholds    = AdaptiveThreshold(on_push=self._push_threshold)
+        # Firmware sampling/windowing parameters, pushed at connect and by apply_profile()
+        self.profile       = PROFILES["default"]
+        self.heartbeat_ms  = self.profile.window_ms   # what the firmware is heartbeating at
+        # Link health; a link that goes silent is reconnected by the watchdog
+        self.link          = LinkMonitor()
+        self.reconnects    = 0
+        self._want_connected = False
+        self._watchdog_running = False
+        self._connected_at = 0.0
+        # Raw samples from the firmware's STREAM mode (created on the first "r=" packet)
+        self.samples       = None
 
     def get_both_force_readings(self):
         """Get readings from both force sensors and time since last message"""
@@ -46,6 +94,94 @@ class BluetoothHandler:
             time.sleep(0.2)  # Short wait for initial readings
         return self._ctx.last_force or "N/A", self._ctx.last_force2 or "N/A", self._ctx.time_since_last or 0, self._ctx.time_since_hit or 0
 
+    def get_force_readings(self):
+        """Non-blocking N-sensor read: (forces tuple or None, time_since_last, time_since_hit)."""
+        if not self.is_connected:
+            return None, 0, 0
+        return self._ctx.last_forces, self._ctx.time_since_last or 0, self._ctx.time_since_hit or 0
+
+    @property
+    def hit_count(self):
+        """Number of hit windows received since connecting (lets callers spot new hits)."""
+        return self._ctx.hit_count
+
+    @property
+    def hit_time(self):
+        """Host perf_counter() time the last hit started: receipt time minus the firmware window."""
+        return self._ctx.hit_time
+
+    @property
+    def waveform(self):
+        """(rise_ms, duration_ms, impulse) of the last hit window, or None on older firmware."""
+        return self._ctx.waveform
+
+    # ---------- command channel -----------
+    def send_command(self, name, *args, retries=None, timeout=None) -> Future:
+        """Queue "CMD:<seq>:<name>[:<args>]" to the paddle without waiting for it.
+
+        Commands are written without response, so any number can be in flight at
+        once; the paddle answers "ACK:<seq>" (or "NAK:<seq>:<reason>") on the TX
+        characteristic.  Unacknowledged commands are resent after `timeout`
+        seconds, up to `retries` times.  Returns a concurrent.futures.Future that
+        resolves to the number of attempts used, or fails with TimeoutError /
+        RuntimeError (NAK) / ConnectionError.
+        """
+        fut = Future()
+        if not self.is_connected or self.simulated or self._loop is None:
+            fut.set_exception(ConnectionError(f"{self.device_name} not connected"))
+            return fut
+        self._loop.call_soon_threadsafe(
+            self._queue_command, name, args, fut,
+            self.COMMAND_RETRIES if retries is None else retries,
+            self.COMMAND_TIMEOUT if timeout is None else timeout)
+        return fut
+
+    def cue_led(self, duration_ms=300):
+        """Light the paddle's cue LED for duration_ms."""
+        return self.send_command("LED", int(duration_ms))
+
+    def buzz(self, freq_hz=2000, duration_ms=150):
+        return self.send_command("BUZZ", int(freq_hz), int(duration_ms))
+
+    def set_threshold(self, newtons):
+        return self.send_command("THRESHOLD", f"{newtons:.1f}")
+
+    def set_sample_interval(self, interval_ms):
+        """Firmware ADC read interval (READING_INTERVAL)."""
+        return self.send_command("RATE", int(interval_ms))
+
+    def set_window(self, window_ms):
+        """Firmware hit window / heartbeat interval (SEND_INTERVAL)."""
+        self.heartbeat_ms = int(window_ms)   # WINDOW resets the firmware heartbeat too
+        return self.send_command("WINDOW", int(window_ms))
+
+    def set_heartbeat(self, interval_ms):
+        """Idle heartbeat period; hits are still sent as soon as their window closes."""
+        self.heartbeat_ms = int(interval_ms)
+        return self.send_command("HEARTBEAT", int(interval_ms))
+
+    def set_stream(self, batch):
+        """Raw sample stream for live plots: one notification per `batch` samples, 0 = off."""
+        return self.send_command("STREAM", int(batch))
+
+    def _new_samples(self, channels):
+        # Ring for a raw stream of `channels` channels (ble_process puts it in shared memory)
+        return SampleRing(channels)
+
+    def apply_profile(self, profile):
+        """Switch the paddle to a ParamProfile (or a PROFILES name); returns the command futures."""
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        return apply_profile(self, profile)
+
+    def link_health(self):
+        """LinkHealth snapshot (state ok/degraded/down/unknown, loss, gaps, RSSI, RTT)."""
+        return self.link.health(self.heartbeat_ms or self.profile.window_ms)
+
+    def rx_stats(self):
+        """(notifications, bytes, heartbeats) received so far; kept across reconnects."""
+        return self._ctx.rx_count, self._ctx.rx_bytes, self._ctx.heartbeats
+
     # ---------- public -----------
     def connect(self) -> bool:
         if self.is_connected:
@@ -64,12 +200,21 @@ class BluetoothHandler:
             fut = asyncio.run_coroutine_threadsafe(
                 self._start_continuous_readings(), self._loop)
             fut.result(timeout=5)
+            # Bring the firmware in line with the chosen profile and whatever
+            # thresholds we've learned so far
+            apply_profile(self, self.profile)
+            self.thresholds.push_now()
+            self._want_connected = True
+            if not self._watchdog_running:
+                self._watchdog_running = True
+                asyncio.run_coroutine_threadsafe(self._watchdog(), self._loop)
             
         return self.is_connected
 
     def disconnect(self):
         if not self.is_connected:
             return
+        self._want_connected = False
 
 
         # Stop continuous readings first
@@ -95,30 +240,36 @@ class BluetoothHandler:
             time.sleep(0.2)  # Short wait for initial readings
         return self._ctx.last_force or "N/A"
 
+    def _push_threshold(self, threshold):
+        """Called by the threshold engine (from any thread); fire-and-forget command."""
+        if self.is_connected and not self.simulated:
+            self.set_threshold(threshold)
+
     # ---------- asyncio internals ----------
     async def _async_connect(self) -> bool:
         # 1) scan for the device
-        devices = await BleakScanner.discover(timeout=4.0)
-        target = next((d for d in devices if d.name == self.device_name), None)
+        found = await BleakScanner.discover(timeout=4.0, return_adv=True)
+        target, adv = next(((d, a) for d, a in found.values() if d.name == self.device_name), (None, None))
         if not target:
-            print(f"{self.device_name} not found.")
+            log.warning("%s not found.", self.device_name)
             return False
+        self.link.reset()
+        self.link.on_rssi(adv.rssi)
 
         # 2) connect
         client = BleakClient(target.address)
         try:
             await client.connect(timeout=5.0)
         except Exception as e:
-            print(f"BLE connect error: {e}")
+            log.error("BLE connect error on %s: %s", self.device_name, e)
             return False
 
         # 3) cache characteristics
         services = await client.get_services()
         
         # Debugging: Print all services
-        print(f"Services found on device {self.device_name}:")
-        for service in services:
-            print(f"  Service: {service.uuid}")
+        log.debug("Services found on device %s: %s", self.device_name,
+                  ", ".join(str(service.uuid) for service in services))
         
         # Check if our NUS service exists
         nus_service = None
@@ -128,11 +279,11 @@ class BluetoothHandler:
                 break
                 
         if not nus_service:
-            print(f"NUS service ({NUS_SERVICE}) not found on device!")
+            log.error("NUS service (%s) not found on %s!", NUS_SERVICE, self.device_name)
             await client.disconnect()
             return False
         
-        print(f"Found NUS service: {nus_service.uuid}")
+        log.debug("Found NUS service: %s", nus_service.uuid)
         
         # Find the characteristic UUIDs
         rx_char = None
@@ -144,7 +295,7 @@ class BluetoothHandler:
                 tx_char = char.uuid
         
         if not rx_char or not tx_char:
-            print("Required characteristics not found!")
+            log.error("Required characteristics not found on %s!", self.device_name)
             await client.disconnect()
             return False
             
@@ -153,20 +304,72 @@ class BluetoothHandler:
         self._ctx.tx_char = tx_char
         self._ctx.last_force = None
         self._ctx.last_force2 = None
+        self._ctx.last_forces = None
+        self._ctx.waveform = None
+        self._ctx.hit_time = None
         self._ctx.time_since_last = None
         self._ctx.time_since_hit = None
         self._ctx.continuous_mode = False
 
         # 4) subscribe for notifications
         await client.start_notify(tx_char, self._notify_cb)
-        print(f"Successfully connected to {self.device_name}")
+        self._connected_at = time.monotonic()
+        log.info("Successfully connected to %s", self.device_name,
+                 extra={"device": self.device_name, "rssi": adv.rssi})
         return True
 
     async def _async_disconnect(self):
         if self._ctx.client and self._ctx.client.is_connected:
             await self._ctx.client.disconnect()
-        self._ctx = _BleContext()
+        # Fail anything still waiting for an ACK
+        for cmd in self._ctx.pending.values():
+            if cmd.timer:
+                cmd.timer.cancel()
+            cmd.future.set_exception(ConnectionError(f"{self.device_name} disconnected"))
+        # The counters carry over: the UI remembers the last hit_count / rx_count it drew,
+        # and restarting them from 0 would make the first hits after a reconnect look seen
+        old = self._ctx
+        # command_seq carries over too, so a paddle that missed the disconnect can't take a
+        # new command for a resend of one it already ran
+        self._ctx = _BleContext(hit_count=old.hit_count, rx_count=old.rx_count,
+                                rx_bytes=old.rx_bytes, heartbeats=old.heartbeats,
+                                command_seq=old.command_seq)
         
+    async def _watchdog(self):
+        """Reconnect (with backoff) when the link drops or goes silent while we want it up."""
+        delay = self.RECONNECT_MIN
+        while self._want_connected:
+            await asyncio.sleep(1.0)
+            if not self._want_connected:
+                break
+            client = self._ctx.client
+            health = self.link_health()
+            if health.state == "unknown":
+                # Connected but nothing has arrived yet: give the paddle a few seconds
+                dead = time.monotonic() - self._connected_at > 5.0
+            else:
+                dead = health.state == "down"
+            if client is not None and client.is_connected and not dead:
+                delay = self.RECONNECT_MIN
+                continue
+            get_logger("link").warning("%s: link lost (%s) – reconnecting", self.device_name, health.summary(),
+                                       extra={"device": self.device_name, "reconnects": self.reconnects + 1})
+            self.reconnects += 1
+            if not await self._async_reconnect():
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, self.RECONNECT_MAX)
+        self._watchdog_running = False
+
+    async def _async_reconnect(self) -> bool:
+        # is_connected stays True: as far as the app is concerned we still want this paddle
+        await self._async_disconnect()
+        if not self._want_connected or not await self._async_connect():
+            return False
+        await self._start_continuous_readings()
+        apply_profile(self, self.profile)
+        self.thresholds.push_now()
+        return True
+
     async def _start_continuous_readings(self):
         """Start continuous force readings from the device"""
         if not self._ctx.client or not self._ctx.client.is_connected:
@@ -175,11 +378,11 @@ class BluetoothHandler:
         try:
             # Send START_FORCE_READING command
             await self._ctx.client.write_gatt_char(self._ctx.rx_char, b"START_FORCE_READING\n")
-            print(f"Started continuous readings for {self.device_name}")
+            log.info("Started continuous readings for %s", self.device_name)
             self._ctx.continuous_mode = True
             return True
         except Exception as e:
-            print(f"Error starting continuous readings: {e}")
+            log.error("Error starting continuous readings on %s: %s", self.device_name, e)
             return False
     
     async def _stop_continuous_readings(self):
@@ -190,32 +393,141 @@ class BluetoothHandler:
         try:
             # Send STOP_FORCE_READING command
             await self._ctx.client.write_gatt_char(self._ctx.rx_char, b"STOP_FORCE_READING\n")
-            print(f"Stopped continuous readings for {self.device_name}")
+            log.info("Stopped continuous readings for %s", self.device_name)
             self._ctx.continuous_mode = False
             return True
         except Exception as e:
-            print(f"Error stopping continuous readings: {e}")
+            log.error("Error stopping continuous readings on %s: %s", self.device_name, e)
             return False
 
+    # Command channel internals – all of these run on the handler's loop thread
+    def _queue_command(self, name, args, fut, retries, timeout):
+        ctx = self._ctx
+        ctx.command_seq = ctx.command_seq % 65535 + 1
+        seq = ctx.command_seq
+        fields = [f"CMD:{seq}", name]
+        if args:
+            fields.append(",".join(str(a) for a in args))
+        ctx.pending[seq] = _PendingCommand(payload=(":".join(fields) + "\n").encode(),
+                                           future=fut, retries=retries, timeout=timeout)
+        self._transmit(seq)
+
+    def _transmit(self, seq):
+        cmd = self._ctx.pending.get(seq)
+        if cmd is None:
+            return
+        if cmd.attempts > cmd.retries:
+            del self._ctx.pending[seq]
+            cmd.future.set_exception(TimeoutError(
+                f"{self.device_name}: no ACK for {cmd.payload.decode().strip()}"))
+            return
+        cmd.attempts += 1
+        cmd.sent_at = self._loop.time()
+        self._loop.create_task(self._write_no_response(cmd.payload))
+        cmd.timer = self._loop.call_later(cmd.timeout, self._transmit, seq)
+
+    async def _write_no_response(self, payload):
+        if not self._ctx.client or not self._ctx.client.is_connected:
+            return
+        try:
+            await self._ctx.client.write_gatt_char(self._ctx.rx_char, payload, response=False)
+        except Exception as e:
+            # Left pending: the retry timer will resend or give up
+            cmd_log.warning("Error sending %r to %s: %s", payload, self.device_name, e)
+
+    def _on_ack(self, text):
+        # "ACK:<seq>" or "NAK:<seq>:<reason>"
+        parts = text.split(':', 2)
+        cmd = self._ctx.pending.pop(int(parts[1]), None)
+        if cmd is None:
+            return  # late ACK for a command we already resent or gave up on
+        if cmd.timer:
+            cmd.timer.cancel()
+        if cmd.attempts == 1:
+            # Resent commands are ambiguous about which attempt was answered
+            self.link.on_rtt((self._loop.time() - cmd.sent_at) * 1000)
+        if parts[0] == 'ACK':
+            cmd.future.set_result(cmd.attempts)
+        else:
+            cmd.future.set_exception(RuntimeError(
+                f"{self.device_name} rejected {cmd.payload.decode().strip()}: {parts[2] if len(parts) > 2 else '?'}"))
+
     def _notify_cb(self, _char_uuid, data: bytearray):
         try:
-            # Data now comes as "force1,force2,time_since_last,time_since_hit"
-            values = data.decode().strip().split(',')
-            if len(values) >= 1:
-                self._ctx.last_force = float(values[0])
+            # Data comes as "force1,...,forceN,time_since_last,time_since_hit",
+            # optionally followed by tagged sections ";w=rise_ms,duration_ms,impulse"
+            # on hits and ";n=idle_peak" on heartbeats, and ";s=seq" on both.
+            # The two-sensor paddles send exactly four fields; shorter messages
+            # are treated as forces only (older firmware).
+            text = data.decode().strip()
+            if text.startswith(('ACK:', 'NAK:')):
+                self._on_ack(text)
+                return
+            if text.startswith('r='):
+                # Raw stream "r=<sensors>:f,f,..." – plot data only, not a hit or heartbeat
+                head, _, body = text.partition(':')
+                channels = int(head[2:])
+                if self.samples is None or self.samples.channels != channels:
+                    self.samples = self._new_samples(channels)
+                self.samples.extend([float(v) for v in body.split(',')])
+                return
+            sections = text.split(';')
+            values = sections[0].split(',')
+            if len(values) >= 4:
+                forces = tuple(float(v) for v in values[:-2])
+                self._ctx.time_since_last = int(values[-2])
+                self._ctx.time_since_hit = int(values[-1])
+            else:
+                forces = tuple(float(v) for v in values)
+                self._ctx.time_since_hit = 0
+            seq = None
+            for section in sections[1:]:
+                if section.startswith('s='):
+                    seq = int(section[2:])
+            self._ctx.seq = seq
+            self.link.on_packet(seq=seq, expected_ms=self.heartbeat_ms)
+            if forces:
+                self._ctx.last_forces = forces
+                self._ctx.last_force = forces[0]
                 # Store second value if available
-                if len(values) >= 2:
-                    self._ctx.last_force2 = float(values[1])
-                # Store time since last send if available
-                if len(values) >= 3:
-                    self._ctx.time_since_last = int(values[2])
-                # Store time since hit detection if available
-                if len(values) >= 4:
-                    self._ctx.time_since_hit = int(values[3])
-                    if self._ctx.last_force > 200:  # Only print for significant force readings
-                        print(f"[DEBUG] Received hit with time_since_last: {self._ctx.time_since_last}ms, time_since_hit: {self._ctx.time_since_hit}ms, forces: {self._ctx.last_force}, {self._ctx.last_force2}")
+                if len(forces) >= 2:
+                    self._ctx.last_force2 = forces[1]
+                if self._ctx.time_since_hit:
+                    self._ctx.hit_time = time.perf_counter() - self._ctx.time_since_hit / 1000.0
+                    waveform = None
+                    for section in sections[1:]:
+                        if section.startswith('w='):
+                            rise, duration, impulse = section[2:].split(',')
+                            waveform = (int(rise), int(duration), float(impulse))
+                    self._ctx.waveform = waveform
+                    self._ctx.hit_count += 1
+                    self.thresholds.observe_hit(max(forces))
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("Received hit with time_since_last: %sms, time_since_hit: %sms, forces: %s",
+                                  self._ctx.time_since_last, self._ctx.time_since_hit, forces,
+                                  extra={"device": self.device_name, "forces": forces, "seq": seq,
+                                         "time_since_hit": self._ctx.time_since_hit, "waveform": waveform})
                 else:
-                    self._ctx.time_since_hit = 0
+                    self._ctx.heartbeats += 1
+                    for section in sections[1:]:
+                        if section.startswith('n='):
+                            self._ctx.idle_peak = float(section[2:])
+                            self.thresholds.observe_noise(self._ctx.idle_peak)
+            # Counted last: the UI skips a paddle whose rx_count it has already drawn, so
+            # the count must not move until hit_count and the forces for it are stored
+            self._ctx.rx_count += 1
+            self._ctx.rx_bytes += len(data)
         except Exception as e:
-            print(f"Error processing notification: {e}")
-            pass
\ No newline at end of file
+            self.link.on_decode_error()
+            log.warning("Error processing notification from %s: %s", self.device_name, e,
+                        extra={"device": self.device_name, "raw": bytes(data)})
+
+
+def send_to_all(handlers, name, *args):
+    """Send one command to many paddles at once (e.g. cue a whole class).
+
+    Nothing waits for a round trip: each write goes out without response on
+    its handler's own loop, so the whole batch leaves within one connection
+    interval instead of N serial GATT writes.  Returns the futures in order.
+    """
+    return [h.send_command(name, *args) for h in handlers]
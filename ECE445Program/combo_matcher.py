@@ -0,0 +1,184 @@
+# combo_matcher.py  – kick combos across paddles, compiled into a trie and matched hit by hit
+#
+# A combo is a comma-separated list of steps "paddle[/kick][ <gap_ms]":
+#   "1, 2 <400, 1 <400"                    left, right within 400 ms, then left
+#   "1/Roundhouse Kick, 2/Back Kick <600"  kick types from the kick classifier
+#   "*/Axe Kick, * <300"                   any paddle
+# Paddles are 1-based like the UI's "ESP32 #n" (or names from paddle_names); a step
+# without a gap has no time limit after the previous step.
+import os
+from app_log import get_logger
+
+log = get_logger("drill")
+
+ANY = None
+
+DEFAULT_COMBOS = {
+    "Double":          "1, 2 <500",
+    "Triple":          "1, 2 <500, 1 <500",
+    "Fast Double":     "1, 2 <300",
+    "Round-Back":      "1/Roundhouse Kick, 2/Back Kick <800",
+    "Double Round":    "1/Roundhouse Kick, 2/Roundhouse Kick <500",
+    "Axe Finish":      "1, 2 <500, */Axe Kick <700",
+    "Tornado Chain":   "*/Roundhouse Kick, */Tornado Kick <900",
+}
+
+
+class ComboStep:
+    __slots__ = ("paddle", "kick", "gap")
+
+    def __init__(self, paddle=ANY, kick=ANY, gap=None):
+        self.paddle = paddle   # paddle index or ANY
+        self.kick   = kick     # kick name or ANY
+        self.gap    = gap      # max seconds after the previous step, None = no limit
+
+    def __repr__(self):
+        paddle = "*" if self.paddle is ANY else self.paddle + 1
+        kick = f"/{self.kick}" if self.kick is not ANY else ""
+        gap = f" <{self.gap * 1000:.0f}" if self.gap is not None else ""
+        return f"{paddle}{kick}{gap}"
+
+
+def parse_combo(text, paddle_names=None):
+    """List of ComboSteps from the pattern syntax above; ValueError if malformed."""
+    steps = []
+    for part in text.split(","):
+        part, _, gap = part.partition("<")
+        paddle, _, kick = part.strip().partition("/")
+        paddle, kick, gap = paddle.strip(), kick.strip(), gap.strip().rstrip("ms").strip()
+        if paddle_names and paddle in paddle_names:
+            index = paddle_names[paddle]
+        elif paddle in ("*", ""):
+            index = ANY
+        elif paddle.isdigit() and int(paddle) >= 1:
+            index = int(paddle) - 1
+        else:
+            raise ValueError(f"bad paddle {paddle!r} in combo {text!r}")
+        steps.append(ComboStep(index, kick or ANY, float(gap) / 1000.0 if gap else None))
+    if not steps:
+        raise ValueError(f"empty combo {text!r}")
+    return steps
+
+
+def load_combos(path, paddle_names=None):
+    """{name: steps} from a text file of "name: pattern" lines (# comments allowed)."""
+    combos = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            name, _, pattern = line.partition(":")
+            combos[name.strip()] = parse_combo(pattern, paddle_names)
+    return combos
+
+
+class _Node:
+    __slots__ = ("edges", "by_paddle", "accepts", "max_gap", "depth", "prefix_of")
+
+    def __init__(self, depth):
+        self.edges     = {}     # (paddle, kick) -> [(gap, child)], either may be ANY
+        self.by_paddle = {}     # paddle -> [(kick, gap, child)], for hits of unknown kick type
+        self.accepts   = []     # names of combos that end here
+        self.max_gap   = 0.0    # longest gap on any outgoing edge (inf if one is unlimited)
+        self.depth     = depth
+        self.prefix_of = set()  # combos whose path runs through this node
+
+
+class ComboState:
+    """One athlete's progress through every combo: the trie nodes reached and when."""
+    __slots__ = ("active",)
+
+    def __init__(self):
+        self.active = []   # [(node, time of the hit that reached it)]
+
+    def reset(self):
+        self.active = []
+
+
+class ComboMatcher:
+    """All loaded combos as one trie: an NFA whose live states are trie nodes.
+
+    Combos sharing a prefix share nodes, so the work per hit depends on how
+    many partial combos are live (a handful), not on how many are loaded.
+    Each hit tries the edges of every live node plus the root with at most
+    four dict lookups (exact, any-kick, any-paddle, any-both); a hit that
+    doesn't continue a partial combo ends it.  The matcher is read-only while
+    matching, so one instance serves any number of athletes, each with its own
+    ComboState.
+    """
+    def __init__(self, combos=None):
+        self.root   = _Node(0)
+        self.combos = {}
+        for name, steps in (combos or {}).items():
+            self.add(name, steps)
+
+    def add(self, name, steps):
+        if isinstance(steps, str):
+            steps = parse_combo(steps)
+        self.combos[name] = steps
+        node = self.root
+        node.prefix_of.add(name)
+        for step in steps:
+            key = (step.paddle, step.kick)
+            edges = node.edges.setdefault(key, [])
+            child = next((c for g, c in edges if g == step.gap), None)
+            if child is None:
+                child = _Node(node.depth + 1)
+                edges.append((step.gap, child))
+                node.by_paddle.setdefault(step.paddle, []).append((step.kick, step.gap, child))
+                node.max_gap = max(node.max_gap, float("inf") if step.gap is None else step.gap)
+            child.prefix_of.add(name)
+            node = child
+        node.accepts.append(name)
+
+    def start(self):
+        return ComboState()
+
+    def advance(self, state, paddle, kick, t):
+        """Feed one hit (paddle, kick type or None if unknown, time in s); returns combos completed."""
+        completed = []
+        live = []
+        root = self.root
+        for node, t_last in state.active + [(root, None)]:
+            if t_last is not None:
+                dt = t - t_last
+                if dt > node.max_gap:
+                    continue
+            else:
+                dt = 0.0
+            if kick is not None:
+                for key in ((paddle, kick), (paddle, ANY), (ANY, kick), (ANY, ANY)):
+                    edges = node.edges.get(key)
+                    if edges:
+                        for gap, child in edges:
+                            if gap is None or t_last is None or dt <= gap:
+                                live.append((child, t))
+                                completed.extend(child.accepts)
+            else:
+                # Unknown kick type (untrained athlete, old firmware): any kick matches
+                for p in (paddle, ANY):
+                    for _kick, gap, child in node.by_paddle.get(p, ()):
+                        if gap is None or t_last is None or dt <= gap:
+                            live.append((child, t))
+                            completed.extend(child.accepts)
+        state.active = [(n, tt) for n, tt in live if n.edges]
+        return completed
+
+    def progress(self, state, name, t=None):
+        """Steps of combo `name` done so far in the athlete's longest live attempt at it."""
+        best = 0
+        for node, t_last in state.active:
+            if name in node.prefix_of and (t is None or t - t_last <= node.max_gap):
+                best = max(best, node.depth)
+        return best
+
+
+def default_combos(path=None, paddle_names=None):
+    """Combos from `path` if it exists, else DEFAULT_COMBOS."""
+    if path and os.path.isfile(path):
+        try:
+            return load_combos(path, paddle_names)
+        except (OSError, ValueError) as e:
+            log.warning("Could not load combos from %s: %s", path, e)
+    return {name: parse_combo(text, paddle_names) for name, text in DEFAULT_COMBOS.items()}
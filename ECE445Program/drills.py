@@ -0,0 +1,677 @@
+# drills.py  – paddle‑bound drill sessions driven by a single hit dispatcher
+import heapq, random, time
+from app_log import get_logger
+
+log = get_logger("drill")
+
+class HitEvent:
+    """One completed hit window from one paddle.
+
+    A plain __slots__ class rather than a dataclass: one is built on the
+    10 ms UI tick for every reading above threshold, so it should be cheap
+    to make and small (no per-instance __dict__).
+    """
+    __slots__ = ("paddle", "hit_id", "t", "forces", "max_force", "accuracy", "x", "y", "features",
+                 "time_since_last", "time_since_hit")
+
+    def __init__(self, paddle, hit_id, t, forces, max_force, accuracy, x=0.0, y=0.0, features=None,
+                 time_since_last=0, time_since_hit=0):
+        self.paddle    = paddle
+        self.hit_id    = hit_id      # handler.hit_count when the hit arrived
+        self.t         = t           # time.perf_counter() when the hit started (receipt − firmware window)
+        self.forces    = forces      # calibrated per-sensor forces
+        self.max_force = max_force
+        self.accuracy  = accuracy
+        self.x         = x
+        self.y         = y
+        self.features  = features    # kick-classifier feature vector, if the firmware sent waveform data
+        self.time_since_last = time_since_last   # firmware ms from the previous send to this hit
+        self.time_since_hit  = time_since_hit    # firmware hit window, ms
+
+    def __repr__(self):
+        return (f"HitEvent(paddle={self.paddle}, hit_id={self.hit_id}, t={self.t:.3f}, "
+                f"max_force={self.max_force}, accuracy={self.accuracy})")
+
+
+class DrillSession:
+    """Base class for a drill bound to one paddle or a set of paddles.
+
+    Sessions are plain state machines: the dispatcher feeds them hit events and
+    calls tick(now) from the UI timer, so every session runs its own deadlines
+    without needing its own QTimer.
+
+    threshold  callable(paddle) -> drill threshold in newtons
+    cue        callable(session) fired when the athlete should kick (beep, LED...)
+    on_update  callable(session) fired whenever the visible state changes
+    """
+    def __init__(self, paddles, threshold, cue=None, on_update=None):
+        self.paddles   = frozenset(paddles)
+        self.threshold = threshold
+        self.cue       = cue
+        self.on_update = on_update
+        self.active    = False
+        self.status    = ""
+
+    def start(self, now=None):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+        self._changed()
+
+    def on_hit(self, event: HitEvent):
+        pass
+
+    def tick(self, now):
+        pass
+
+    def snapshot(self):
+        """JSON-able state for scoreboards (see EventPublisher)."""
+        return {"drill": type(self).__name__, "paddles": sorted(self.paddles),
+                "active": self.active, "status": self.status}
+
+    def _changed(self):
+        if self.on_update is not None:
+            self.on_update(self)
+
+    def _cue(self):
+        if self.cue is not None:
+            self.cue(self)
+
+
+class ReactionDrill(DrillSession):
+    """Random delay, cue, then time the first hard-enough hit on the bound paddles."""
+    def __init__(self, paddles, threshold, cue=None, on_update=None,
+                 min_delay=1.0, max_delay=3.0, min_valid_ms=50):
+        super().__init__(paddles, threshold, cue, on_update)
+        self.min_delay    = min_delay
+        self.max_delay    = max_delay
+        self.min_valid_ms = min_valid_ms  # anything faster was a guess, not a reaction
+        self.cue_time     = None
+        self._cue_at      = None
+        self.last_rt_ms   = None
+        self.results      = []            # valid reaction times, ms
+
+    def start(self, now=None):
+        now = time.perf_counter() if now is None else now
+        self.active    = True
+        self.cue_time  = None
+        self._cue_at   = now + random.uniform(self.min_delay, self.max_delay)
+        self.status    = "Reaction Time: ---"
+        self._changed()
+
+    def tick(self, now):
+        if self.active and self._cue_at is not None and now >= self._cue_at:
+            self._cue_at = None
+            self.cue_time = now
+            self._cue()
+
+    def on_hit(self, event):
+        if not self.active or self.cue_time is None:
+            return
+        if event.max_force < self.threshold(event.paddle):
+            return
+        rt_ms = (event.t - self.cue_time) * 1000
+        if rt_ms < self.min_valid_ms:
+            # Kick started before (or implausibly soon after) the cue
+            self.last_rt_ms = None
+            self.status = "Reaction Time: Invalid time"
+            log.info("Reaction on paddle %d invalid (%.0f ms)", event.paddle, rt_ms,
+                     extra={"drill": "reaction", "paddle": event.paddle, "rt_ms": rt_ms, "valid": False})
+        else:
+            self.last_rt_ms = rt_ms
+            self.results.append(rt_ms)
+            self.status = f"Reaction Time: {rt_ms:.0f} ms"
+            log.info("Reaction on paddle %d: %.0f ms", event.paddle, rt_ms,
+                     extra={"drill": "reaction", "paddle": event.paddle, "rt_ms": rt_ms, "valid": True,
+                            "force": event.max_force})
+        self.active = False
+        self._changed()
+
+    def snapshot(self):
+        return dict(super().snapshot(), last_rt_ms=self.last_rt_ms, results=len(self.results))
+
+
+class SpeedDrill(DrillSession):
+    """Prompted kicks against a shrinking time limit; the combo ends on the first miss.
+
+    kick_check  callable(expected_kick, event) -> (accepted, predicted kick)
+    """
+    def __init__(self, paddles, threshold, kick_list, cue=None, on_update=None,
+                 kick_check=None, time_limit=2.0, step_every=5, step=0.1, min_limit=0.1,
+                 window_delay=0.3):
+        super().__init__(paddles, threshold, cue, on_update)
+        self.kick_list     = kick_list
+        self.kick_check    = kick_check
+        self.initial_limit = time_limit
+        self.step_every    = step_every   # make it harder every N kicks...
+        self.step          = step         # ...by this many seconds
+        self.min_limit     = min_limit
+        # A kick only reaches us once the firmware's hit window closes, so the
+        # deadline waits this long past the limit before calling a miss
+        self.window_delay  = window_delay
+        self.time_limit    = time_limit
+        self.combo         = 0
+        self.kick          = None
+        self.feedback      = ""
+        self.prompt_time   = None
+
+    def start(self, now=None):
+        self.combo = 0
+        self.time_limit = self.initial_limit
+        self.feedback = ""
+        self.active = True
+        self._next_kick(time.perf_counter() if now is None else now)
+
+    def _next_kick(self, now):
+        self.kick = random.choice(self.kick_list)
+        self.prompt_time = now
+        self.status = f"Perform: {self.kick}!"
+        self._cue()
+        self._changed()
+
+    def _end(self):
+        self.active = False
+        self.status = "Drill ended!"
+        log.info("Speed drill on paddles %s ended at combo %d", sorted(self.paddles), self.combo,
+                 extra={"drill": "speed", "paddles": sorted(self.paddles), "combo": self.combo,
+                        "time_limit": self.time_limit})
+        self._changed()
+
+    def tick(self, now):
+        if self.active and now - self.prompt_time > self.time_limit + self.window_delay:
+            self._end()
+
+    def on_hit(self, event):
+        if not self.active or event.max_force < self.threshold(event.paddle):
+            return
+        if event.t < self.prompt_time:
+            return  # started before this prompt was shown
+        if event.t - self.prompt_time > self.time_limit:
+            self._end()
+            return
+        if self.kick_check is not None:
+            accepted, predicted = self.kick_check(self.kick, event)
+            if not accepted:
+                # A wrong kick doesn't stop the clock
+                self.feedback = f"Wrong kick – that looked like a {predicted}"
+                self._changed()
+                return
+        self.feedback = ""
+        self.combo += 1
+        if self.combo % self.step_every == 0:
+            self.time_limit = max(self.min_limit, self.time_limit - self.step)
+        # The next prompt appears now, when the hit has actually reached us
+        self._next_kick(time.perf_counter())
+
+    def snapshot(self):
+        return dict(super().snapshot(), kick=self.kick, combo=self.combo,
+                    time_limit=self.time_limit, feedback=self.feedback)
+
+
+class TargetDrill(DrillSession):
+    """Cue a random paddle out of several on one holder; only a hit on that paddle counts.
+
+    Hits arrive in time order (DrillDispatcher.dispatch_frame), so when several
+    paddles report in the same frame the earliest hit after the cue decides the
+    round.  Pacing adapts: quick correct hits shorten the gap between cues and the
+    time allowed, misses and wrong-target hits lengthen them again.
+
+    cue(session) fires with session.target set to the paddle to hit.
+    """
+    def __init__(self, paddles, threshold, cue=None, on_update=None, rounds=20,
+                 min_delay=0.8, max_delay=2.0, timeout=1.5, window_delay=0.3,
+                 min_pace=0.4, max_pace=1.5, min_valid_ms=50):
+        if len(paddles) < 2:
+            raise ValueError("A target drill needs at least two paddles")
+        super().__init__(paddles, threshold, cue, on_update)
+        self.targets      = sorted(self.paddles)
+        self.rounds       = rounds
+        self.min_delay    = min_delay
+        self.max_delay    = max_delay
+        self.timeout      = timeout        # seconds allowed from cue to kick, at pace 1.0
+        self.window_delay = window_delay   # firmware hit window before a kick reaches us
+        self.min_pace     = min_pace
+        self.max_pace     = max_pace
+        self.min_valid_ms = min_valid_ms
+        self._reset()
+
+    def _reset(self):
+        self.pace        = 1.0
+        self.round       = 0
+        self.target      = None
+        self.cue_time    = None
+        self._cue_at     = None
+        self.hits        = 0
+        self.misses      = 0
+        self.wrong_hits  = 0
+        self.last_rt_ms  = None
+        self.reaction_times = {p: [] for p in self.targets}  # per-target, ms
+        self.wrong_by_target = {p: 0 for p in self.targets}  # wrong hits while p was lit
+
+    def start(self, now=None):
+        self._reset()
+        self.active = True
+        self._schedule(time.perf_counter() if now is None else now)
+
+    def _schedule(self, now):
+        self.target = None
+        self.cue_time = None
+        if self.round >= self.rounds:
+            self.active = False
+            self.status = f"Done – {self.hits} hits, {self.wrong_hits} wrong, {self.misses} missed"
+            log.info("Target drill done: %d hits, %d wrong, %d missed", self.hits, self.wrong_hits, self.misses,
+                     extra={"drill": "target", "paddles": self.targets, "hits": self.hits,
+                            "wrong": self.wrong_hits, "misses": self.misses})
+            self._changed()
+            return
+        self._cue_at = now + random.uniform(self.min_delay, self.max_delay) * self.pace
+        self.status = f"Round {self.round + 1}/{self.rounds}: get ready"
+        self._changed()
+
+    def _adjust_pace(self, factor):
+        self.pace = min(self.max_pace, max(self.min_pace, self.pace * factor))
+
+    def tick(self, now):
+        if not self.active:
+            return
+        if self._cue_at is not None and now >= self._cue_at:
+            self._cue_at = None
+            # Never light the same paddle twice in a row
+            choices = [p for p in self.targets if p != self.target] or self.targets
+            self.target = random.choice(choices)
+            self.round += 1
+            self.cue_time = now
+            self.status = f"Round {self.round}/{self.rounds}: KICK #{self.target + 1}!"
+            self._cue()
+            self._changed()
+        elif self.cue_time is not None and now - self.cue_time > self.timeout * self.pace + self.window_delay:
+            self.misses += 1
+            self._adjust_pace(1.15)
+            self._schedule(now)
+
+    def on_hit(self, event):
+        if not self.active or self.cue_time is None:
+            return
+        if event.max_force < self.threshold(event.paddle):
+            return
+        rt_ms = (event.t - self.cue_time) * 1000
+        if rt_ms < self.min_valid_ms:
+            return  # kick was already on its way before the cue
+        if event.paddle != self.target:
+            self.wrong_hits += 1
+            self.wrong_by_target[self.target] += 1
+            self._adjust_pace(1.15)
+            self.status = f"Round {self.round}/{self.rounds}: wrong paddle – KICK #{self.target + 1}!"
+            self._changed()
+            return
+        if rt_ms > self.timeout * self.pace * 1000:
+            return  # tick() will score this round as a miss
+        self.hits += 1
+        self.last_rt_ms = rt_ms
+        self.reaction_times[self.target].append(rt_ms)
+        self._adjust_pace(0.93)
+        self._schedule(time.perf_counter())
+
+    def mean_reaction_ms(self, paddle):
+        times = self.reaction_times.get(paddle)
+        return sum(times) / len(times) if times else None
+
+    def snapshot(self):
+        return dict(super().snapshot(), round=self.round, rounds=self.rounds,
+                    target=self.target if self.cue_time is not None else None,
+                    hits=self.hits, misses=self.misses, wrong_hits=self.wrong_hits,
+                    pace=self.pace, last_rt_ms=self.last_rt_ms)
+
+
+class ComboDrill(DrillSession):
+    """Prompted kick combos across paddles, recognised by a shared ComboMatcher.
+
+    Each round prompts one combo; the athlete has `time_limit` seconds (plus
+    the firmware/kick-merge delay) from the prompt to finish it, with the gaps
+    between steps enforced by the matcher.  Every other loaded combo is still
+    recognised, so a wrong combo gets named in the feedback.  With
+    prompted=False the drill just counts every combo it recognises.
+
+    classify  callable(event) -> kick name, or None when the kick type is unknown
+              (unknown kicks match any kick type)
+    """
+    def __init__(self, paddles, threshold, matcher, classify=None, cue=None, on_update=None,
+                 rounds=10, time_limit=4.0, window_delay=0.3, prompted=True):
+        super().__init__(paddles, threshold, cue, on_update)
+        self.matcher      = matcher
+        self.classify     = classify
+        self.rounds       = rounds
+        self.time_limit   = time_limit
+        self.window_delay = window_delay
+        self.prompted     = prompted
+        self._reset()
+
+    def _reset(self):
+        self.state       = self.matcher.start()
+        self.round       = 0
+        self.combo       = None      # name of the prompted combo
+        self.step        = 0         # steps of it done so far
+        self.prompt_time = None
+        self.completed   = 0
+        self.misses      = 0
+        self.recognised  = {}        # combo name -> times performed (any combo)
+        self.feedback    = ""
+
+    def start(self, now=None):
+        self._reset()
+        self.active = True
+        self._next_combo(time.perf_counter() if now is None else now)
+
+    def _next_combo(self, now):
+        self.state.reset()
+        self.step = 0
+        if not self.prompted:
+            self.combo = None
+            self.status = "Free play: any combo"
+            self._changed()
+            return
+        if self.round >= self.rounds:
+            self.active = False
+            self.status = f"Done – {self.completed}/{self.rounds} combos"
+            log.info("Combo drill done: %d/%d", self.completed, self.rounds,
+                     extra={"drill": "combo", "paddles": sorted(self.paddles), "completed": self.completed,
+                            "misses": self.misses, "recognised": self.recognised})
+            self._changed()
+            return
+        self.round += 1
+        self.combo = random.choice(list(self.matcher.combos))
+        self.prompt_time = now
+        self.status = self._prompt_text()
+        self._cue()
+        self._changed()
+
+    def _prompt_text(self):
+        steps = ", ".join(map(repr, self.matcher.combos[self.combo]))
+        return f"Round {self.round}/{self.rounds}: {self.combo}  [{steps}]  ({self.step}/{len(self.matcher.combos[self.combo])})"
+
+    def tick(self, now):
+        if (self.active and self.prompted and self.prompt_time is not None
+                and now - self.prompt_time > self.time_limit + self.window_delay):
+            self.misses += 1
+            self.feedback = f"Too slow for {self.combo}"
+            self._next_combo(now)
+
+    def on_hit(self, event):
+        if not self.active or event.max_force < self.threshold(event.paddle):
+            return
+        if self.prompted and event.t < self.prompt_time:
+            return  # started before this prompt was shown
+        kick = self.classify(event) if self.classify is not None else None
+        done = self.matcher.advance(self.state, event.paddle, kick, event.t)
+        for name in done:
+            self.recognised[name] = self.recognised.get(name, 0) + 1
+        if not self.prompted:
+            if done:
+                self.completed += 1
+                self.feedback = "  ".join(done)
+                self._changed()
+            return
+        if self.combo in done:
+            self.completed += 1
+            self.feedback = f"{self.combo}!"
+            log.info("Combo %s done in %.0f ms", self.combo, (event.t - self.prompt_time) * 1000,
+                     extra={"drill": "combo", "combo": self.combo, "paddles": sorted(self.paddles)})
+            self._next_combo(time.perf_counter())
+            return
+        self.step = self.matcher.progress(self.state, self.combo)
+        self.feedback = f"That was {done[0]}" if done else ""
+        self.status = self._prompt_text()
+        self._changed()
+
+    def snapshot(self):
+        return dict(super().snapshot(), combo=self.combo, step=self.step, round=self.round, rounds=self.rounds,
+                    completed=self.completed, misses=self.misses, feedback=self.feedback)
+
+
+# Sparring points by technique: kick -> (points, minimum force in N or None for the
+# paddle's drill threshold).  Turning kicks score more, as in WT scoring.
+SPARRING_POINTS = {
+    None:              (2, None),   # kick type unknown (athlete not trained)
+    "Front Kick":      (2, None),
+    "Roundhouse Kick": (2, None),
+    "Axe Kick":        (2, None),
+    "Front Hook Kick": (2, None),
+    "Back Kick":       (4, None),
+    "Back Hook kick":  (4, None),
+    "Tornado Kick":    (4, None),
+}
+SIDES = ("red", "blue")
+
+
+class SparringDrill(DrillSession):
+    """Two-competitor sparring: points by technique, simultaneous-hit rule, round timer.
+
+    red / blue  paddles whose hits score for that competitor (the targets the
+                opponent wears or holds)
+    points      kick -> (points, min force or None), see SPARRING_POINTS
+    classify    callable(event) -> kick name or None
+
+    Kicks are scored by first-contact time (HitEvent.t), not arrival: each is
+    held until horizon(paddles, now) has passed its t – the time before which
+    every kick on the bout's paddles has reached us (KickAggregator.horizon,
+    which waits for kicks still being merged) – and then committed strictly
+    in (t, paddle, hit_id) order.  Without a horizon, kicks are assumed to
+    arrive within window_delay.  However notifications bunch up, the same
+    kicks give the same bouts.  Kicks from both sides less than `simultaneous` seconds apart are
+    simultaneous: both score, or with cancel_simultaneous neither does.  A
+    kick counts for the round its first contact fell in, so one landing on
+    the bell still scores after the clock has stopped.
+    """
+    def __init__(self, red, blue, threshold, classify=None, cue=None, on_update=None,
+                 points=None, rounds=3, round_time=120.0, rest_time=30.0,
+                 simultaneous=0.05, cancel_simultaneous=False, window_delay=0.5, horizon=None):
+        if set(red) & set(blue):
+            raise ValueError("A paddle can't score for both competitors")
+        super().__init__(list(red) + list(blue), threshold, cue, on_update)
+        self.side_of      = {p: "red" for p in red}
+        self.side_of.update({p: "blue" for p in blue})
+        self.classify     = classify
+        self.points       = SPARRING_POINTS if points is None else points
+        self.rounds       = rounds
+        self.round_time   = round_time
+        self.rest_time    = rest_time
+        self.simultaneous = simultaneous
+        self.cancel_simultaneous = cancel_simultaneous
+        self.window_delay = window_delay
+        self.horizon      = horizon
+        self._reset()
+
+    def _reset(self):
+        self.score        = {side: 0 for side in SIDES}
+        self.round_score  = {side: 0 for side in SIDES}
+        self.hits         = {side: 0 for side in SIDES}
+        self.round        = 0
+        self.phase        = "ready"      # "fight", "rest", "done"
+        self.phase_end    = None
+        self.round_start  = None
+        self.round_end    = None
+        self.feedback     = ""
+        self.winner       = None
+        self._pending     = []           # heap of (t, paddle, hit_id, event)
+        self._last        = {side: None for side in SIDES}   # (t, points) of each side's last scored kick
+        self._clock_shown = None
+
+    def start(self, now=None):
+        self._reset()
+        self.active = True
+        self._start_round(time.perf_counter() if now is None else now)
+
+    def _start_round(self, now):
+        self.round += 1
+        self.round_score = {side: 0 for side in SIDES}
+        self.phase = "fight"
+        self.round_start = now
+        self.round_end = self.phase_end = now + self.round_time
+        self._cue()
+        self._update_status(now)
+
+    def on_hit(self, event):
+        if self.active and event.paddle in self.side_of:
+            heapq.heappush(self._pending, (event.t, event.paddle, event.hit_id, event))
+
+    def tick(self, now):
+        if not self.active:
+            return
+        pending, changed = self._pending, False
+        horizon = self.horizon(self.paddles, now) if self.horizon is not None else now - self.window_delay
+        while pending and pending[0][0] < horizon:
+            changed |= self._score(heapq.heappop(pending)[3])
+        if self.phase == "fight" and horizon > self.round_end:
+            self._end_round(now)
+            changed = True
+        elif self.phase == "rest" and now >= self.phase_end:
+            self._start_round(now)
+            changed = True
+        if self._update_status(now) or changed:
+            self._changed()
+
+    def _score(self, event):
+        if self.phase != "fight" or not self.round_start <= event.t <= self.round_end:
+            return False
+        if event.max_force < self.threshold(event.paddle):
+            return False
+        kick = self.classify(event) if self.classify is not None else None
+        points, min_force = self.points.get(kick, self.points[None])
+        if min_force is not None and event.max_force < min_force:
+            self.feedback = f"{kick}: {event.max_force:.0f} N, needs {min_force:.0f} N"
+            return True
+        side = self.side_of[event.paddle]
+        other = "blue" if side == "red" else "red"
+        last = self._last[other]
+        if last is not None and event.t - last[0] < self.simultaneous:
+            if self.cancel_simultaneous:
+                # Take back the opponent's kick and don't score this one
+                self.score[other] -= last[1]
+                self.round_score[other] -= last[1]
+                self.hits[other] -= 1
+                self._last[other] = None
+                self.feedback = f"Simultaneous ({(event.t - last[0]) * 1000:.0f} ms) – no points"
+                return True
+            self.feedback = f"Simultaneous ({(event.t - last[0]) * 1000:.0f} ms) – both score"
+        else:
+            self.feedback = f"{side.capitalize()} +{points}" + (f" ({kick})" if kick else "")
+        self.score[side] += points
+        self.round_score[side] += points
+        self.hits[side] += 1
+        self._last[side] = (event.t, points)
+        log.info("Sparring: %s +%d (%s, %.0f N)", side, points, kick or "kick", event.max_force,
+                 extra={"drill": "sparring", "side": side, "points": points, "kick": kick,
+                        "force": event.max_force, "paddle": event.paddle, "t": event.t})
+        return True
+
+    def _end_round(self, now):
+        log.info("Sparring round %d: red %d – blue %d", self.round, self.round_score["red"], self.round_score["blue"],
+                 extra={"drill": "sparring", "round": self.round, "score": dict(self.score)})
+        self._last = {side: None for side in SIDES}
+        if self.round >= self.rounds:
+            red, blue = self.score["red"], self.score["blue"]
+            self.winner = "red" if red > blue else "blue" if blue > red else None
+            self.phase = "done"
+            self.active = False
+            self.feedback = f"{self.winner.capitalize()} wins" if self.winner else "Draw"
+            return
+        self.phase = "rest"
+        self.phase_end = now + self.rest_time
+
+    def _update_status(self, now):
+        """Refresh the clock text; True if the shown second changed."""
+        if self.phase == "fight":
+            left = max(0.0, self.round_end - now)
+            clock = f"Round {self.round}/{self.rounds}  {int(left) // 60}:{int(left) % 60:02d}"
+        elif self.phase == "rest":
+            left = max(0.0, self.phase_end - now)
+            clock = f"Rest  0:{int(left):02d}  – round {self.round + 1} next"
+        else:
+            clock = "Bout over"
+        if clock == self._clock_shown:
+            return False
+        self._clock_shown = self.status = clock
+        return True
+
+    def stop(self):
+        self._pending = []
+        super().stop()
+
+    def snapshot(self):
+        return dict(super().snapshot(), round=self.round, rounds=self.rounds, phase=self.phase,
+                    score=dict(self.score), round_score=dict(self.round_score), hits=dict(self.hits),
+                    feedback=self.feedback, winner=self.winner)
+
+
+class DrillDispatcher:
+    """Routes hit events to every session bound to the hitting paddle and ticks them all.
+
+    on_session_update  callable(session) fired after any session's own on_update,
+                       e.g. to publish drill state to scoreboards
+    """
+    def __init__(self, on_session_update=None):
+        self._sessions = []
+        self._by_paddle = {}   # paddle -> [sessions]
+        self.on_session_update = on_session_update
+
+    @property
+    def sessions(self):
+        return list(self._sessions)
+
+    def active_paddles(self):
+        """Paddles bound to at least one running session."""
+        return {p for s in self._sessions if s.active for p in s.paddles}
+
+    def drill_for(self, paddle):
+        """Name of the drill running on `paddle` ("ReactionDrill"...), or None."""
+        for session in self._by_paddle.get(paddle, ()):
+            if session.active:
+                return type(session).__name__
+        return None
+
+    def add(self, session: DrillSession):
+        inner = session.on_update
+        def on_update(s, inner=inner):
+            if inner is not None:
+                inner(s)
+            if self.on_session_update is not None:
+                self.on_session_update(s)
+        session.on_update = on_update
+        self._sessions.append(session)
+        for p in session.paddles:
+            self._by_paddle.setdefault(p, []).append(session)
+        return session
+
+    def remove(self, session: DrillSession):
+        if session in self._sessions:
+            self._sessions.remove(session)
+            for p in session.paddles:
+                self._by_paddle[p].remove(session)
+
+    def clear(self):
+        self._sessions = []
+        self._by_paddle = {}
+
+    def dispatch(self, event: HitEvent):
+        for session in self._by_paddle.get(event.paddle, ()):
+            if session.active:
+                session.on_hit(event)
+
+    def dispatch_frame(self, events):
+        """Dispatch every hit gathered in one UI frame in the order the kicks happened.
+
+        Paddles are polled in index order, but what matters is when each kick
+        started; sorting on HitEvent.t keeps multi-paddle drills fair when several
+        paddles report in the same frame.
+        """
+        if len(events) > 1:
+            events = sorted(events, key=lambda e: e.t)
+        for event in events:
+            self.dispatch(event)
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        for session in self._sessions:
+            if session.active:
+                session.tick(now)
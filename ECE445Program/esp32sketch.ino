@@ -8,30 +8,68 @@
 #define CHARACTERISTIC_UUID_RX "6e400002-b5a3-f393-e0a9-e50e24dcca9e"
 #define CHARACTERISTIC_UUID_TX "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
 
-// Force sensor pins
-const int forceSensorPin1 = 17;  // GPIO 10
-const int forceSensorPin2 = 12;  // GPIO 2
+// Force sensor pins (one per FlexiForce sensor; the host's PaddleLayout lists
+// sensor positions in this same order).  Add pins here for 4–8 sensor paddles.
+const int forceSensorPins[] = {17, 12};  // GPIO 10, GPIO 2
+const int NUM_SENSORS = sizeof(forceSensorPins) / sizeof(forceSensorPins[0]);
 
 // Calibration values
 const int MIN_SENSOR_VAL = 0;     // Raw sensor value at 0 force
 const int MAX_SENSOR_VAL = 4095;  // Raw sensor value at max force (3V on ESP32)
-const float MAX_FORCE_NEWTONS = 1500.0;  // Maximum force in Newtons at 3V
+float maxForceNewtons = 1500.0;  // Maximum force in Newtons at 3V (host: MAXFORCE command)
 
 // Continuous reading control
 bool continuousReading = false;
 unsigned long lastReadingTime = 0;
-const unsigned long READING_INTERVAL = 10; // Read sensors every 10ms
+unsigned long readingInterval = 10; // Read sensors every 10ms (host: RATE command)
+int numSamples = 5;                 // ADC reads averaged per sample (host: SAMPLES command)
 
 // Peak detection variables
 unsigned long lastSendTime = 0;
-const unsigned long SEND_INTERVAL = 300; // Regular heartbeat interval and hit detection window
-float peakForce1 = 0.0;
-float peakForce2 = 0.0;
+unsigned long sendInterval = 300; // Hit detection window (host: WINDOW command)
+unsigned long heartbeatInterval = 300; // Idle heartbeat period; the host stretches it for idle paddles (HEARTBEAT)
+float peakForces[NUM_SENSORS] = {0.0};
 bool hasPeakAboveThreshold = false;
-const float FORCE_THRESHOLD = 220.0; // Hit threshold (220N)
+float forceThreshold = 220.0; // Hit threshold (220N until the host sends THRESHOLD)
+float idlePeakForce = 0.0;    // largest reading outside hit windows since the last heartbeat
+uint16_t notifySeq = 0;       // ";s=" on every hit/heartbeat so the host can count lost notifications
 bool inHitDetectionWindow = false;
 unsigned long hitStartTime = 0;
 
+// Raw sample stream for the host's live waveform plot (host: STREAM command).
+// Every sample's forces are appended as whole newtons and sent as one
+// "r=<sensors>:f,f,...,f" notification per streamBatch samples; 0 = off.
+int streamBatch = 0;
+int streamCount = 0;
+char streamStr[200];
+int streamLen = 0;
+const int STREAM_VALUE_CHARS = 6;   // widest value plus its comma: "20000," (MAXFORCE caps at 20000)
+
+// Waveform features of the current hit window (used by the host's kick classifier)
+float peakTotalForce = 0.0;        // largest summed force seen in the window
+unsigned long peakTime = 0;        // when peakTotalForce occurred
+unsigned int samplesAboveThreshold = 0;
+float hitImpulse = 0.0;            // integral of summed force over the window, N·s
+
+// Cue outputs driven by host commands (wire a cue LED / piezo to these pins)
+const int LED_PIN = 13;
+const int BUZZER_PIN = 14;
+bool ledOn = false;
+unsigned long ledOffTime = 0;
+
+// Host command channel: "CMD:<seq>:<NAME>[:<args>]", answered with "ACK:<seq>"
+// or "NAK:<seq>:<reason>".  Commands arrive write-without-response, several in
+// flight at once, and may be resent, so a repeat of any recently run sequence
+// number is acked but not re-run.  A host may number afresh when it reconnects,
+// so the window is cleared on connect.
+const int RECENT_SEQS = 16;
+long recentSeqs[RECENT_SEQS];
+int recentNext = 0;
+const int ACK_QUEUE_SIZE = 16;
+char ackQueue[ACK_QUEUE_SIZE][32];   // acks are notified from loop(), not the BLE callback
+volatile int ackHead = 0;
+volatile int ackTail = 0;
+
 BLEServer *pServer = NULL;
 BLECharacteristic *pTxCharacteristic = NULL;
 bool deviceConnected = false;
@@ -39,10 +77,13 @@ bool oldDeviceConnected = false;
 
 // Function declaration (needs to be before it's used)
 float calculateForce(int sensorValue);
+void handleCommand(const String &msg);
+void forgetCommandSeqs();
 
 class MyServerCallbacks: public BLEServerCallbacks {
     void onConnect(BLEServer* pServer) {
       deviceConnected = true;
+      forgetCommandSeqs();
       Serial.println("Client connected!");
     };
 
@@ -62,13 +103,17 @@ class MyCallbacks: public BLECharacteristicCallbacks {
         Serial.print("Received: ");
         Serial.println(rxValue);
         
+        // Sequence-numbered command from the host's command channel
+        if (rxValue.startsWith("CMD:")) {
+          rxValue.trim();
+          handleCommand(rxValue);
+        }
         // Process START_FORCE_READING command
-        if (rxValue == "START_FORCE_READING\n" || rxValue == "START_FORCE_READING") {
+        else if (rxValue == "START_FORCE_READING\n" || rxValue == "START_FORCE_READING") {
           continuousReading = true;
           Serial.println("Starting continuous force readings");
           // Reset peak detection
-          peakForce1 = 0.0;
-          peakForce2 = 0.0;
+          for (int s = 0; s < NUM_SENSORS; s++) peakForces[s] = 0.0;
           lastSendTime = millis();
           hasPeakAboveThreshold = false;
           inHitDetectionWindow = false;
@@ -82,14 +127,113 @@ class MyCallbacks: public BLECharacteristicCallbacks {
     }
 };
 
+void queueAck(long seq, const char *error) {
+  int next = (ackHead + 1) % ACK_QUEUE_SIZE;
+  if (next == ackTail) return;  // queue full: the host will resend
+  if (error) {
+    snprintf(ackQueue[ackHead], sizeof(ackQueue[0]), "NAK:%ld:%s", seq, error);
+  } else {
+    snprintf(ackQueue[ackHead], sizeof(ackQueue[0]), "ACK:%ld", seq);
+  }
+  ackHead = next;
+}
+
+void forgetCommandSeqs() {
+  for (int i = 0; i < RECENT_SEQS; i++) recentSeqs[i] = -1;
+  recentNext = 0;
+}
+
+bool ranRecently(long seq) {
+  for (int i = 0; i < RECENT_SEQS; i++) {
+    if (recentSeqs[i] == seq) return true;
+  }
+  return false;
+}
+
+void handleCommand(const String &msg) {
+  // msg is "CMD:<seq>:<NAME>[:<args>]"
+  int p1 = msg.indexOf(':', 4);
+  if (p1 < 0) return;
+  long seq = msg.substring(4, p1).toInt();
+  int p2 = msg.indexOf(':', p1 + 1);
+  String name = p2 < 0 ? msg.substring(p1 + 1) : msg.substring(p1 + 1, p2);
+  String args = p2 < 0 ? "" : msg.substring(p2 + 1);
+
+  if (ranRecently(seq)) {
+    queueAck(seq, NULL);  // resend of a command we already ran; our ACK was lost
+    return;
+  }
+
+  const char *error = NULL;
+  if (name == "LED") {
+    // LED:<duration_ms>
+    digitalWrite(LED_PIN, HIGH);
+    ledOn = true;
+    ledOffTime = millis() + args.toInt();
+  } else if (name == "BUZZ") {
+    // BUZZ:<freq_hz>,<duration_ms>
+    int comma = args.indexOf(',');
+    if (comma < 0) error = "args";
+    else tone(BUZZER_PIN, args.substring(0, comma).toInt(), args.substring(comma + 1).toInt());
+  } else if (name == "THRESHOLD") {
+    // THRESHOLD:<newtons>
+    float value = args.toFloat();
+    if (value > 0 && value < maxForceNewtons) forceThreshold = value;
+    else error = "range";
+  } else if (name == "RATE") {
+    // RATE:<reading interval ms>
+    long value = args.toInt();
+    if (value >= 2 && value <= 1000) readingInterval = value;
+    else error = "range";
+  } else if (name == "WINDOW") {
+    // WINDOW:<hit window / heartbeat ms>
+    long value = args.toInt();
+    if (value >= 20 && value <= 10000) sendInterval = heartbeatInterval = value;
+    else error = "range";
+  } else if (name == "HEARTBEAT") {
+    // HEARTBEAT:<idle heartbeat ms> – hits are still sent the moment their window closes
+    long value = args.toInt();
+    if (value >= 20 && value <= 60000) heartbeatInterval = value;
+    else error = "range";
+  } else if (name == "SAMPLES") {
+    // SAMPLES:<ADC reads averaged per sample>
+    long value = args.toInt();
+    if (value >= 1 && value <= 32) numSamples = value;
+    else error = "range";
+  } else if (name == "STREAM") {
+    // STREAM:<samples per notification>, 0 turns the raw stream off
+    long value = args.toInt();
+    long most = (sizeof(streamStr) - 8) / (NUM_SENSORS * STREAM_VALUE_CHARS);   // 8: "r=<n>:" and the NUL
+    if (value >= 0 && value <= most) {
+      streamBatch = value;
+      streamCount = 0;
+      streamLen = 0;
+    }
+    else error = "range";
+  } else if (name == "MAXFORCE") {
+    // MAXFORCE:<newtons at full-scale ADC>
+    float value = args.toFloat();
+    if (value > forceThreshold && value <= 20000) maxForceNewtons = value;
+    else error = "range";
+  } else {
+    error = "unknown";
+  }
+
+  if (!error) {
+    recentSeqs[recentNext] = seq;
+    recentNext = (recentNext + 1) % RECENT_SEQS;
+  }
+  queueAck(seq, error);
+}
+
 float calculateForce(int sensorValue) {
   // Map the raw sensor value to force in Newtons
   // Direct linear mapping without integer division/multiplication to avoid precision loss
-  float force = (sensorValue - MIN_SENSOR_VAL) * MAX_FORCE_NEWTONS / (MAX_SENSOR_VAL - MIN_SENSOR_VAL);
+  float force = (sensorValue - MIN_SENSOR_VAL) * maxForceNewtons / (MAX_SENSOR_VAL - MIN_SENSOR_VAL);
   
   // Constrain force value
   if (force < 0) force = 0;
-  if (force > MAX_FORCE_NEWTONS) force = MAX_FORCE_NEWTONS;
+  if (force > maxForceNewtons) force = maxForceNewtons;
   
   return force;
 }
@@ -97,6 +241,12 @@ float calculateForce(int sensorValue) {
 void setup() {
   Serial.begin(115200);
   Serial.println("Starting BLE Force Sensor");
+  forgetCommandSeqs();
+
+  // Cue outputs
+  pinMode(LED_PIN, OUTPUT);
+  digitalWrite(LED_PIN, LOW);
+  pinMode(BUZZER_PIN, OUTPUT);
 
   // Initialize the BLE device
   BLEDevice::init("ESP32_1");
@@ -144,35 +294,66 @@ void loop() {
   if (deviceConnected && !oldDeviceConnected) {
     oldDeviceConnected = deviceConnected;
   }
+
+  // Send command acknowledgements queued by the BLE callback
+  while (deviceConnected && ackTail != ackHead) {
+    pTxCharacteristic->setValue(ackQueue[ackTail]);
+    pTxCharacteristic->notify();
+    ackTail = (ackTail + 1) % ACK_QUEUE_SIZE;
+  }
+
+  // Turn the cue LED off once its time is up
+  if (ledOn && (long)(millis() - ledOffTime) >= 0) {
+    digitalWrite(LED_PIN, LOW);
+    ledOn = false;
+  }
   
   // If continuous reading is enabled and we're connected, monitor force readings
   if (deviceConnected && continuousReading) {
     unsigned long currentTime = millis();
     
-    // Read sensors at READING_INTERVAL (every 10ms)
-    if (currentTime - lastReadingTime >= READING_INTERVAL) {
+    // Read sensors at readingInterval (every 10ms)
+    if (currentTime - lastReadingTime >= readingInterval) {
       lastReadingTime = currentTime;
       
       // Read force sensor values with multiple samples to reduce noise
-      int raw1 = 0;
-      int raw2 = 0;
-      const int numSamples = 5;  // Take 5 samples and average them
+      int raw[NUM_SENSORS] = {0};
       
       for (int i = 0; i < numSamples; i++) {
-        raw1 += analogRead(forceSensorPin1);
-        raw2 += analogRead(forceSensorPin2);
+        for (int s = 0; s < NUM_SENSORS; s++) {
+          raw[s] += analogRead(forceSensorPins[s]);
+        }
         delayMicroseconds(500);  // Short delay between readings
       }
       
-      raw1 /= numSamples;
-      raw2 /= numSamples;
-      
       // Calculate forces
-      float force1 = calculateForce(raw1);
-      float force2 = calculateForce(raw2);
+      float forces[NUM_SENSORS];
+      bool isAboveThreshold = false;
+      for (int s = 0; s < NUM_SENSORS; s++) {
+        raw[s] /= numSamples;
+        forces[s] = calculateForce(raw[s]);
+        // Check if any force is above threshold
+        if (forces[s] >= forceThreshold) isAboveThreshold = true;
+        // Track the idle noise floor for the host: only samples that won't open or
+        // join a hit window, or every hit's first sample would be reported as idle
+        if (!inHitDetectionWindow && forces[s] < forceThreshold && forces[s] > idlePeakForce) idlePeakForce = forces[s];
+      }
       
-      // Check if either force is above threshold
-      bool isAboveThreshold = (force1 >= FORCE_THRESHOLD || force2 >= FORCE_THRESHOLD);
+      // Raw stream: batch this sample's forces for the host's waveform plot
+      if (streamBatch > 0) {
+        if (streamCount == 0) streamLen = snprintf(streamStr, sizeof(streamStr), "r=%d:", NUM_SENSORS);
+        for (int s = 0; s < NUM_SENSORS; s++) {
+          int room = sizeof(streamStr) - streamLen;
+          int n = snprintf(streamStr + streamLen, room, "%d,", (int)forces[s]);
+          if (n > 0) streamLen += (n < room) ? n : room - 1;   // truncated, never overrun
+        }
+        if (++streamCount >= streamBatch) {
+          streamStr[streamLen - 1] = '\0';  // drop the trailing comma
+          pTxCharacteristic->setValue(streamStr);
+          pTxCharacteristic->notify();
+          streamCount = 0;
+        }
+      }
       
       // Start or continue hit detection window if above threshold
       if (isAboveThreshold) {
@@ -180,29 +361,51 @@ void loop() {
           // Start a new hit detection window
           inHitDetectionWindow = true;
           hitStartTime = currentTime;
-          peakForce1 = force1;  // Initialize peak values with current values
-          peakForce2 = force2;
+          for (int s = 0; s < NUM_SENSORS; s++) {
+            peakForces[s] = forces[s];  // Initialize peak values with current values
+          }
           hasPeakAboveThreshold = true;
+          peakTotalForce = 0.0;
+          peakTime = currentTime;
+          samplesAboveThreshold = 0;
+          hitImpulse = 0.0;
         } else {
           // Already in a hit window, update peaks if needed
-          if (force1 > peakForce1) {
-            peakForce1 = force1;
-          }
-          if (force2 > peakForce2) {
-            peakForce2 = force2;
+          for (int s = 0; s < NUM_SENSORS; s++) {
+            if (forces[s] > peakForces[s]) {
+              peakForces[s] = forces[s];
+            }
           }
         }
       }
       
+      // Accumulate waveform features for every sample inside the window
+      if (inHitDetectionWindow) {
+        float totalForce = 0.0;
+        for (int s = 0; s < NUM_SENSORS; s++) totalForce += forces[s];
+        hitImpulse += totalForce * readingInterval / 1000.0;
+        if (isAboveThreshold) samplesAboveThreshold++;
+        if (totalForce > peakTotalForce) {
+          peakTotalForce = totalForce;
+          peakTime = currentTime;
+        }
+      }
+      
       // Check if hit detection window has expired
-      if (inHitDetectionWindow && (currentTime - hitStartTime >= SEND_INTERVAL)) {
+      if (inHitDetectionWindow && (currentTime - hitStartTime >= sendInterval)) {
         // Hit window completed, send peak values and time since first detection
         unsigned long timeSinceHitDetection = currentTime - hitStartTime;
         unsigned long timeSinceLastSend = hitStartTime - lastSendTime;
         
-        // Increase buffer size to accommodate the additional timing values
-        char peakStr[40];
-        sprintf(peakStr, "%.1f,%.1f,%lu,%lu", peakForce1, peakForce2, timeSinceLastSend, timeSinceHitDetection);
+        // "force1,...,forceN,time_since_last,time_since_hit;w=rise_ms,duration_ms,impulse;s=seq"
+        // – sized for up to 8 sensors
+        char peakStr[176];
+        int len = 0;
+        for (int s = 0; s < NUM_SENSORS; s++) {
+          len += sprintf(peakStr + len, "%.1f,", peakForces[s]);
+        }
+        sprintf(peakStr + len, "%lu,%lu;w=%lu,%lu,%.2f;s=%u", timeSinceLastSend, timeSinceHitDetection,
+                peakTime - hitStartTime, samplesAboveThreshold * readingInterval, hitImpulse, notifySeq++);
         
         // Send peak values
         pTxCharacteristic->setValue(peakStr);
@@ -213,8 +416,7 @@ void loop() {
         
         // Reset for next hit
         inHitDetectionWindow = false;
-        peakForce1 = 0.0;
-        peakForce2 = 0.0;
+        for (int s = 0; s < NUM_SENSORS; s++) peakForces[s] = 0.0;
         hasPeakAboveThreshold = false;
         lastSendTime = currentTime;  // Update last send time to avoid immediate heartbeat
       }
@@ -222,29 +424,39 @@ void loop() {
       // Debug print less frequently to avoid flooding Serial
       if ((currentTime / 1000) % 1 == 0) {
         Serial.print("Current reading: ");
-        char currentStr[20];
-        sprintf(currentStr, "%.1f,%.1f", force1, force2);
-        Serial.print(currentStr);
+        for (int s = 0; s < NUM_SENSORS; s++) {
+          if (s) Serial.print(",");
+          Serial.print(forces[s], 1);
+        }
         Serial.print(" (Raw values: ");
-        Serial.print(raw1);
-        Serial.print(",");
-        Serial.print(raw2);
+        for (int s = 0; s < NUM_SENSORS; s++) {
+          if (s) Serial.print(",");
+          Serial.print(raw[s]);
+        }
         Serial.println(")");
         
         if (inHitDetectionWindow) {
           Serial.print("In hit window, current peaks: ");
-          Serial.print(peakForce1);
-          Serial.print(",");
-          Serial.println(peakForce2);
+          for (int s = 0; s < NUM_SENSORS; s++) {
+            if (s) Serial.print(",");
+            Serial.print(peakForces[s]);
+          }
+          Serial.println();
         }
       }
     }
     
-    // Send heartbeat readings every SEND_INTERVAL when no hit is in progress
-    if (!inHitDetectionWindow && (currentTime - lastSendTime >= SEND_INTERVAL)) {
-      // Send a zero reading as heartbeat (with zero time differences)
-      char heartbeatStr[40];
-      sprintf(heartbeatStr, "0.0,0.0,0,0");
+    // Send heartbeat readings every heartbeatInterval when no hit is in progress
+    if (!inHitDetectionWindow && (currentTime - lastSendTime >= heartbeatInterval)) {
+      // Send a zero reading as heartbeat (with zero time differences),
+      // tagged with the idle noise peak: "0.0,...,0.0,0,0;n=idle_peak;s=seq"
+      char heartbeatStr[96];
+      int len = 0;
+      for (int s = 0; s < NUM_SENSORS; s++) {
+        len += sprintf(heartbeatStr + len, "0.0,");
+      }
+      sprintf(heartbeatStr + len, "0,0;n=%.1f;s=%u", idlePeakForce, notifySeq++);
+      idlePeakForce = 0.0;
       
       pTxCharacteristic->setValue(heartbeatStr);
       pTxCharacteristic->notify();
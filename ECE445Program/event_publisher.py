@@ -0,0 +1,233 @@
+# event_publisher.py  – WebSocket fan‑out of live hit events and drill state to scoreboards
+#
+#   python main.py --publish 0.0.0.0:8765        (or PADDLE_PUBLISH=0.0.0.0:8765)
+#   python event_publisher.py ws://127.0.0.1:8765/?topics=hit,drill    # print a live feed
+#
+# Browsers connect with `new WebSocket("ws://<laptop>:8765/?topics=drill")`.  Every
+# frame is JSON: {"t": wall time, "events": [{"topic": ..., ...}, ...]}.
+import asyncio, base64, hashlib, json, os, struct, sys, threading, time
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from app_log import get_logger
+
+log = get_logger("publish")
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def ws_frame(payload: bytes, opcode=0x1, mask=False):
+    """Encode one unfragmented WebSocket frame (servers send unmasked, clients masked)."""
+    n = len(payload)
+    head = bytes([0x80 | opcode])
+    mbit = 0x80 if mask else 0
+    if n < 126:
+        head += bytes([mbit | n])
+    elif n < 1 << 16:
+        head += bytes([mbit | 126]) + struct.pack("!H", n)
+    else:
+        head += bytes([mbit | 127]) + struct.pack("!Q", n)
+    if not mask:
+        return head + payload
+    key = os.urandom(4)
+    return head + key + bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+
+
+async def ws_read_frame(reader):
+    """(opcode, payload) of the next frame; unmasks client frames."""
+    b1, b2 = await reader.readexactly(2)
+    n = b2 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    key = await reader.readexactly(4) if b2 & 0x80 else None
+    payload = await reader.readexactly(n)
+    if key:
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return b1 & 0x0F, payload
+
+
+class _Subscriber:
+    """One connected client: its own bounded frame queue and writer task."""
+    def __init__(self, writer, topics, queue_size):
+        self.writer  = writer
+        self.topics  = topics          # None = everything
+        self.frames  = deque(maxlen=queue_size)   # full → the oldest frame falls out
+        self.dropped = 0
+        self.ready   = asyncio.Event()
+        self.peer    = writer.get_extra_info("peername")
+
+    def offer(self, frame):
+        if len(self.frames) == self.frames.maxlen:
+            self.dropped += 1
+        self.frames.append(frame)
+        self.ready.set()
+
+
+class EventPublisher:
+    """Fans hit events and drill state out to any number of WebSocket subscribers.
+
+    publish() only appends to a deque and, at most once per batch, wakes the
+    publisher's own asyncio thread – it never blocks and never touches a
+    socket, so a slow or stuck client can't stall BLE ingest or the UI.
+    Events are batched every `batch_ms` into one JSON frame per topic set,
+    encoded once and shared by all subscribers with the same topics.  Each
+    subscriber has a bounded queue; when it falls behind the oldest frames are
+    dropped (and counted), so it always catches up to live data.
+    """
+    def __init__(self, host="127.0.0.1", port=8765, queue_size=64, batch_ms=20):
+        self.host       = host
+        self.port       = port
+        self.queue_size = queue_size
+        self.batch_ms   = batch_ms
+        self.subscribers = []
+        self.published  = 0
+        self._pending   = deque() # (topic, dict) from any thread; append/popleft are atomic
+        self._scheduled = False
+        self._loop      = None
+        self._server    = None
+        self._started   = threading.Event()
+
+    # ---------- any thread ----------
+    def start(self):
+        """Start serving on a background thread; returns the bound port."""
+        threading.Thread(target=self._run, name="event-publisher", daemon=True).start()
+        self._started.wait(timeout=5)
+        return self.port
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def publish(self, topic, event):
+        """Queue one event (a JSON-able dict) for the next batch."""
+        self._pending.append((topic, event))
+        if not self._scheduled and self._loop is not None:
+            self._scheduled = True
+            self._loop.call_soon_threadsafe(self._loop.call_later, self.batch_ms / 1000.0, self._flush)
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "published": self.published,
+                "dropped": {str(s.peer): s.dropped for s in self.subscribers}}
+
+    # ---------- publisher thread ----------
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._serve, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("Publishing events on ws://%s:%d/", self.host, self.port)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for sub in self.subscribers:
+                sub.writer.close()
+
+    def _flush(self):
+        self._scheduled = False
+        pending = []
+        while self._pending:
+            pending.append(self._pending.popleft())
+        if not pending or not self.subscribers:
+            return
+        self.published += len(pending)
+        now = time.time()
+        frames = {}   # topic filter -> encoded frame, so each distinct frame is encoded once
+        for sub in self.subscribers:
+            key = sub.topics
+            if key not in frames:
+                events = [dict(e, topic=t) for t, e in pending if key is None or t in key]
+                frames[key] = ws_frame(json.dumps({"t": now, "events": events}).encode()) if events else None
+            if frames[key] is not None:
+                sub.offer(frames[key])
+
+    async def _serve(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            writer.close()
+            return
+        lines = request.decode("latin-1").split("\r\n")
+        headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+        key = headers.get("sec-websocket-key")
+        if not key:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        query = parse_qs(urlsplit(lines[0].split(" ")[1] if " " in lines[0] else "/").query)
+        topics = frozenset(t for v in query.get("topics", []) for t in v.split(",") if t) or None
+
+        sub = _Subscriber(writer, topics, self.queue_size)
+        self.subscribers.append(sub)
+        log.info("Subscriber %s connected (topics: %s)", sub.peer, ",".join(sorted(topics)) if topics else "all")
+        sender = asyncio.ensure_future(self._send_loop(sub))
+        try:
+            while True:
+                opcode, payload = await ws_read_frame(reader)
+                if opcode == 0x8:        # close
+                    break
+                if opcode == 0x9:        # ping
+                    writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            sender.cancel()
+            self.subscribers.remove(sub)
+            writer.close()
+            log.info("Subscriber %s left (%d frames dropped)", sub.peer, sub.dropped)
+
+    async def _send_loop(self, sub):
+        try:
+            while True:
+                await sub.ready.wait()
+                sub.ready.clear()
+                while sub.frames:
+                    sub.writer.write(sub.frames.popleft())
+                # Only this subscriber's task waits on its socket
+                await sub.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+async def subscribe(url, on_frame, max_frames=None):
+    """Minimal client: connect to `url` and call on_frame(dict) for each frame received."""
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    key = base64.b64encode(os.urandom(16)).decode()
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    writer.write((f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                  f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+    await reader.readuntil(b"\r\n\r\n")
+    count = 0
+    try:
+        while max_frames is None or count < max_frames:
+            opcode, payload = await ws_read_frame(reader)
+            if opcode == 0x8:
+                break
+            if opcode == 0x1:
+                count += 1
+                on_frame(json.loads(payload))
+    finally:
+        writer.write(ws_frame(b"", opcode=0x8, mask=True))
+        writer.close()
+
+
+def parse_address(text, default_port=8765):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port)) if port.isdigit() else (text or "127.0.0.1", default_port)
+
+
+if __name__ == "__main__":
+    url = sys.argv[1] if len(sys.argv) > 1 else "ws://127.0.0.1:8765/"
+    try:
+        asyncio.run(subscribe(url, lambda frame: print(json.dumps(frame))))
+    except KeyboardInterrupt:
+        pass
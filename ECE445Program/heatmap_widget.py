@@ -0,0 +1,92 @@
+# heatmap_widget.py  – paddle hit-location heat map for the force screen
+from PySide6 import QtWidgets, QtGui, QtCore
+
+class HitHeatMap(QtWidgets.QWidget):
+    """Accumulates hit locations on a fixed grid and paints them over the paddle outline."""
+    GRID = 24  # cells per side
+
+    def __init__(self, layout, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(160, 160)
+        self._counts = [0] * (self.GRID * self.GRID)
+        self._peak   = 0
+        self._last   = None
+        self.set_layout(layout)
+
+    def set_layout(self, layout):
+        self._layout = layout
+        # Leave a margin around the 0 % accuracy edge so off-target hits still show
+        self._extent = layout.radius * 1.25
+        self.clear()
+
+    def clear(self):
+        self._counts = [0] * (self.GRID * self.GRID)
+        self._peak = 0
+        self._last = None
+        self.update()
+
+    def add_hit(self, x, y):
+        """Record one hit at paddle coordinates (mm)."""
+        g = self.GRID
+        col = int((x + self._extent) / (2 * self._extent) * g)
+        row = int((self._extent - y) / (2 * self._extent) * g)
+        col = min(g - 1, max(0, col))
+        row = min(g - 1, max(0, row))
+        i = row * g + col
+        self._counts[i] += 1
+        if self._counts[i] > self._peak:
+            self._peak = self._counts[i]
+        self._last = (x, y)
+        self.update()
+
+    # ---------- painting ----------
+    def _to_px(self, x, y, scale, cx, cy):
+        return QtCore.QPointF(cx + x * scale, cy - y * scale)
+
+    def paintEvent(self, _event):
+        p = QtGui.QPainter(self)
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
+        side = min(self.width(), self.height())
+        cx, cy = self.width() / 2, self.height() / 2
+        scale = side / (2 * self._extent)
+        p.fillRect(self.rect(), QtGui.QColor("#1b1b1b"))
+
+        # Heat cells: blue (few hits) → red (most hits)
+        g = self.GRID
+        cell = side / g
+        left, top = cx - side / 2, cy - side / 2
+        if self._peak:
+            p.setPen(QtCore.Qt.NoPen)
+            for i, n in enumerate(self._counts):
+                if not n:
+                    continue
+                t = n / self._peak
+                color = QtGui.QColor.fromHsvF(0.66 * (1 - t), 1.0, 1.0, 0.25 + 0.6 * t)
+                p.fillRect(QtCore.QRectF(left + (i % g) * cell, top + (i // g) * cell,
+                                         cell + 0.5, cell + 0.5), color)
+
+        # Paddle outline at the 0 % accuracy radius
+        lay = self._layout
+        r = lay.radius * scale
+        centre = self._to_px(lay.sweet_spot[0], lay.sweet_spot[1], scale, cx, cy)
+        p.setPen(QtGui.QPen(QtGui.QColor("#bdc3c7"), 2))
+        p.setBrush(QtCore.Qt.NoBrush)
+        p.drawEllipse(centre, r, r)
+
+        # Sweet spot cross
+        p.setPen(QtGui.QPen(QtGui.QColor("#27ae60"), 2))
+        p.drawLine(centre + QtCore.QPointF(-6, 0), centre + QtCore.QPointF(6, 0))
+        p.drawLine(centre + QtCore.QPointF(0, -6), centre + QtCore.QPointF(0, 6))
+
+        # Sensors
+        p.setPen(QtCore.Qt.NoPen)
+        p.setBrush(QtGui.QColor("#3498db"))
+        for sx, sy in lay.positions:
+            p.drawEllipse(self._to_px(sx, sy, scale, cx, cy), 4, 4)
+
+        # Most recent hit
+        if self._last is not None:
+            p.setPen(QtGui.QPen(QtGui.QColor("white"), 2))
+            p.setBrush(QtCore.Qt.NoBrush)
+            p.drawEllipse(self._to_px(self._last[0], self._last[1], scale, cx, cy), 7, 7)
+        p.end()
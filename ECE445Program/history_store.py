@@ -0,0 +1,379 @@
+# history_store.py  – on-disk min/max/mean pyramid of raw force streams, for history browsing
+#
+#   python main.py --history history/            (or PADDLE_HISTORY=history/) records every raw stream
+#   python history_store.py history/ ls
+#   python history_store.py history/ query ESP32_1 --last 3600 --points 600
+#
+# Layout: <root>/<device>/<YYYYmmdd-HHMMSS>/ holds meta.json and one file per level.
+# L0.f32 is the raw samples (float32, interleaved by sensor); Lk.f32 holds one record
+# per fanout**k samples: min of every sensor, then max of every sensor, then mean.
+# Hits go to <root>/_hits/<YYYY-MM-DD>.jsonl, one JSON object per hit (see HitWriter).
+import argparse, json, os, sys, time
+from array import array
+from dataclasses import dataclass
+from app_log import get_logger
+
+log = get_logger("history")
+
+
+def _fold(block, channels, rows, raw):
+    """One pyramid record (mins, maxs, means) from `rows` consecutive rows of block."""
+    out = array('f', bytes(12 * channels))
+    if raw:
+        for c in range(channels):
+            col = block[c::channels]
+            out[c], out[channels + c], out[2 * channels + c] = min(col), max(col), sum(col) / rows
+    else:
+        stride = 3 * channels
+        for c in range(channels):
+            out[c] = min(block[c::stride])
+            out[channels + c] = max(block[channels + c::stride])
+            out[2 * channels + c] = sum(block[2 * channels + c::stride]) / rows
+    return out
+
+
+@dataclass
+class Series:
+    """Result of a range query: one point per `step` seconds from t0, per sensor.
+
+    At level 0 the three lists hold the same raw arrays.
+    """
+    device: str
+    level:  int
+    t0:     float        # unix time of the first point
+    step:   float        # seconds per point
+    mins:   list         # per sensor, array('f')
+    maxs:   list
+    means:  list
+
+    def __len__(self):
+        return len(self.means[0]) if self.means else 0
+
+    @property
+    def t1(self):
+        return self.t0 + len(self) * self.step
+
+
+class PyramidWriter:
+    """Appends one session's raw stream and builds every coarser level as it goes.
+
+    Each level keeps only the records that don't yet fill a bucket of the
+    level above, so memory stays at fanout records per level however long the
+    session runs.  New data is written out at most every `flush_every`
+    seconds; readers see everything up to the last flush.
+    """
+    def __init__(self, path, device, channels, rate_hz, fanout=8, levels=8, flush_every=1.0):
+        os.makedirs(path, exist_ok=True)
+        self.path        = path
+        self.device      = device
+        self.channels    = channels
+        self.rate_hz     = float(rate_hz)
+        self.fanout      = fanout
+        self.levels      = levels
+        self.flush_every = flush_every
+        self.start       = time.time()
+        self.count       = 0        # raw samples appended
+        self.dropped     = 0        # samples the ring overwrote before we copied them
+        self.ring        = None     # SampleRing being followed by extend_from_ring()
+        self._ring_pos   = 0
+        self._tails      = [array('f') for _ in range(levels)]        # records not yet folded upward
+        self._out        = [array('f') for _ in range(levels + 1)]    # records not yet written
+        self._files      = [open(os.path.join(path, f"L{k}.f32"), "ab") for k in range(levels + 1)]
+        self._last_flush = time.monotonic()
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"device": device, "channels": channels, "rate_hz": self.rate_hz,
+                       "fanout": fanout, "levels": levels, "start": self.start}, f)
+
+    def extend(self, values):
+        """Append interleaved samples (s0c0, s0c1, ..., s1c0, ...)."""
+        ch = self.channels
+        n = len(values) // ch
+        if not n:
+            return
+        values = values[:n * ch]
+        self.count += n
+        self._out[0].extend(values)
+        self._tails[0].extend(values)
+        for level in range(self.levels):
+            tail = self._tails[level]
+            stride = ch if level == 0 else 3 * ch
+            size = self.fanout * stride
+            used = 0
+            while len(tail) - used >= size:
+                record = _fold(tail[used:used + size], ch, self.fanout, level == 0)
+                used += size
+                self._out[level + 1].extend(record)
+                if level + 1 < self.levels:
+                    self._tails[level + 1].extend(record)
+            if not used:
+                break   # nothing new reached the levels above either
+            del tail[:used]
+        if time.monotonic() - self._last_flush >= self.flush_every:
+            self.flush()
+
+    def extend_from_ring(self, ring):
+        """Copy whatever `ring` (a SampleRing) gained since the last call.
+
+        Returns False, copying nothing, once the ring has overwritten samples not
+        yet copied: every later timestamp would be off by the gap, so the caller
+        closes this session and starts a new one.
+        """
+        if ring is not self.ring:
+            self.ring, self._ring_pos = ring, ring.count
+        start = self._ring_pos
+        if start < ring.oldest():
+            self.dropped += ring.oldest() - start
+            self._ring_pos = ring.count
+            return False
+        stop = ring.count
+        if stop <= start:
+            return True
+        cap, data = ring.capacity, ring.data[:self.channels]
+        values = array('f')
+        for i in range(start, stop):
+            j = i % cap
+            for col in data:
+                values.append(col[j])
+        self._ring_pos = stop
+        self.extend(values)
+        return True
+
+    def flush(self):
+        for out, f in zip(self._out, self._files):
+            if out:
+                out.tofile(f)
+                del out[:]
+            f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        for f in self._files:
+            f.close()
+
+
+class PyramidReader:
+    """Range queries on one recorded session."""
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.device   = meta["device"]
+        self.channels = meta["channels"]
+        self.rate_hz  = meta["rate_hz"]
+        self.fanout   = meta["fanout"]
+        self.levels   = meta["levels"]
+        self.start    = meta["start"]
+
+    def _record_floats(self, level):
+        return self.channels if level == 0 else 3 * self.channels
+
+    def length(self, level=0):
+        """Complete records on disk at `level`."""
+        try:
+            size = os.path.getsize(os.path.join(self.path, f"L{level}.f32"))
+        except OSError:
+            return 0
+        return size // (4 * self._record_floats(level))
+
+    @property
+    def duration(self):
+        return self.length(0) / self.rate_hz
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def pick_level(self, t0, t1, max_points):
+        """Finest level that covers [t0, t1) in at most max_points points (or the top level)."""
+        samples = max(0.0, t1 - t0) * self.rate_hz
+        level = 0
+        while level < self.levels and samples / self.fanout ** level > max_points:
+            level += 1
+        return level
+
+    def query(self, t0, t1, max_points=1000):
+        """Series for unix times [t0, t1) with no more than max_points points per sensor.
+
+        Reads only the needed slice of one level file, so time and memory depend
+        on max_points, not on the session length or the zoom.
+        """
+        level = self.pick_level(t0, t1, max_points)
+        per_record = self.fanout ** level / self.rate_hz    # seconds per record
+        first = max(0, int((t0 - self.start) / per_record))
+        last = min(self.length(level), int((t1 - self.start) / per_record) + 1)
+        n = max(0, last - first)
+        width = self._record_floats(level)
+        block = array('f')
+        if n:
+            with open(os.path.join(self.path, f"L{level}.f32"), "rb") as f:
+                f.seek(first * width * 4)
+                block.fromfile(f, n * width)
+        ch = self.channels
+        if level == 0:
+            cols = [block[c::ch] for c in range(ch)]
+            mins = maxs = means = cols
+        else:
+            stride = 3 * ch
+            mins  = [block[c::stride] for c in range(ch)]
+            maxs  = [block[ch + c::stride] for c in range(ch)]
+            means = [block[2 * ch + c::stride] for c in range(ch)]
+        # Past the top level a query can still exceed max_points: fold the points together
+        group = -(-n // max_points) if n > max_points else 1
+        if group > 1:
+            mins  = [array('f', (min(m[i:i + group]) for i in range(0, n, group))) for m in mins]
+            maxs  = [array('f', (max(m[i:i + group]) for i in range(0, n, group))) for m in maxs]
+            means = [array('f', (sum(m[i:i + group]) / len(m[i:i + group]) for i in range(0, n, group)))
+                     for m in means]
+        return Series(self.device, level, self.start + first * per_record, per_record * group,
+                      mins, maxs, means)
+
+
+HITS_DIR = "_hits"
+
+
+class HitWriter:
+    """Appends every hit to a per-day JSON-lines file, buffered like PyramidWriter.
+
+    One line per hit: unix time, athlete, device, paddle, hit_id, force,
+    accuracy, x, y, forces, features and the drill running on the paddle
+    (None outside drills).  session_export.py streams these back out.
+    """
+    def __init__(self, path, flush_every=1.0):
+        os.makedirs(path, exist_ok=True)
+        self.path        = path
+        self.flush_every = flush_every
+        self.count       = 0
+        self._lines      = []
+        self._day        = None
+        self._file       = None
+        self._last_flush = time.monotonic()
+
+    def append(self, event, athlete, device, drill=None):
+        # HitEvent.t is perf_counter(); store wall-clock time
+        t = time.time() - (time.perf_counter() - event.t)
+        day = time.strftime("%Y-%m-%d", time.localtime(t))
+        if day != self._day:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+            self._day = day
+            self._file = open(os.path.join(self.path, f"{day}.jsonl"), "a", encoding="utf-8")
+        self._lines.append(json.dumps({
+            "t": round(t, 4), "athlete": athlete, "device": device, "paddle": event.paddle,
+            "hit_id": event.hit_id, "force": round(event.max_force, 1), "accuracy": round(event.accuracy, 1),
+            "x": round(event.x, 1), "y": round(event.y, 1), "forces": [round(f, 1) for f in event.forces],
+            "features": list(event.features) if event.features is not None else None, "drill": drill}))
+        self.count += 1
+        if time.monotonic() - self._last_flush >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._lines and self._file is not None:
+            self._file.write("\n".join(self._lines) + "\n")
+            self._file.flush()
+            del self._lines[:]
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class HistoryStore:
+    """Every recorded session under one root directory, by device."""
+    def __init__(self, root):
+        self.root = root
+
+    def recorder(self, device, channels, rate_hz, **kwargs):
+        """New session for `device`; returns its PyramidWriter."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.root, device, stamp)
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.root, device, f"{stamp}-{suffix}")
+        log.info("Recording %s raw stream to %s", device, path)
+        return PyramidWriter(path, device, channels, rate_hz, **kwargs)
+
+    def hit_writer(self, **kwargs):
+        return HitWriter(os.path.join(self.root, HITS_DIR), **kwargs)
+
+    def hit_files(self):
+        """(day, path) of every per-day hit file, oldest first."""
+        base = os.path.join(self.root, HITS_DIR)
+        try:
+            names = os.listdir(base)
+        except OSError:
+            return []
+        return sorted((n[:-6], os.path.join(base, n)) for n in names if n.endswith(".jsonl"))
+
+    def devices(self):
+        try:
+            return sorted(d for d in os.listdir(self.root)
+                          if not d.startswith("_") and os.path.isdir(os.path.join(self.root, d)))
+        except OSError:
+            return []
+
+    def sessions(self, device=None):
+        """PyramidReaders for every session (of one device, or all), oldest first."""
+        out = []
+        for dev in [device] if device else self.devices():
+            base = os.path.join(self.root, dev)
+            try:
+                names = os.listdir(base)
+            except OSError:
+                continue
+            for name in names:
+                if os.path.isfile(os.path.join(base, name, "meta.json")):
+                    out.append(PyramidReader(os.path.join(base, name)))
+        return sorted(out, key=lambda r: r.start)
+
+    def query(self, device, t0, t1, max_points=1000):
+        """Series from every session of `device` overlapping [t0, t1), oldest first.
+
+        The point budget is shared out by how much of the range each session covers.
+        """
+        span = max(t1 - t0, 1e-9)
+        result = []
+        for reader in self.sessions(device):
+            lo, hi = max(t0, reader.start), min(t1, reader.end)
+            if hi <= lo:
+                continue
+            points = max(1, int(max_points * (hi - lo) / span))
+            result.append(reader.query(lo, hi, points))
+        return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Browse recorded raw force history")
+    ap.add_argument("root")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("ls", help="list sessions")
+    q = sub.add_parser("query", help="print a range as JSON")
+    q.add_argument("device")
+    q.add_argument("--from", dest="t0", type=float, help="unix time (default: --last before now)")
+    q.add_argument("--to", dest="t1", type=float)
+    q.add_argument("--last", type=float, default=60.0, help="seconds before --to")
+    q.add_argument("--points", type=int, default=600)
+    args = ap.parse_args(argv)
+
+    store = HistoryStore(args.root)
+    if args.cmd == "ls":
+        for r in store.sessions():
+            print(f"{r.device:12s} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r.start))} "
+                  f"{r.duration:9.1f}s  {r.channels} sensors @ {r.rate_hz:g} Hz  {r.path}")
+        return 0
+    t1 = args.t1 if args.t1 is not None else time.time()
+    t0 = args.t0 if args.t0 is not None else t1 - args.last
+    for s in store.query(args.device, t0, t1, args.points):
+        print(json.dumps({"level": s.level, "t0": s.t0, "step": s.step,
+                          "min": [list(m) for m in s.mins], "max": [list(m) for m in s.maxs],
+                          "mean": [list(m) for m in s.means]}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
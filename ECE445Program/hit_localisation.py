@@ -0,0 +1,183 @@
+# hit_localisation.py  – N‑sensor impact point estimate and accuracy model
+import math
+from dataclasses import dataclass
+
+@dataclass
+class PaddleLayout:
+    """Calibrated sensor geometry of one paddle, in paddle-face millimetres.
+
+    positions   (x, y) of every FlexiForce sensor, in the order the firmware reports them
+    gains       per-sensor calibration multiplier applied to the raw reading
+    sweet_spot  the point a perfect kick lands on
+    radius      distance from the sweet spot at which accuracy reaches 0 %
+    correction  optional affine fix-up (a, b, c, d, e, f) from fit_correction():
+                x' = a*x + b*y + c,  y' = d*x + e*y + f
+    """
+    positions:  list
+    gains:      list  = None
+    sweet_spot: tuple = (0.0, 0.0)
+    radius:     float = None
+    correction: tuple = None
+
+    def __post_init__(self):
+        if len(self.positions) < 2:
+            raise ValueError("A paddle layout needs at least two sensors")
+        if self.gains is None:
+            self.gains = [1.0] * len(self.positions)
+        if len(self.gains) != len(self.positions):
+            raise ValueError("One gain is required per sensor")
+        if self.radius is None:
+            # Default: the furthest sensor from the sweet spot marks the 0 % edge
+            sx, sy = self.sweet_spot
+            self.radius = max(math.hypot(x - sx, y - sy) for x, y in self.positions)
+
+    @property
+    def num_sensors(self):
+        return len(self.positions)
+
+
+def ring_layout(num_sensors, radius=60.0, gains=None):
+    """Sensors evenly spaced on a circle around the paddle centre (4–8 sensor paddles)."""
+    positions = [(radius * math.cos(2 * math.pi * i / num_sensors),
+                  radius * math.sin(2 * math.pi * i / num_sensors))
+                 for i in range(num_sensors)]
+    return PaddleLayout(positions=positions, gains=gains)
+
+
+# The two-sensor paddle we demoed: sensors left/right of centre, sensor #2 reads
+# consistently low so it carries the 1.35 calibration factor.  With this layout the
+# accuracy model reduces exactly to the old min(force1, force2) / max_force * 100.
+LEGACY_LAYOUT = PaddleLayout(positions=[(-60.0, 0.0), (60.0, 0.0)], gains=[1.0, 1.35])
+
+
+@dataclass
+class HitLocation:
+    x:         float
+    y:         float
+    forces:    tuple   # calibrated per-sensor forces
+    max_force: float
+    accuracy:  int     # 0–100, raw (uncurved)
+
+
+def accuracy_from_distance(distance, radius):
+    """Map distance from the sweet spot to 0–100 %.
+
+    (1 - r) / (1 + r) with r = distance / radius, so a two-sensor paddle gives
+    the same number as the original min/max ratio.
+    """
+    r = min(1.0, distance / radius) if radius > 0 else 1.0
+    return round((1.0 - r) / (1.0 + r) * 100)
+
+
+class HitLocaliser:
+    """Force-weighted centroid localiser for any number of paddles and sensors.
+
+    Layout data is unpacked into flat per-paddle tuples once, so localise_batch()
+    only does arithmetic for each paddle in the frame.
+    """
+    def __init__(self, layouts=None):
+        self._layouts = {}
+        self._packed  = {}
+        self._default = self._pack(LEGACY_LAYOUT)
+        for idx, layout in (layouts or {}).items():
+            self.set_layout(idx, layout)
+
+    @staticmethod
+    def _pack(layout):
+        xs = tuple(p[0] for p in layout.positions)
+        ys = tuple(p[1] for p in layout.positions)
+        return (xs, ys, tuple(layout.gains), layout.sweet_spot,
+                layout.radius, layout.correction)
+
+    def set_layout(self, paddle_idx, layout: PaddleLayout):
+        self._layouts[paddle_idx] = layout
+        self._packed[paddle_idx] = self._pack(layout)
+
+    def layout(self, paddle_idx):
+        return self._layouts.get(paddle_idx, LEGACY_LAYOUT)
+
+    def localise(self, paddle_idx, forces):
+        """Localise a single paddle's reading; returns HitLocation or None."""
+        return self.localise_batch({paddle_idx: forces}).get(paddle_idx)
+
+    def localise_batch(self, frame):
+        """Localise one frame of readings: {paddle_idx: raw forces} → {paddle_idx: HitLocation}.
+
+        Paddles with no force (all zero) or a sensor count that doesn't match their
+        layout are left out of the result.
+        """
+        results = {}
+        for idx, raw in frame.items():
+            xs, ys, gains, (sx, sy), radius, corr = self._packed.get(idx, self._default)
+            if len(raw) != len(gains):
+                continue
+
+            forces = tuple(f * g for f, g in zip(raw, gains))
+            total = sum(forces)
+            if total <= 0:
+                continue
+
+            x = sum(f * px for f, px in zip(forces, xs)) / total
+            y = sum(f * py for f, py in zip(forces, ys)) / total
+            if corr is not None:
+                a, b, c, d, e, f = corr
+                x, y = a * x + b * y + c, d * x + e * y + f
+
+            results[idx] = HitLocation(
+                x=x, y=y, forces=forces, max_force=max(forces),
+                accuracy=accuracy_from_distance(math.hypot(x - sx, y - sy), radius))
+        return results
+
+
+def fit_correction(layout: PaddleLayout, samples):
+    """Least-squares affine correction from calibration taps at known points.
+
+    samples: iterable of (raw_forces, (true_x, true_y)).  The centroid is pulled
+    towards the middle of the sensor hull; tapping a few marked spots on the paddle
+    and fitting this map undoes most of that bias.  Returns the correction tuple to
+    store in PaddleLayout.correction.
+    """
+    uncorrected = PaddleLayout(positions=layout.positions, gains=layout.gains,
+                               sweet_spot=layout.sweet_spot, radius=layout.radius)
+    loc = HitLocaliser({0: uncorrected})
+
+    # Normal equations for [x y 1] · coeffs = target, solved for x' and y' at once
+    ata = [[0.0] * 3 for _ in range(3)]
+    atx = [0.0] * 3
+    aty = [0.0] * 3
+    n = 0
+    for raw, (tx, ty) in samples:
+        hit = loc.localise(0, raw)
+        if hit is None:
+            continue
+        row = (hit.x, hit.y, 1.0)
+        for i in range(3):
+            for j in range(3):
+                ata[i][j] += row[i] * row[j]
+            atx[i] += row[i] * tx
+            aty[i] += row[i] * ty
+        n += 1
+    if n < 3:
+        raise ValueError("At least three calibration taps are needed")
+
+    a, b, c = _solve3(ata, atx)
+    d, e, f = _solve3(ata, aty)
+    return (a, b, c, d, e, f)
+
+
+def _solve3(m, v):
+    """Solve a 3×3 linear system with Cramer's rule."""
+    def det(a):
+        return (a[0][0] * (a[1][1] * a[2][2] - a[1][2] * a[2][1])
+                - a[0][1] * (a[1][0] * a[2][2] - a[1][2] * a[2][0])
+                + a[0][2] * (a[1][0] * a[2][1] - a[1][1] * a[2][0]))
+    d = det(m)
+    if abs(d) < 1e-12:
+        raise ValueError("Calibration taps are degenerate (collinear or repeated)")
+    out = []
+    for col in range(3):
+        mc = [row[:] for row in m]
+        for r in range(3):
+            mc[r][col] = v[r]
+        out.append(det(mc) / d)
+    return tuple(out)
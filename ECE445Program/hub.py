@@ -0,0 +1,346 @@
+# hub.py  – aggregate hit events from several control boxes into one time‑ordered stream
+#
+#   python hub.py serve --listen 0.0.0.0:9000 --publish 0.0.0.0:8765   # the aggregator
+#   python main.py --hub 192.168.1.10:9000                               # each control box
+#   python hub.py fake-box --hub 127.0.0.1:9000 --box B2 --offset 3.5    # synthetic box for testing
+#
+# Protocol: newline-delimited JSON over TCP.  Box → hub: {"op":"hello","box":id},
+# {"op":"event","topic":...,"t":box_clock,...} and {"op":"pong","t0":...,"t1":box_clock}.
+# Hub → box: {"op":"ping","t0":hub_clock}.  Box clocks are time.perf_counter(), the
+# same clock HitEvent.t uses; the hub maps them onto its own with NTP-style pings.
+import argparse, asyncio, heapq, itertools, json, random, sys, threading, time
+from collections import deque
+from app_log import get_logger, setup_logging
+from event_publisher import EventPublisher, parse_address
+from leaderboard import Leaderboard
+
+log = get_logger("hub")
+
+
+class ClockSync:
+    """Offset of one box's clock from the hub's, from ping round trips.
+
+    offset = box_clock − hub_clock, estimated from the exchange with the
+    smallest round trip among the last `keep` (its midpoint is the least
+    skewed by queueing), so a burst of slow pings can't drag the estimate.
+    """
+    def __init__(self, keep=8):
+        self.samples = deque(maxlen=keep)   # (rtt, offset)
+
+    def add(self, t0, t1, t2):
+        """t0 hub send, t1 box reply time, t2 hub receive."""
+        self.samples.append((t2 - t0, t1 - (t0 + t2) / 2))
+
+    @property
+    def ready(self):
+        return bool(self.samples)
+
+    @property
+    def offset(self):
+        return min(self.samples)[1] if self.samples else 0.0
+
+    @property
+    def rtt(self):
+        return min(self.samples)[0] if self.samples else None
+
+
+class _Box:
+    def __init__(self, box_id, writer):
+        self.box_id    = box_id
+        self.writer    = writer
+        self.clock     = ClockSync()
+        self.connected = True
+        self.last_seen = time.perf_counter()
+        self.events    = 0
+        self.late      = 0    # events that arrived after their slot in the merged stream was released
+
+
+class HubAggregator:
+    """TCP server that merges events from many boxes into one ordered stream.
+
+    Events are held in a heap for `delay` seconds (the jitter buffer) after
+    their hub-clock time, then released in time order to on_event(event) and,
+    if given, republished through an EventPublisher.  An event that turns up
+    after later events were already released is still delivered, flagged
+    late=True, rather than dropped.  Boxes that disconnect or stop talking
+    for `dropout` seconds are reported (once) with a "box" event, released
+    through the same buffer as their hits; their clock
+    estimate is kept so a quick reconnect resumes straight away.
+    """
+    def __init__(self, host="0.0.0.0", port=9000, delay=0.15, dropout=3.0,
+                 ping_interval=1.0, on_event=None, publisher=None):
+        self.host          = host
+        self.port          = port
+        self.delay         = delay
+        self.dropout       = dropout
+        self.ping_interval = ping_interval
+        self.on_event      = on_event
+        self.publisher     = publisher
+        self.boxes         = {}           # box id -> _Box
+        self.released      = 0
+        self._heap         = []           # (hub time, tiebreak, event)
+        self._tiebreak     = itertools.count()
+        self._watermark    = float("-inf")  # hub time of the last released event
+        self._loop         = None
+        self._started      = threading.Event()
+
+    # ---------- any thread ----------
+    def start(self):
+        threading.Thread(target=self._run, name="hub", daemon=True).start()
+        self._started.wait(timeout=5)
+        return self.port
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def status(self):
+        return {b.box_id: {"connected": b.connected, "offset": b.clock.offset, "rtt": b.clock.rtt,
+                           "events": b.events, "late": b.late} for b in list(self.boxes.values())}
+
+    # ---------- hub thread ----------
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop.create_task(self._release_loop())
+        self._loop.create_task(self._ping_loop())
+        log.info("Hub listening on %s:%d", self.host, self.port)
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+
+    async def _serve(self, reader, writer):
+        box = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                msg = json.loads(line)
+                op = msg.get("op")
+                if op == "hello":
+                    box = self.boxes.get(msg["box"])
+                    if box is None:
+                        box = self.boxes[msg["box"]] = _Box(msg["box"], writer)
+                    box.writer, box.connected = writer, True
+                    self._send(box, {"op": "ping", "t0": time.perf_counter()})
+                    self._box_event(box, "up")
+                    continue
+                if box is None:
+                    continue   # must say hello first
+                box.last_seen = time.perf_counter()
+                if op == "pong":
+                    box.clock.add(msg["t0"], msg["t1"], time.perf_counter())
+                elif op == "event":
+                    self._accept(box, msg)
+        except (ConnectionError, ValueError, KeyError) as e:
+            log.warning("Box %s: %s", box.box_id if box else "?", e)
+        finally:
+            writer.close()
+            # The ping loop may already have reported a dropout and closed this writer
+            if box is not None and box.writer is writer and box.connected:
+                box.connected = False
+                self._box_event(box, "down")
+
+    def _send(self, box, msg):
+        try:
+            box.writer.write((json.dumps(msg) + "\n").encode())
+        except (ConnectionError, RuntimeError):
+            pass
+
+    def _accept(self, box, msg):
+        box.events += 1
+        event = dict(msg)
+        del event["op"]
+        event["box"] = box.box_id
+        if "paddle" in event:
+            event["paddle_id"] = f"{box.box_id}:{event['paddle']}"
+        # Box clock → hub clock; until the first pong, receipt time is the best we have
+        t_hub = event["t"] - box.clock.offset if box.clock.ready else time.perf_counter()
+        event["t_hub"] = t_hub
+        if t_hub < self._watermark:
+            box.late += 1
+            event["late"] = True
+        heapq.heappush(self._heap, (t_hub, next(self._tiebreak), event))
+
+    def _box_event(self, box, state):
+        # Through the jitter buffer like any event, so "down" can't overtake the box's last hits
+        log.info("Box %s %s", box.box_id, state)
+        t_hub = time.perf_counter()
+        heapq.heappush(self._heap, (t_hub, next(self._tiebreak),
+                                    {"topic": "box", "box": box.box_id, "state": state, "t_hub": t_hub}))
+
+    def _emit(self, event):
+        self.released += 1
+        if self.on_event is not None:
+            self.on_event(event)
+        if self.publisher is not None:
+            self.publisher.publish(event.get("topic", "event"), event)
+
+    async def _release_loop(self):
+        while True:
+            await asyncio.sleep(0.01)
+            cutoff = time.perf_counter() - self.delay
+            while self._heap and self._heap[0][0] <= cutoff:
+                t_hub, _, event = heapq.heappop(self._heap)
+                self._watermark = max(self._watermark, t_hub)
+                self._emit(event)
+
+    async def _ping_loop(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            now = time.perf_counter()
+            for box in list(self.boxes.values()):
+                if not box.connected:
+                    continue
+                if now - box.last_seen > self.dropout:
+                    # Alive at TCP level but silent (box hung, Wi-Fi stalled...)
+                    box.connected = False
+                    box.writer.close()
+                    self._box_event(box, "down")
+                    continue
+                self._send(box, {"op": "ping", "t0": now})
+
+
+class HubClient:
+    """Box side: forwards events to the hub and answers its clock pings.
+
+    send() is non-blocking and thread-safe; while the hub is unreachable events
+    wait in a bounded queue (oldest dropped) and the client keeps reconnecting.
+    """
+    def __init__(self, host, port, box_id, queue_size=1024):
+        self.host     = host
+        self.port     = port
+        self.box_id   = box_id
+        self.outbox   = deque(maxlen=queue_size)
+        self.connected = False
+        self._wake    = None
+        self._loop    = None
+
+    def start(self):
+        threading.Thread(target=self._run, name="hub-client", daemon=True).start()
+        return self
+
+    def send(self, topic, event, t=None):
+        """Forward one event; `t` is its time.perf_counter() timestamp (now if omitted)."""
+        self.outbox.append(dict(event, op="event", topic=topic,
+                                t=time.perf_counter() if t is None else t))
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._wake = asyncio.Event()
+        # Published last: send() on another thread uses _wake as soon as it sees _loop
+        self._loop = loop
+        loop.run_until_complete(self._main())
+
+    async def _main(self):
+        delay = 1.0
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, 30.0)
+                continue
+            delay = 1.0
+            self.connected = True
+            log.info("Connected to hub %s:%d as %s", self.host, self.port, self.box_id)
+            writer.write((json.dumps({"op": "hello", "box": self.box_id}) + "\n").encode())
+            sender = asyncio.ensure_future(self._send_loop(writer))
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    msg = json.loads(line)
+                    if msg.get("op") == "ping":
+                        writer.write((json.dumps({"op": "pong", "t0": msg["t0"],
+                                                  "t1": time.perf_counter()}) + "\n").encode())
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                sender.cancel()
+                writer.close()
+                self.connected = False
+                log.warning("Lost hub connection; retrying")
+
+    async def _send_loop(self, writer):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self.outbox:
+                writer.write((json.dumps(self.outbox.popleft()) + "\n").encode())
+            await writer.drain()
+
+
+def _fake_box(args):
+    """Synthetic box: random hits on a few paddles, with its clock skewed by --offset."""
+    host, port = parse_address(args.hub, 9000)
+    client = HubClient(host, port, args.box).start()
+    # Pretend this box's perf_counter started somewhere else entirely
+    skew = args.offset
+    _real = time.perf_counter
+    time.perf_counter = lambda: _real() + skew
+    n = 0
+    while args.count is None or n < args.count:
+        time.sleep(random.uniform(0.05, 0.4))
+        n += 1
+        paddle = random.randrange(args.paddles)
+        client.send("hit", {"paddle": paddle, "force": round(random.uniform(250, 900), 1), "n": n})
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Multi-box hub")
+    sub = ap.add_subparsers(dest="mode", required=True)
+    serve = sub.add_parser("serve", help="run the aggregator")
+    serve.add_argument("--listen", default="0.0.0.0:9000")
+    serve.add_argument("--publish", help="republish the merged stream over WebSocket (host:port)")
+    serve.add_argument("--delay", type=float, default=0.15, help="jitter buffer, seconds")
+    serve.add_argument("--print", action="store_true", help="print merged events as JSON lines")
+    fake = sub.add_parser("fake-box", help="send synthetic hits to a hub")
+    fake.add_argument("--hub", default="127.0.0.1:9000")
+    fake.add_argument("--box", default="fake")
+    fake.add_argument("--offset", type=float, default=0.0, help="clock skew, seconds")
+    fake.add_argument("--paddles", type=int, default=4)
+    fake.add_argument("--count", type=int)
+    args = ap.parse_args(argv)
+    setup_logging()
+
+    if args.mode == "fake-box":
+        _fake_box(args)
+        return 0
+    publisher = None
+    if args.publish:
+        publisher = EventPublisher(*parse_address(args.publish))
+        publisher.start()
+    # Class leaderboard over every box, republished as "leaderboard" when it changes
+    board = Leaderboard(k=10)
+    def on_event(e):
+        board.feed(e)
+        if args.print:
+            print(json.dumps(e), flush=True)
+    hub = HubAggregator(*parse_address(args.listen, 9000), delay=args.delay, publisher=publisher,
+                        on_event=on_event)
+    hub.start()
+    shown = board.version
+    try:
+        for n in itertools.count(1):
+            time.sleep(1)
+            if publisher is not None and board.version != shown:
+                shown = board.version
+                publisher.publish("leaderboard", board.snapshot())
+            if n % 5 == 0:
+                log.info("Boxes: %s", hub.status())
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# kick_classifier.py  – per‑athlete nearest‑centroid kick recogniser
+import json, os
+
+# Order of the values in a feature vector
+FEATURE_NAMES = ("rise_ms", "duration_ms", "sensor_ratio", "impulse", "peak_force")
+NUM_FEATURES  = len(FEATURE_NAMES)
+
+
+def extract_features(forces, waveform):
+    """Build a feature vector from one hit.
+
+    forces    calibrated per-sensor peak forces of the hit window
+    waveform  (rise_ms, duration_ms, impulse_Ns) as reported by the firmware
+    """
+    rise_ms, duration_ms, impulse = waveform
+    peak = max(forces)
+    total = sum(forces)
+    # Share of the load taken by the most-loaded sensor: a flat instep spreads
+    # across the paddle, a heel or ball-of-foot strike concentrates on one sensor
+    ratio = peak / total if total > 0 else 0.0
+    return (float(rise_ms), float(duration_ms), ratio, float(impulse), float(peak))
+
+
+class KickClassifier:
+    """Nearest-centroid classifier over per-athlete kick templates.
+
+    Each (athlete, kick) template is a running mean updated one labelled hit at a
+    time, and features are standardised by a running global spread, so learning
+    and classifying are both O(kicks × features) with no stored history.
+    """
+    def __init__(self, min_samples=3, margin=1.25):
+        self.min_samples = min_samples  # templates with fewer hits can't reject kicks
+        self.margin      = margin       # expected kick accepted if within margin × best distance
+        self._templates  = {}           # athlete -> {kick: [count, mean list]}
+        # Welford accumulators for the global per-feature spread
+        self._n    = 0
+        self._mean = [0.0] * NUM_FEATURES
+        self._m2   = [0.0] * NUM_FEATURES
+        self._inv_scale = [1.0] * NUM_FEATURES
+
+    # ---------- training ----------
+    def learn(self, athlete, kick, features):
+        """Fold one labelled hit into the athlete's template for that kick."""
+        tmpl = self._templates.setdefault(athlete, {}).setdefault(kick, [0, [0.0] * NUM_FEATURES])
+        tmpl[0] += 1
+        n, mean = tmpl
+        for i, v in enumerate(features):
+            mean[i] += (v - mean[i]) / n
+
+        self._n += 1
+        for i, v in enumerate(features):
+            delta = v - self._mean[i]
+            self._mean[i] += delta / self._n
+            self._m2[i] += delta * (v - self._mean[i])
+        self._refresh_scale()
+
+    def _refresh_scale(self):
+        if self._n > 1:
+            self._inv_scale = [1.0 / (m2 / (self._n - 1)) ** 0.5 if m2 > 0 else 1.0
+                               for m2 in self._m2]
+
+    def forget(self, athlete, kick=None):
+        """Drop one template, or all of an athlete's templates."""
+        if kick is None:
+            self._templates.pop(athlete, None)
+        else:
+            self._templates.get(athlete, {}).pop(kick, None)
+
+    def sample_count(self, athlete, kick):
+        tmpl = self._templates.get(athlete, {}).get(kick)
+        return tmpl[0] if tmpl else 0
+
+    # ---------- inference ----------
+    def _distance(self, features, mean):
+        inv = self._inv_scale
+        return sum(((v - m) * s) ** 2 for v, m, s in zip(features, mean, inv))
+
+    def distances(self, athlete, features):
+        """{kick: distance} for every trained template of this athlete."""
+        return {kick: self._distance(features, mean)
+                for kick, (n, mean) in self._templates.get(athlete, {}).items()
+                if n >= self.min_samples}
+
+    def classify(self, athlete, features):
+        """Return (kick, distance) of the nearest template, or (None, None) if untrained."""
+        dists = self.distances(athlete, features)
+        if not dists:
+            return None, None
+        kick = min(dists, key=dists.get)
+        return kick, dists[kick]
+
+    def verify(self, athlete, expected, features):
+        """Check a hit against the prompted kick: returns (accepted, predicted kick).
+
+        Kicks without a trained template are always accepted so drills keep working
+        for new athletes while data is still being collected.
+        """
+        dists = self.distances(athlete, features)
+        if expected not in dists:
+            return True, None
+        predicted = min(dists, key=dists.get)
+        if predicted == expected:
+            return True, predicted
+        return dists[expected] <= dists[predicted] * self.margin, predicted
+
+    # ---------- persistence ----------
+    def save(self, path):
+        data = {
+            'templates': self._templates,
+            'n': self._n, 'mean': self._mean, 'm2': self._m2,
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    def load(self, path):
+        if not os.path.isfile(path):
+            return False
+        with open(path) as f:
+            data = json.load(f)
+        self._templates = data['templates']
+        self._n, self._mean, self._m2 = data['n'], data['mean'], data['m2']
+        self._refresh_scale()
+        return True
@@ -0,0 +1,95 @@
+# kick_sequence.py  – merge the hit windows of one physical kick into a single kick event
+from drills import HitEvent
+
+
+class KickAggregator:
+    """Groups each paddle's hit windows into kicks and emits one event per kick.
+
+    A kick that bounces, or lasts longer than the firmware's hit window, reaches
+    us as several windows a few hundred ms apart.  Every window that starts
+    within timeout(paddle) seconds of the kick's previous window joins that
+    kick.  A window only reaches us report_delay(paddle) seconds (the
+    firmware's hit window) after it starts, so tick() finalises a kick once
+    timeout + report_delay has passed since its last window – no later window
+    can still join it – and add() finalises it when the next kick starts.
+    State lives in the PaddleTable's kick_* columns, so add() is O(1) and
+    tick() is O(paddles).
+
+    The finalised event is the strongest window's HitEvent with the best force
+    and best accuracy seen across the kick, timed from the first contact (t of
+    the first window) so reaction times aren't stretched by the merge.
+    """
+    def __init__(self, table, timeout, on_kick=None, report_delay=0.0):
+        self.table   = table
+        self.timeout = timeout if callable(timeout) else (lambda _paddle, t=timeout: t)
+        self.report_delay = report_delay if callable(report_delay) else (lambda _paddle, d=report_delay: d)
+        self.on_kick = on_kick
+        self.kicks   = 0        # finalised
+        self.merged  = 0        # windows folded into an earlier one of the same kick
+        self._best   = [None] * table.n   # strongest window of each open kick
+
+    def add(self, event):
+        """Feed one hit window; returns the kick it closed, if it started a new one."""
+        s, i = self.table, event.paddle
+        if s.kick_active[i] and event.t - s.kick_last[i] <= self.timeout(i):
+            self.merged += 1
+            s.kick_last[i] = event.t
+            if event.max_force > s.kick_best_force[i]:
+                s.kick_best_force[i] = event.max_force
+                self._best[i] = event
+            if event.accuracy > s.kick_best_accuracy[i]:
+                s.kick_best_accuracy[i] = event.accuracy
+            return None
+        done = self._finish(i) if s.kick_active[i] else None
+        s.kick_active[i] = 1
+        s.kick_start[i] = event.t
+        s.kick_last[i] = event.t
+        s.kick_best_force[i] = event.max_force
+        s.kick_best_accuracy[i] = event.accuracy
+        self._best[i] = event
+        return done
+
+    def add_frame(self, events):
+        """add() each event; returns the kicks they closed."""
+        return [k for k in map(self.add, events) if k is not None]
+
+    def tick(self, now):
+        """Finalise every open kick no further window can join; returns them in kick order."""
+        s = self.table
+        done = [self._finish(i) for i in range(s.n)
+                if s.kick_active[i] and now - s.kick_last[i] > self.timeout(i) + self.report_delay(i)]
+        if len(done) > 1:
+            done.sort(key=lambda e: e.t)
+        return done
+
+    def horizon(self, paddles, now):
+        """First-contact time before which every kick on `paddles` has been handed out.
+
+        Any window that started before now − report_delay has reached us, and a
+        kick still open was first touched at kick_start, so every kick that
+        began before the earlier of the two is already finalised.  Consumers
+        that must see kicks in first-contact order (sparring) commit up to it.
+        """
+        s = self.table
+        h = now - max(self.report_delay(i) for i in paddles)
+        for i in paddles:
+            if s.kick_active[i] and s.kick_start[i] < h:
+                h = s.kick_start[i]
+        return h
+
+    def flush(self):
+        """Finalise everything still open (drill stopped, paddle disconnected...)."""
+        return [self._finish(i) for i in range(self.table.n) if self.table.kick_active[i]]
+
+    def _finish(self, i):
+        s, best = self.table, self._best[i]
+        kick = HitEvent(paddle=i, hit_id=best.hit_id, t=s.kick_start[i], forces=best.forces,
+                        max_force=s.kick_best_force[i], accuracy=s.kick_best_accuracy[i],
+                        x=best.x, y=best.y, features=best.features,
+                        time_since_last=best.time_since_last, time_since_hit=best.time_since_hit)
+        s.reset_kick(i)
+        self._best[i] = None
+        self.kicks += 1
+        if self.on_kick is not None:
+            self.on_kick(kick)
+        return kick
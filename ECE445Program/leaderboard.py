@@ -0,0 +1,125 @@
+# leaderboard.py  – live class leaderboard: best kick, accuracy, reaction and speed combo per athlete
+from bisect import bisect_left, insort
+
+# metric -> (title, unit, lower is better)
+METRICS = {
+    "force":    ("Hardest Kick",        "N",  False),
+    "accuracy": ("Best Accuracy",       "%",  False),
+    "reaction": ("Fastest Reaction",    "ms", True),
+    "combo":    ("Longest Speed Combo", "",   False),
+}
+
+
+class TopK:
+    """Each entrant's personal best for one metric, plus the top k kept sorted.
+
+    best holds every entrant's best (dict, O(1)); the top k live in a sorted
+    key list maintained with bisect, so an update is O(log n) plus an O(k)
+    list insert, and only when it changes the top k.  Personal bests only
+    ever improve, so an entrant outside the top k never has to be pulled back
+    in when someone else moves up, and nothing is ever rescanned.  top is a
+    tuple rebuilt on change: reads are O(1), and safe from another thread
+    (the hub feeds from its event loop while the main thread reads).
+    """
+    def __init__(self, k=10, lower_is_better=False):
+        self.k       = k
+        self.sign    = -1.0 if lower_is_better else 1.0
+        self.best    = {}       # entrant -> (score, t, detail); score = value * sign, higher wins
+        self.top     = ()       # ((entrant, value, detail), ...) best first
+        self.version = 0        # bumped whenever top changes
+        self._keys   = []       # sorted (-score, t, entrant) of the top k; earlier t wins ties
+
+    def add(self, entrant, value, t=0.0, detail=None):
+        """Record a result; returns True if the top k changed."""
+        score = value * self.sign
+        old = self.best.get(entrant)
+        if old is not None and score <= old[0]:
+            return False
+        self.best[entrant] = (score, t, detail)
+        key = (-score, t, entrant)
+        keys = self._keys
+        if len(keys) >= self.k and key >= keys[-1]:
+            return False   # not top k now, so the old best wasn't either
+        if old is not None:
+            old_key = (-old[0], old[1], entrant)
+            i = bisect_left(keys, old_key)
+            if i < len(keys) and keys[i] == old_key:
+                del keys[i]
+        insort(keys, key)
+        del keys[self.k:]
+        self.top = tuple((e, -s * self.sign, self.best[e][2]) for s, _t, e in keys)
+        self.version += 1
+        return True
+
+    def __len__(self):
+        return len(self.best)
+
+    def reset(self):
+        self.best = {}
+        self._keys = []
+        self.top = ()
+        self.version += 1
+
+
+class Leaderboard:
+    """One TopK per metric in METRICS.
+
+    Fed directly by main.py (finished kicks, drill snapshots) or, on the hub,
+    from the merged event stream with feed().  Entrants are athlete names,
+    or (athlete, box) on the hub so boxes with the same default name don't
+    merge into one entrant.
+    """
+    def __init__(self, k=10):
+        self.boards = {m: TopK(k, lower) for m, (_title, _unit, lower) in METRICS.items()}
+
+    @property
+    def version(self):
+        return sum(b.version for b in self.boards.values())
+
+    def add(self, metric, entrant, value, t=0.0, detail=None):
+        return self.boards[metric].add(entrant, value, t, detail)
+
+    def add_kick(self, entrant, event, detail=None):
+        """A finished kick (HitEvent): hardest kick and best accuracy."""
+        self.add("force", entrant, event.max_force, event.t, detail)
+        self.add("accuracy", entrant, event.accuracy, event.t, detail)
+
+    def add_drill(self, entrant, snapshot, t=0.0, detail=None):
+        """A drill snapshot (DrillSession.snapshot()); safe to feed the same one repeatedly."""
+        drill = snapshot.get("drill")
+        if drill in ("ReactionDrill", "TargetDrill") and snapshot.get("last_rt_ms") is not None:
+            self.add("reaction", entrant, snapshot["last_rt_ms"], t, detail)
+        elif drill == "SpeedDrill" and snapshot.get("combo"):
+            self.add("combo", entrant, snapshot["combo"], t, detail)
+
+    def feed(self, event):
+        """An event from the hub's merged stream (topics "hit" and "drill")."""
+        topic = event.get("topic")
+        if topic not in ("hit", "drill"):
+            return
+        entrant = (event.get("athlete") or "?", event.get("box"))
+        t = event.get("t_hub", event.get("t", 0.0))
+        if topic == "hit":
+            detail = event.get("paddle_id") or event.get("device")
+            if event.get("force") is not None:
+                self.add("force", entrant, event["force"], t, detail)
+            if event.get("accuracy") is not None:
+                self.add("accuracy", entrant, event["accuracy"], t, detail)
+        else:
+            self.add_drill(entrant, event, t, event.get("box"))
+
+    def top(self, metric):
+        return self.boards[metric].top
+
+    def reset(self):
+        for board in self.boards.values():
+            board.reset()
+
+    def snapshot(self):
+        """JSON-able top k of every metric, for scoreboards."""
+        rows = {}
+        for m, board in self.boards.items():
+            rows[m] = [dict(athlete=e, value=v, detail=d) if isinstance(e, str) else
+                       dict(athlete=e[0], box=e[1], value=v, detail=d)
+                       for e, v, d in board.top]
+        return rows
@@ -0,0 +1,147 @@
+# link_monitor.py  – per‑paddle BLE link health from heartbeats, sequence numbers, RSSI and ACK timing
+import threading, time
+from collections import deque
+from dataclasses import dataclass
+
+@dataclass
+class LinkHealth:
+    """Snapshot of one link over the monitor's rolling window."""
+    state:         str      # "ok", "degraded", "down" or "unknown" (nothing received yet)
+    reasons:       tuple    # human-readable causes when not ok
+    rate_hz:       float    # notifications per second
+    loss_pct:      float    # lost notifications (sequence gaps, else estimated from arrival gaps)
+    max_gap_ms:    float    # longest inter-arrival gap in the window
+    silent_ms:     float    # time since the last notification
+    decode_errors: int
+    rssi:          int      # dBm from the last scan, None if unknown
+    rtt_ms:        float    # median command round trip, None until a command has been ACKed
+
+    @property
+    def ok(self):
+        return self.state == "ok"
+
+    def summary(self):
+        if self.state in ("ok", "unknown"):
+            return self.state
+        return f"{self.state}: " + ", ".join(self.reasons)
+
+
+class LinkMonitor:
+    """Rolling-window link statistics for one paddle.
+
+    The firmware heartbeats whenever it has nothing else to send, so a healthy
+    link never goes quiet for much longer than the heartbeat interval; a silent
+    link is a dead link, not "no kick".  Notifications carry ";s=<seq>" on
+    current firmware, which gives exact loss counts; without it loss is
+    estimated from gaps longer than the expected interval.
+
+    on_*() are called from the BLE loop thread, health() from the UI thread.
+    """
+    SEQ_MOD = 65536
+
+    def __init__(self, window=10.0, loss_warn=5.0, gap_factor=3.0, rssi_warn=-85,
+                 decode_warn=3, down_after=2.0):
+        self.window      = window        # seconds of history kept
+        self.loss_warn   = loss_warn     # % lost before the link counts as degraded
+        self.gap_factor  = gap_factor    # gap > factor × expected interval is degraded...
+        self.rssi_warn   = rssi_warn     # dBm
+        self.decode_warn = decode_warn   # undecodable notifications per window
+        self.down_after  = down_after    # ...and silence this long (at least) is down
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._packets  = deque()    # (t, gap_s, lost, late)
+            self._errors   = deque()    # t
+            self._rtts     = deque(maxlen=20)
+            self._last_t   = None
+            self._last_seq = None
+            self._last_expected = None
+            self.rssi      = None
+
+    # ---------- inputs ----------
+    def on_packet(self, now=None, seq=None, expected_ms=None):
+        """expected_ms is the heartbeat interval the paddle should be running at."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # While the rate controller changes the heartbeat, either interval is fair
+            allowed = max(expected_ms or 0, self._last_expected or 0) or None
+            gap = 0.0 if self._last_t is None else now - self._last_t
+            lost = 0
+            if seq is not None and self._last_seq is not None:
+                step = (seq - self._last_seq) % self.SEQ_MOD
+                # A huge jump is a paddle reboot, not ten thousand lost packets
+                if 1 < step < 1000:
+                    lost = step - 1
+            elif seq is None and allowed and gap * 1000 > 1.5 * allowed:
+                lost = int(gap * 1000 / allowed + 0.5) - 1
+            late = bool(allowed) and gap * 1000 > self.gap_factor * allowed
+            self._last_t = now
+            self._last_expected = expected_ms
+            if seq is not None:
+                self._last_seq = seq
+            self._packets.append((now, gap, lost, late))
+            self._prune(now)
+
+    def on_decode_error(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._errors.append(now)
+            self._prune(now)
+
+    def on_rssi(self, rssi):
+        self.rssi = rssi
+
+    def on_rtt(self, rtt_ms):
+        with self._lock:
+            self._rtts.append(rtt_ms)
+
+    def _prune(self, now):
+        cutoff = now - self.window
+        while self._packets and self._packets[0][0] < cutoff:
+            self._packets.popleft()
+        while self._errors and self._errors[0] < cutoff:
+            self._errors.popleft()
+
+    # ---------- output ----------
+    def health(self, expected_ms=300, now=None):
+        """expected_ms is the paddle's current heartbeat interval (handler.heartbeat_ms)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._prune(now)
+            packets = list(self._packets)
+            errors = len(self._errors)
+            rtts = sorted(self._rtts)
+            last_t = self._last_t
+            last_expected = self._last_expected or 0
+        if last_t is None:
+            return LinkHealth("unknown", (), 0.0, 0.0, 0.0, 0.0, errors, self.rssi,
+                              rtts[len(rtts) // 2] if rtts else None)
+
+        received = len(packets)
+        lost = sum(p[2] for p in packets)
+        span = min(self.window, now - packets[0][0]) if packets else self.window
+        rate = received / span if span > 0 else 0.0
+        loss_pct = 100.0 * lost / (received + lost) if received + lost else 0.0
+        max_gap_ms = 1000 * max((p[1] for p in packets[1:]), default=0.0)
+        late = any(p[3] for p in packets[1:])
+        silent_ms = 1000 * (now - last_t)
+        silence_limit = max(1000 * self.down_after, self.gap_factor * max(expected_ms, last_expected))
+
+        reasons = []
+        if silent_ms > silence_limit:
+            state = "down"
+            reasons.append(f"silent {silent_ms / 1000:.1f} s")
+        else:
+            if loss_pct > self.loss_warn:
+                reasons.append(f"loss {loss_pct:.0f}%")
+            if late:
+                reasons.append(f"gap {max_gap_ms:.0f} ms")
+            if errors >= self.decode_warn:
+                reasons.append(f"{errors} bad packets")
+            if self.rssi is not None and self.rssi < self.rssi_warn:
+                reasons.append(f"weak signal {self.rssi} dBm")
+            state = "degraded" if reasons else "ok"
+        return LinkHealth(state, tuple(reasons), rate, loss_pct, max_gap_ms, silent_ms,
+                          errors, self.rssi, rtts[len(rtts) // 2] if rtts else None)
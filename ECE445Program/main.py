@@ -1,55 +1,143 @@
 import sys
 import os
-import random
 import time
 from PySide6 import QtWidgets, QtGui, QtCore
 from PySide6.QtMultimedia import QSoundEffect
 from bluetooth_handler import BluetoothHandler
+from hit_localisation import HitLocaliser, LEGACY_LAYOUT
+from heatmap_widget import HitHeatMap
+from waveform_plot import WaveformPlot
+from kick_classifier import KickClassifier, extract_features
+from drills import HitEvent, ReactionDrill, SpeedDrill, TargetDrill, ComboDrill, SparringDrill, DrillDispatcher
+from combo_matcher import ComboMatcher, default_combos
+from paddle_profiles import PROFILES, DRILL_PROFILES
+from rate_controller import RateController
+from app_log import get_logger, setup_logging
+from ble_process import BleProcess
+from event_publisher import EventPublisher, parse_address
+from hub import HubClient
+from paddle_state import PaddleTable, HitLog
+from kick_sequence import KickAggregator
+from history_store import HistoryStore
+from session_export import ExportJob, ExportFilter
+from athlete_analytics import AthleteAnalytics
+from leaderboard import Leaderboard, METRICS
+from ui_profiler import UiProfiler, profiled_application
+
+log = get_logger("ui")
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, paddles=None, profiler=None):
         super().__init__()
         self.setWindowTitle("CTC Force Measurement System")
         self.resize(1200, 800)
 
-        # Bluetooth handlers
-        self.bt1 = BluetoothHandler("ESP32_1")
-        self.bt2 = BluetoothHandler("ESP32_2")
+        # Bluetooth handlers.  With --ble-process (or PADDLE_BLE_PROCESS=1) BLE and
+        # decoding run in a child process and these are shared-memory proxies.
+        # `paddles` replaces them with any list of handlers (bench.py, simulations)
+        if paddles:
+            self.ble_process = None
+            self.bt1, self.bt2 = paddles[0], paddles[min(1, len(paddles) - 1)]
+        elif "--ble-process" in sys.argv or os.environ.get("PADDLE_BLE_PROCESS"):
+            self.ble_process = BleProcess(["ESP32_1", "ESP32_2"])
+            self.bt1, self.bt2 = self.ble_process.paddles
+        else:
+            self.ble_process = None
+            self.bt1 = BluetoothHandler("ESP32_1")
+            self.bt2 = BluetoothHandler("ESP32_2")
+        self.paddles = list(paddles) if paddles else [self.bt1, self.bt2]
+
+        # Sensor geometry per paddle; every paddle is localised in one batch per tick
+        self.localiser = HitLocaliser({idx: LEGACY_LAYOUT for idx in range(len(self.paddles))})
+        self.heatmaps = {}  # esp_idx -> HitHeatMap on the force screen
+        self.waveforms = {}  # esp_idx -> WaveformPlot (raw sensor trace) on the force screen
+        self._streaming = set()  # esp_idx of paddles we've asked for the raw stream
+        # Raw-stream and hit history for browsing / export later: --history DIR or PADDLE_HISTORY
+        self.history = None
+        self.hit_writer = None
+        self._recorders = {}  # esp_idx -> PyramidWriter for the current stream
+        self.export_job = None  # session_export.ExportJob running from the settings screen
+        history_at = os.environ.get("PADDLE_HISTORY")
+        if "--history" in sys.argv and sys.argv.index("--history") + 1 < len(sys.argv):
+            history_at = sys.argv[sys.argv.index("--history") + 1]
+        if history_at:
+            self.history = HistoryStore(history_at)
+            self.hit_writer = self.history.hit_writer()
+            QtWidgets.QApplication.instance().aboutToQuit.connect(self.hit_writer.close)
+        self.status_labels = {}  # esp_idx -> connection/link status label on the force screen
+        self._link_refresh = 0.0  # perf_counter() of the last link-status redraw
 
         # Storage for force-screen widgets
         self.force_widgets = []  # will hold dicts: {handler, status, force, bar, btn}
+        self.force_widgets_by_esp = {}  # esp_idx -> that paddle's entries of force_widgets
         
-        # Last valid force readings (above 200N)
-        self.last_valid_forces = {
-            0: {'force1': None, 'force2': None, 'max_force': None, 'accuracy': None},  # ESP32 #1
-            1: {'force1': None, 'force2': None, 'max_force': None, 'accuracy': None}   # ESP32 #2
-        }
-        
-        # Kick detection and timing
-        self.kick_timing = {
-            0: {'active': False, 'start_time': None, 'best_force': 0, 'best_accuracy': 0},  # ESP32 #1
-            1: {'active': False, 'start_time': None, 'best_force': 0, 'best_accuracy': 0}   # ESP32 #2
-        }
-        self.kick_timeout = 1000  # 1000 milliseconds timeout for a kick sequence
-
-        # Reaction drill state
-        self.reaction_active = False
-        self.reaction_start_time = 0.0
-        self.reaction_threshold = 300.0  # Newtons threshold
+        # Per-paddle state: last valid hit (above the paddle's hit threshold), kick
+        # timing, what's been drawn – typed columns indexed by esp_idx
+        self.state = PaddleTable(len(self.paddles))
+        # Hit windows starting within (paddle's hit window + kick_timeout) ms of a kick's
+        # previous window are the same kick (bounces, long pushes); drills see one event
+        self.kick_timeout = 200
+        self.kicks = KickAggregator(self.state, self._kick_span, report_delay=self._window_span)
+        # Every hit this session, per athlete (compact columns; fine for 10k+ hits)
+        self.hit_logs = {}
+        # Running per-athlete / per-kick stats and fatigue trend, updated once per kick
+        self.analytics = AthleteAnalytics(window=20, drop_alert=0.15)
+        self.analytics_labels = []   # one per drill screen, see _refresh_analytics
+        self._reactions_seen = {}    # drill session -> reaction times already fed to analytics
+        # Class leaderboard: every athlete's bests, top 10 kept sorted as results come in
+        self.leaderboard = Leaderboard(k=10)
+        self._leaderboard_shown = -1  # leaderboard.version last drawn
+
+        # Drill sessions: one per paddle lane, all fed hit events by one dispatcher.
+        # Hit/drill thresholds adapt per paddle: see handler.thresholds (AdaptiveThreshold)
+        self.drills = DrillDispatcher(on_session_update=self._publish_drill)
+        # Live feed for scoreboards / judge tablets: --publish host:port or PADDLE_PUBLISH
+        self.publisher = None
+        publish_at = os.environ.get("PADDLE_PUBLISH")
+        if "--publish" in sys.argv:
+            i = sys.argv.index("--publish")
+            publish_at = sys.argv[i + 1] if i + 1 < len(sys.argv) else "127.0.0.1:8765"
+        if publish_at:
+            self.publisher = EventPublisher(*parse_address(publish_at))
+            self.publisher.start()
+        # Multi-box classes: forward this box's events to a hub (python hub.py serve)
+        self.hub = None
+        if "--hub" in sys.argv and sys.argv.index("--hub") + 1 < len(sys.argv):
+            hub_at = sys.argv[sys.argv.index("--hub") + 1]
+            box_id = os.environ.get("PADDLE_BOX_ID") or QtCore.QSysInfo.machineHostName()
+            self.hub = HubClient(*parse_address(hub_at, 9000), box_id).start()
+        self.reaction_lanes = {}  # esp_idx -> {'status', 'session'}
+        self.speed_lanes = {}     # esp_idx -> {'kick', 'combo', 'feedback', 'session'}
+        self.target_session = None
+        self.target_lanes = {}    # esp_idx -> {'box', 'enabled', 'stats'}
+        self.combo_session = None
+        self.sparring_session = None
+        # Firmware sampling/window profile: "auto" lets each drill pick (DRILL_PROFILES)
+        self.profile_mode = "auto"
+        # Idle paddles drop to sparse heartbeats; hits or an armed drill bring them back
+        self.rate_control = RateController(self.paddles)
 
         # Prepare beep sound
         self.beep = QSoundEffect()
         beep_path = os.path.join("assets", "beep.wav")
         self.beep.setSource(QtCore.QUrl.fromLocalFile(beep_path))
 
-        # Speed combo drill state
-        self.speed_active = False
-        self.speed_start_time = 0.0
-        self.speed_threshold = 300.0    # Newtons threshold for speed drill
+        # Speed combo drill settings
         self.speed_time_limit = 2.0    # seconds to complete each kick
-        self.speed_combo = 0
         self.kick_list = ["Front Kick", "Roundhouse Kick", "Back Kick", "Front Hook Kick", "Back Hook kick", "Axe Kick", "Tornado Kick"]
 
+        # Kick-type classifier (per-athlete templates, taught from labelled drill hits)
+        self.athlete = "Athlete 1"
+        self.kick_classifier = KickClassifier()
+        self.kick_templates_path = "kick_templates.json"
+        self.kick_classifier.load(self.kick_templates_path)
+        # Combo drill patterns ("name: 1, 2 <400, 1 <400" lines), compiled once and
+        # shared by every combo session
+        self.combos_path = "combos.txt"
+        self.combo_matcher = ComboMatcher(default_combos(self.combos_path))
+        for handler in self.paddles:
+            handler.thresholds.athlete = self.athlete
+
         # Central stacked widget to switch screens
         self.stack = QtWidgets.QStackedWidget()
         self.setCentralWidget(self.stack)
@@ -61,6 +149,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.training_screen   = self._create_training_screen()
         self.reaction_screen   = self._create_reaction_screen()
         self.speed_screen      = self._create_speed_screen()
+        self.target_screen     = self._create_target_screen()
+        self.combo_screen      = self._create_combo_screen()
+        self.sparring_screen   = self._create_sparring_screen()
         self.games_screen      = self._create_games_screen()
         self.settings_screen   = self._create_settings_screen()
 
@@ -72,6 +163,9 @@ class MainWindow(QtWidgets.QMainWindow):
             self.training_screen,
             self.reaction_screen,
             self.speed_screen,
+            self.target_screen,
+            self.combo_screen,
+            self.sparring_screen,
             self.games_screen,
             self.settings_screen
         ]:
@@ -98,10 +192,24 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Timer to refresh force readings more frequently (10ms for 100Hz polling)
         self.update_timer = QtCore.QTimer(self)
+        self.update_timer.setObjectName("update_readings")
         self.update_timer.setInterval(10)
         self.update_timer.timeout.connect(self._update_readings)
         self.update_timer.start()
 
+        # UI profiler (--profile-ui): frame-time overlay, stall stacks, F12 dumps the profile
+        self.profiler = profiler
+        if profiler is not None:
+            self._screen_names = {}
+            profiler.screen = self._screen_name
+            self.profiler_overlay = QtWidgets.QLabel(self)
+            self.profiler_overlay.setFont(QtGui.QFont("Courier", 10))
+            self.profiler_overlay.setStyleSheet("background:rgba(0,0,0,170); color:#2ecc71; padding:4px;")
+            self.profiler_overlay.move(10, 10)
+            self.profiler_overlay.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+            dump = QtGui.QShortcut(QtGui.QKeySequence("F12"), self)
+            dump.activated.connect(lambda: profiler.dump(os.environ.get("PADDLE_PROFILE_DUMP", "ui_profile.txt")))
+
     def _create_splash_screen(self):
         w = QtWidgets.QWidget()
         w.setStyleSheet("background-color: black;")
@@ -266,16 +374,18 @@ class MainWindow(QtWidgets.QMainWindow):
         
         # Storage for force-screen widgets (clearing any previous entries)
         self.force_widgets = []
+        self.force_widgets_by_esp = {}
         
         # Create group boxes for each ESP32
-        for esp_idx, (label, handler) in enumerate([("ESP32 #1", self.bt1), ("ESP32 #2", self.bt2)]):
-            gb = QtWidgets.QGroupBox(label)
+        for esp_idx, handler in enumerate(self.paddles):
+            gb = QtWidgets.QGroupBox(f"ESP32 #{esp_idx+1}")
             gb.setFont(QtGui.QFont("Helvetica", 14, QtGui.QFont.Bold))
             glayout = QtWidgets.QVBoxLayout(gb)
             
             # Status label and connect button
             status_lbl = QtWidgets.QLabel("Status: Disconnected")
             status_lbl.setStyleSheet("color:red;")
+            self.status_labels[esp_idx] = status_lbl
             btn = QtWidgets.QPushButton("Connect")
             hlayout = QtWidgets.QHBoxLayout()
             hlayout.addWidget(status_lbl)
@@ -315,9 +425,15 @@ class MainWindow(QtWidgets.QMainWindow):
             accuracy_layout.addWidget(accuracy_value, alignment=QtCore.Qt.AlignCenter)
             accuracy_layout.setContentsMargins(20, 0, 20, 0)
             
-            # Add force and accuracy to metrics layout
+            # Hit-location heat map
+            layout = self.localiser.layout(esp_idx)
+            heatmap = HitHeatMap(layout)
+            self.heatmaps[esp_idx] = heatmap
+
+            # Add force, accuracy and heat map to metrics layout
             metrics_layout.addWidget(force_value_container)
             metrics_layout.addWidget(accuracy_container)
+            metrics_layout.addWidget(heatmap)
             
             # Main layout for ESP sensors and metrics
             main_layout = QtWidgets.QHBoxLayout()
@@ -328,8 +444,8 @@ class MainWindow(QtWidgets.QMainWindow):
             
             esp_widgets = []  # Store widgets for this ESP32
             
-            # Create two force displays for each ESP32
-            for sensor_idx in range(2):
+            # Create one force display per sensor on this paddle
+            for sensor_idx in range(layout.num_sensors):
                 sensor_gb = QtWidgets.QGroupBox(f"Force Sensor #{sensor_idx+1}")
                 sensor_layout = QtWidgets.QVBoxLayout(sensor_gb)
                 
@@ -358,12 +474,18 @@ class MainWindow(QtWidgets.QMainWindow):
                 }
                 self.force_widgets.append(widget_data)
                 esp_widgets.append(widget_data)
+            self.force_widgets_by_esp[esp_idx] = esp_widgets
             
             # Add sensors and metrics to main layout with stretching
             main_layout.addWidget(sensors_container, 5)  # 50%
             main_layout.addWidget(metrics_container, 4)  # 50% (split between force and accuracy)
             
             glayout.addLayout(main_layout)
+
+            # Live raw-force trace (filled while this screen is showing)
+            waveform = WaveformPlot(full_scale=handler.profile.max_force_n)
+            self.waveforms[esp_idx] = waveform
+            glayout.addWidget(waveform)
             
             # Connect button event handling with properly captured parameters
             btn.clicked.connect(lambda checked, h=handler, s=status_lbl, w=esp_widgets, b=btn: 
@@ -387,9 +509,22 @@ class MainWindow(QtWidgets.QMainWindow):
         hlayout.addStretch()
         hlayout.addWidget(back)
         vlayout.addLayout(hlayout)
+        # Athlete whose kick templates drills check against
+        athlete_layout = QtWidgets.QHBoxLayout()
+        athlete_lbl = QtWidgets.QLabel("Athlete:")
+        athlete_lbl.setFont(QtGui.QFont("Helvetica",14))
+        athlete_edit = QtWidgets.QLineEdit(self.athlete)
+        athlete_edit.setFont(QtGui.QFont("Helvetica",14))
+        athlete_edit.textChanged.connect(self._set_athlete)
+        athlete_layout.addWidget(athlete_lbl)
+        athlete_layout.addWidget(athlete_edit)
+        vlayout.addLayout(athlete_layout)
         # Drill buttons
         for txt,fn in [("Reaction Drills", self._show_reaction),
-                       ("Speed Drill",      self._show_speed)]:
+                       ("Speed Drill",      self._show_speed),
+                       ("Target Drill",     self._show_target),
+                       ("Combo Drill",      self._show_combo),
+                       ("Sparring",         self._show_sparring)]:
             btn = QtWidgets.QPushButton(txt)
             btn.setFont(QtGui.QFont("Helvetica",18))
             btn.setStyleSheet("""
@@ -414,13 +549,29 @@ class MainWindow(QtWidgets.QMainWindow):
         lbl.setFont(QtGui.QFont("Helvetica",24,QtGui.QFont.Bold))
         lbl.setAlignment(QtCore.Qt.AlignCenter)
         v.addWidget(lbl)
-        start_btn = QtWidgets.QPushButton("Start")
-        start_btn.setFont(QtGui.QFont("Helvetica",18))
-        start_btn.clicked.connect(self._start_reaction)
-        v.addWidget(start_btn, alignment=QtCore.Qt.AlignCenter)
-        self.reaction_time_lbl = QtWidgets.QLabel("Reaction Time: N/A")
-        self.reaction_time_lbl.setFont(QtGui.QFont("Helvetica",18))
-        v.addWidget(self.reaction_time_lbl, alignment=QtCore.Qt.AlignCenter)
+        start_all = QtWidgets.QPushButton("Start All")
+        start_all.setFont(QtGui.QFont("Helvetica",18))
+        start_all.clicked.connect(lambda: self._start_all(self.reaction_lanes, self._start_reaction))
+        v.addWidget(start_all, alignment=QtCore.Qt.AlignCenter)
+
+        # One lane per paddle; each runs its own drill session
+        lanes = QtWidgets.QHBoxLayout()
+        for esp_idx in range(len(self.paddles)):
+            gb = QtWidgets.QGroupBox(f"ESP32 #{esp_idx+1}")
+            gb.setFont(QtGui.QFont("Helvetica", 14, QtGui.QFont.Bold))
+            gl = QtWidgets.QVBoxLayout(gb)
+            start_btn = QtWidgets.QPushButton("Start")
+            start_btn.setFont(QtGui.QFont("Helvetica",18))
+            start_btn.clicked.connect(lambda checked, i=esp_idx: self._start_reaction(i))
+            gl.addWidget(start_btn, alignment=QtCore.Qt.AlignCenter)
+            status = QtWidgets.QLabel("Reaction Time: N/A")
+            status.setFont(QtGui.QFont("Helvetica",18))
+            gl.addWidget(status, alignment=QtCore.Qt.AlignCenter)
+            self.reaction_lanes[esp_idx] = {'status': status, 'session': None}
+            lanes.addWidget(gb)
+        v.addLayout(lanes)
+
+        self._add_analytics_label(v)
         back = QtWidgets.QPushButton("← Back")
         back.clicked.connect(lambda: self.stack.setCurrentWidget(self.training_screen))
         v.addWidget(back, alignment=QtCore.Qt.AlignCenter)
@@ -434,18 +585,237 @@ class MainWindow(QtWidgets.QMainWindow):
         lbl.setFont(QtGui.QFont("Helvetica",24,QtGui.QFont.Bold))
         lbl.setAlignment(QtCore.Qt.AlignCenter)
         v.addWidget(lbl)
-        self.kick_lbl = QtWidgets.QLabel("")
-        self.kick_lbl.setFont(QtGui.QFont("Helvetica",20,QtGui.QFont.Bold))
-        self.kick_lbl.setAlignment(QtCore.Qt.AlignCenter)
-        v.addWidget(self.kick_lbl)
-        start_btn = QtWidgets.QPushButton("Start Combo")
+        start_all = QtWidgets.QPushButton("Start All")
+        start_all.setFont(QtGui.QFont("Helvetica",18))
+        start_all.clicked.connect(lambda: self._start_all(self.speed_lanes, self._start_speed))
+        v.addWidget(start_all, alignment=QtCore.Qt.AlignCenter)
+
+        # One lane per paddle; each runs its own combo
+        lanes = QtWidgets.QHBoxLayout()
+        for esp_idx in range(len(self.paddles)):
+            gb = QtWidgets.QGroupBox(f"ESP32 #{esp_idx+1}")
+            gb.setFont(QtGui.QFont("Helvetica", 14, QtGui.QFont.Bold))
+            gl = QtWidgets.QVBoxLayout(gb)
+            kick_lbl = QtWidgets.QLabel("")
+            kick_lbl.setFont(QtGui.QFont("Helvetica",20,QtGui.QFont.Bold))
+            kick_lbl.setAlignment(QtCore.Qt.AlignCenter)
+            gl.addWidget(kick_lbl)
+            start_btn = QtWidgets.QPushButton("Start Combo")
+            start_btn.setFont(QtGui.QFont("Helvetica",18))
+            start_btn.clicked.connect(lambda checked, i=esp_idx: self._start_speed(i))
+            gl.addWidget(start_btn, alignment=QtCore.Qt.AlignCenter)
+            combo_lbl = QtWidgets.QLabel("Combo: 0")
+            combo_lbl.setFont(QtGui.QFont("Helvetica",18))
+            combo_lbl.setAlignment(QtCore.Qt.AlignCenter)
+            gl.addWidget(combo_lbl)
+            feedback_lbl = QtWidgets.QLabel("")
+            feedback_lbl.setFont(QtGui.QFont("Helvetica",16))
+            feedback_lbl.setAlignment(QtCore.Qt.AlignCenter)
+            feedback_lbl.setStyleSheet("color:#e74c3c;")
+            gl.addWidget(feedback_lbl)
+            self.speed_lanes[esp_idx] = {'kick': kick_lbl, 'combo': combo_lbl,
+                                         'feedback': feedback_lbl, 'session': None}
+            lanes.addWidget(gb)
+        v.addLayout(lanes)
+
+        # When ticked, every hit is learned as the prompted kick instead of being checked
+        self.speed_record_cb = QtWidgets.QCheckBox("Teach kick recogniser (record prompted kicks)")
+        self.speed_record_cb.setFont(QtGui.QFont("Helvetica",14))
+        self.speed_record_cb.toggled.connect(lambda on: on or self.kick_classifier.save(self.kick_templates_path))
+        v.addWidget(self.speed_record_cb, alignment=QtCore.Qt.AlignCenter)
+        self._add_analytics_label(v)
+        back = QtWidgets.QPushButton("← Back")
+        back.clicked.connect(lambda: self.stack.setCurrentWidget(self.training_screen))
+        v.addWidget(back, alignment=QtCore.Qt.AlignCenter)
+        return w
+
+    def _create_target_screen(self):
+        w = QtWidgets.QWidget()
+        v = QtWidgets.QVBoxLayout(w)
+        lbl = QtWidgets.QLabel("Target Drill Mode")
+        lbl.setFont(QtGui.QFont("Helvetica",24,QtGui.QFont.Bold))
+        lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(lbl)
+        instructions = QtWidgets.QLabel("Hold several paddles. Kick only the paddle that lights up.")
+        instructions.setFont(QtGui.QFont("Helvetica",14))
+        instructions.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(instructions)
+
+        # Rounds and start
+        controls = QtWidgets.QHBoxLayout()
+        rounds_lbl = QtWidgets.QLabel("Rounds:")
+        rounds_lbl.setFont(QtGui.QFont("Helvetica",14))
+        self.target_rounds = QtWidgets.QSpinBox()
+        self.target_rounds.setRange(1, 200)
+        self.target_rounds.setValue(20)
+        self.target_rounds.setFont(QtGui.QFont("Helvetica",14))
+        start_btn = QtWidgets.QPushButton("Start")
         start_btn.setFont(QtGui.QFont("Helvetica",18))
-        start_btn.clicked.connect(self._start_speed)
-        v.addWidget(start_btn, alignment=QtCore.Qt.AlignCenter)
-        self.combo_lbl = QtWidgets.QLabel("Combo: 0")
-        self.combo_lbl.setFont(QtGui.QFont("Helvetica",18))
-        self.combo_lbl.setAlignment(QtCore.Qt.AlignCenter)
-        v.addWidget(self.combo_lbl)
+        start_btn.clicked.connect(self._start_target)
+        controls.addStretch()
+        controls.addWidget(rounds_lbl)
+        controls.addWidget(self.target_rounds)
+        controls.addWidget(start_btn)
+        controls.addStretch()
+        v.addLayout(controls)
+
+        self.target_status_lbl = QtWidgets.QLabel("")
+        self.target_status_lbl.setFont(QtGui.QFont("Helvetica",20,QtGui.QFont.Bold))
+        self.target_status_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(self.target_status_lbl)
+
+        # One box per paddle: lights up when it's the target, shows per-target stats
+        lanes = QtWidgets.QHBoxLayout()
+        for esp_idx in range(len(self.paddles)):
+            gb = QtWidgets.QGroupBox(f"ESP32 #{esp_idx+1}")
+            gb.setFont(QtGui.QFont("Helvetica", 14, QtGui.QFont.Bold))
+            gl = QtWidgets.QVBoxLayout(gb)
+            enabled = QtWidgets.QCheckBox("On holder")
+            enabled.setChecked(True)
+            gl.addWidget(enabled)
+            stats = QtWidgets.QLabel("Avg: --\nHits: 0  Wrong: 0")
+            stats.setFont(QtGui.QFont("Helvetica",14))
+            stats.setAlignment(QtCore.Qt.AlignCenter)
+            gl.addWidget(stats)
+            self.target_lanes[esp_idx] = {'box': gb, 'enabled': enabled, 'stats': stats}
+            lanes.addWidget(gb)
+        v.addLayout(lanes)
+
+        self._add_analytics_label(v)
+        back = QtWidgets.QPushButton("← Back")
+        back.clicked.connect(lambda: self.stack.setCurrentWidget(self.training_screen))
+        v.addWidget(back, alignment=QtCore.Qt.AlignCenter)
+        return w
+
+    def _create_combo_screen(self):
+        w = QtWidgets.QWidget()
+        v = QtWidgets.QVBoxLayout(w)
+        lbl = QtWidgets.QLabel("Combo Drill Mode")
+        lbl.setFont(QtGui.QFont("Helvetica",24,QtGui.QFont.Bold))
+        lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(lbl)
+        instructions = QtWidgets.QLabel("Kick the combo shown: paddle numbers in order, within each gap (ms).")
+        instructions.setFont(QtGui.QFont("Helvetica",14))
+        instructions.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(instructions)
+
+        controls = QtWidgets.QHBoxLayout()
+        rounds_lbl = QtWidgets.QLabel("Rounds:")
+        rounds_lbl.setFont(QtGui.QFont("Helvetica",14))
+        self.combo_rounds = QtWidgets.QSpinBox()
+        self.combo_rounds.setRange(1, 100)
+        self.combo_rounds.setValue(10)
+        self.combo_rounds.setFont(QtGui.QFont("Helvetica",14))
+        self.combo_free_cb = QtWidgets.QCheckBox("Free play")
+        self.combo_free_cb.setFont(QtGui.QFont("Helvetica",14))
+        start_btn = QtWidgets.QPushButton("Start")
+        start_btn.setFont(QtGui.QFont("Helvetica",18))
+        start_btn.clicked.connect(self._start_combo)
+        controls.addStretch()
+        controls.addWidget(rounds_lbl)
+        controls.addWidget(self.combo_rounds)
+        controls.addWidget(self.combo_free_cb)
+        controls.addWidget(start_btn)
+        controls.addStretch()
+        v.addLayout(controls)
+
+        self.combo_status_lbl = QtWidgets.QLabel("")
+        self.combo_status_lbl.setFont(QtGui.QFont("Helvetica",20,QtGui.QFont.Bold))
+        self.combo_status_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.combo_status_lbl.setWordWrap(True)
+        v.addWidget(self.combo_status_lbl)
+        self.combo_score_lbl = QtWidgets.QLabel("")
+        self.combo_score_lbl.setFont(QtGui.QFont("Helvetica",18))
+        self.combo_score_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(self.combo_score_lbl)
+        self.combo_feedback_lbl = QtWidgets.QLabel("")
+        self.combo_feedback_lbl.setFont(QtGui.QFont("Helvetica",16))
+        self.combo_feedback_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.combo_feedback_lbl.setStyleSheet("color:#e67e22;")
+        v.addWidget(self.combo_feedback_lbl)
+
+        self._add_analytics_label(v)
+        back = QtWidgets.QPushButton("← Back")
+        back.clicked.connect(lambda: self.stack.setCurrentWidget(self.training_screen))
+        v.addWidget(back, alignment=QtCore.Qt.AlignCenter)
+        return w
+
+    def _create_sparring_screen(self):
+        w = QtWidgets.QWidget()
+        v = QtWidgets.QVBoxLayout(w)
+        lbl = QtWidgets.QLabel("Sparring Mode")
+        lbl.setFont(QtGui.QFont("Helvetica",24,QtGui.QFont.Bold))
+        lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(lbl)
+
+        # Bout settings
+        controls = QtWidgets.QHBoxLayout()
+        self.sparring_rounds = QtWidgets.QSpinBox()
+        self.sparring_rounds.setRange(1, 5)
+        self.sparring_rounds.setValue(3)
+        self.sparring_round_time = QtWidgets.QSpinBox()
+        self.sparring_round_time.setRange(10, 300)
+        self.sparring_round_time.setValue(120)
+        self.sparring_round_time.setSuffix(" s")
+        self.sparring_rest_time = QtWidgets.QSpinBox()
+        self.sparring_rest_time.setRange(0, 120)
+        self.sparring_rest_time.setValue(30)
+        self.sparring_rest_time.setSuffix(" s")
+        self.sparring_cancel_cb = QtWidgets.QCheckBox("Cancel simultaneous hits")
+        controls.addStretch()
+        for text, widget in [("Rounds:", self.sparring_rounds), ("Round:", self.sparring_round_time),
+                             ("Rest:", self.sparring_rest_time)]:
+            l = QtWidgets.QLabel(text)
+            l.setFont(QtGui.QFont("Helvetica",14))
+            widget.setFont(QtGui.QFont("Helvetica",14))
+            controls.addWidget(l)
+            controls.addWidget(widget)
+        self.sparring_cancel_cb.setFont(QtGui.QFont("Helvetica",14))
+        controls.addWidget(self.sparring_cancel_cb)
+        controls.addStretch()
+        v.addLayout(controls)
+
+        # Which competitor each paddle scores for (the targets their opponent holds)
+        assign = QtWidgets.QHBoxLayout()
+        assign.addStretch()
+        self.sparring_sides = {}
+        for esp_idx in range(len(self.paddles)):
+            l = QtWidgets.QLabel(f"ESP32 #{esp_idx+1}:")
+            l.setFont(QtGui.QFont("Helvetica",14))
+            side = QtWidgets.QComboBox()
+            side.addItems(["Red", "Blue", "Off"])
+            side.setCurrentIndex(esp_idx % 2)
+            side.setFont(QtGui.QFont("Helvetica",14))
+            assign.addWidget(l)
+            assign.addWidget(side)
+            self.sparring_sides[esp_idx] = side
+        start_btn = QtWidgets.QPushButton("Start Bout")
+        start_btn.setFont(QtGui.QFont("Helvetica",18))
+        start_btn.clicked.connect(self._start_sparring)
+        assign.addWidget(start_btn)
+        assign.addStretch()
+        v.addLayout(assign)
+
+        # Scoreboard
+        self.sparring_clock_lbl = QtWidgets.QLabel("")
+        self.sparring_clock_lbl.setFont(QtGui.QFont("Helvetica",28,QtGui.QFont.Bold))
+        self.sparring_clock_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(self.sparring_clock_lbl)
+        board = QtWidgets.QHBoxLayout()
+        self.sparring_score_lbls = {}
+        for side, colour in [("red", "#c0392b"), ("blue", "#2471a3")]:
+            score = QtWidgets.QLabel("0")
+            score.setFont(QtGui.QFont("Helvetica",72,QtGui.QFont.Bold))
+            score.setAlignment(QtCore.Qt.AlignCenter)
+            score.setStyleSheet(f"background:{colour}; color:white; padding:20px;")
+            board.addWidget(score)
+            self.sparring_score_lbls[side] = score
+        v.addLayout(board)
+        self.sparring_feedback_lbl = QtWidgets.QLabel("")
+        self.sparring_feedback_lbl.setFont(QtGui.QFont("Helvetica",18))
+        self.sparring_feedback_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        v.addWidget(self.sparring_feedback_lbl)
+
         back = QtWidgets.QPushButton("← Back")
         back.clicked.connect(lambda: self.stack.setCurrentWidget(self.training_screen))
         v.addWidget(back, alignment=QtCore.Qt.AlignCenter)
@@ -477,6 +847,14 @@ class MainWindow(QtWidgets.QMainWindow):
         kicking_btn.setMinimumWidth(300)
         kicking_btn.clicked.connect(self._show_kicking_school)
         games_layout.addWidget(kicking_btn)
+
+        # Class leaderboard button
+        leaderboard_btn = QtWidgets.QPushButton("Class Leaderboard")
+        leaderboard_btn.setFont(QtGui.QFont("Helvetica", 16))
+        leaderboard_btn.setStyleSheet("background:#27ae60; color:white; padding:15px 30px;")
+        leaderboard_btn.setMinimumWidth(300)
+        leaderboard_btn.clicked.connect(self._show_leaderboard)
+        games_layout.addWidget(leaderboard_btn)
         
         # More game options will go here
         
@@ -484,6 +862,67 @@ class MainWindow(QtWidgets.QMainWindow):
         vlayout.addStretch()
         return w
         
+    def _create_leaderboard_screen(self):
+        w = QtWidgets.QWidget()
+        vlayout = QtWidgets.QVBoxLayout(w)
+
+        # Header
+        hlayout = QtWidgets.QHBoxLayout()
+        title = QtWidgets.QLabel("Class Leaderboard")
+        title.setFont(QtGui.QFont("Helvetica", 20, QtGui.QFont.Bold))
+        title.setStyleSheet("background:#2ecc71; color:white; padding:10px;")
+        hlayout.addWidget(title)
+        reset_btn = QtWidgets.QPushButton("Reset")
+        reset_btn.setStyleSheet("padding:5px 15px;")
+        reset_btn.clicked.connect(self.leaderboard.reset)
+        back_btn = QtWidgets.QPushButton("← Back")
+        back_btn.setStyleSheet("background:#27ae60; color:white; padding:5px 15px;")
+        back_btn.clicked.connect(lambda: self.stack.setCurrentWidget(self.games_screen))
+        hlayout.addStretch()
+        hlayout.addWidget(reset_btn)
+        hlayout.addWidget(back_btn)
+        vlayout.addLayout(hlayout)
+
+        # One column per metric
+        self.leaderboard_labels = {}
+        columns = QtWidgets.QHBoxLayout()
+        for metric, (name, _unit, _lower) in METRICS.items():
+            gb = QtWidgets.QGroupBox(name)
+            gb.setFont(QtGui.QFont("Helvetica", 14, QtGui.QFont.Bold))
+            gl = QtWidgets.QVBoxLayout(gb)
+            lbl = QtWidgets.QLabel("--")
+            lbl.setFont(QtGui.QFont("Helvetica", 14))
+            lbl.setAlignment(QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft)
+            gl.addWidget(lbl)
+            self.leaderboard_labels[metric] = lbl
+            columns.addWidget(gb)
+        vlayout.addLayout(columns)
+        return w
+
+    def _show_leaderboard(self):
+        if not hasattr(self, 'leaderboard_screen'):
+            self.leaderboard_screen = self._create_leaderboard_screen()
+            self.stack.addWidget(self.leaderboard_screen)
+        self._leaderboard_shown = -1
+        self.stack.setCurrentWidget(self.leaderboard_screen)
+        self._refresh_leaderboard()
+
+    def _refresh_leaderboard(self):
+        # Redraw only when a top 10 changed; reading one is O(1), nothing is rescanned
+        if not hasattr(self, 'leaderboard_screen') or self.stack.currentWidget() != self.leaderboard_screen:
+            return
+        version = self.leaderboard.version
+        if version == self._leaderboard_shown:
+            return
+        self._leaderboard_shown = version
+        for metric, lbl in self.leaderboard_labels.items():
+            unit = METRICS[metric][1]
+            unit = unit if unit in ("", "%") else " " + unit
+            rows = []
+            for rank, (athlete, value, detail) in enumerate(self.leaderboard.top(metric), 1):
+                rows.append(f"{rank}. {athlete}  {value:.0f}{unit}" + (f"  ({detail})" if detail else ""))
+            lbl.setText("\n".join(rows) or "--")
+
     def _create_kicking_school_screen(self):
         w = QtWidgets.QWidget()
         vlayout = QtWidgets.QVBoxLayout(w)
@@ -570,6 +1009,15 @@ class MainWindow(QtWidgets.QMainWindow):
         
         device_layout.addWidget(device_label)
         device_layout.addWidget(self.device_combo)
+
+        # Optional kick to grade; other kick types get no grade
+        kick_label = QtWidgets.QLabel("Kick:")
+        kick_label.setFont(QtGui.QFont("Helvetica", 14))
+        self.school_kick_combo = QtWidgets.QComboBox()
+        self.school_kick_combo.addItems(["Any Kick"] + self.kick_list)
+        self.school_kick_combo.setFont(QtGui.QFont("Helvetica", 14))
+        device_layout.addWidget(kick_label)
+        device_layout.addWidget(self.school_kick_combo)
         
         # Add all elements to main layout
         vlayout.addWidget(grade_container)
@@ -585,42 +1033,280 @@ class MainWindow(QtWidgets.QMainWindow):
     def _show_training(self):    self.stack.setCurrentWidget(self.training_screen)
     def _show_reaction(self):    self.stack.setCurrentWidget(self.reaction_screen)
     def _show_speed(self):       self.stack.setCurrentWidget(self.speed_screen)
+    def _show_target(self):      self.stack.setCurrentWidget(self.target_screen)
+    def _show_combo(self):       self.stack.setCurrentWidget(self.combo_screen)
+    def _show_sparring(self):    self.stack.setCurrentWidget(self.sparring_screen)
     def _show_games(self):       self.stack.setCurrentWidget(self.games_screen)
     def _show_settings(self):    self.stack.setCurrentWidget(self.settings_screen)
 
-    def _start_reaction(self):
-        # Reset last force so old values don't trigger immediately
-        self.last_valid_forces[0]['max_force'] = None
-        self.last_valid_forces[0]['accuracy'] = None
-
-        self.reaction_time_lbl.setText("Reaction Time: ---")
-        delay_ms = int(random.uniform(1.0, 3.0) * 1000)
-        QtCore.QTimer.singleShot(delay_ms, self._trigger_beep)
-
-    def _trigger_beep(self):
-        # Play beep and start timing
+    def _drill_threshold(self, esp_idx):
+        return self.paddles[esp_idx].thresholds.drill
+
+    def _replace_session(self, lane, session):
+        # Stop whatever this lane was running and hand the new session to the dispatcher
+        if lane['session'] is not None:
+            lane['session'].stop()
+            self.drills.remove(lane['session'])
+        lane['session'] = session
+        self.drills.add(session)
+        session.start()
+
+    def _start_all(self, lanes, start_fn):
+        # Every connected paddle drills in parallel
+        for esp_idx in lanes:
+            if self.paddles[esp_idx].is_connected:
+                start_fn(esp_idx)
+
+    def _use_drill_profile(self, paddles, kind):
+        # Switch the paddles to the drill's profile (Auto mode only) and return how
+        # late a single-window kick can reach the drills: it is finalised a kick span
+        # after its window, which itself arrives a hit window after first contact
+        for esp_idx in paddles:
+            handler = self.paddles[esp_idx]
+            wanted = PROFILES[DRILL_PROFILES[kind]] if self.profile_mode == "auto" else handler.profile
+            if handler.is_connected and handler.profile != wanted:
+                handler.apply_profile(wanted)
+        return max(self._kick_span(i) + self._window_span(i) for i in paddles)
+
+    def _kick_span(self, esp_idx):
+        # Seconds after a kick's latest hit window that a further window still merges into it
+        return (self.paddles[esp_idx].profile.window_ms + self.kick_timeout) / 1000.0
+
+    def _window_span(self, esp_idx):
+        # Seconds after a hit window starts that it reaches us (the firmware's hit window)
+        return self.paddles[esp_idx].profile.window_ms / 1000.0
+
+    def _set_profile_mode(self, mode):
+        self.profile_mode = mode
+        if mode != "auto":
+            for handler in self.paddles:
+                if handler.is_connected:
+                    handler.apply_profile(mode)
+                else:
+                    handler.profile = PROFILES[mode]  # pushed when it connects
+
+    def _link_warning(self, paddles):
+        # Text flagging any connected paddle whose link isn't healthy, "" if all are fine
+        problems = []
+        for esp_idx in sorted(paddles):
+            handler = self.paddles[esp_idx]
+            if handler.is_connected and not handler.simulated:
+                health = handler.link_health()
+                if health.state in ("degraded", "down"):
+                    problems.append(f"#{esp_idx+1} {health.summary()}")
+        return ("⚠ Link " + "; ".join(problems)) if problems else ""
+
+    def _refresh_link_status(self):
+        for esp_idx, lbl in self.status_labels.items():
+            handler = self.paddles[esp_idx]
+            if not handler.is_connected or handler.simulated:
+                continue
+            health = handler.link_health()
+            if health.state == "down":
+                lbl.setText("Status: Link lost – reconnecting…")
+                lbl.setStyleSheet("color:red;")
+            elif health.state == "degraded":
+                lbl.setText(f"Status: Connected ({health.summary()})")
+                lbl.setStyleSheet("color:orange;")
+            else:
+                lbl.setText("Status: Connected")
+                lbl.setStyleSheet("color:green;")
+
+    def _start_reaction(self, esp_idx):
+        lane = self.reaction_lanes[esp_idx]
+        self._use_drill_profile([esp_idx], "reaction")
+        session = ReactionDrill([esp_idx], self._drill_threshold,
+                                cue=self._cue,
+                                on_update=lambda s, lane=lane: lane['status'].setText(s.status))
+        self._replace_session(lane, session)
+        warning = self._link_warning([esp_idx])
+        if warning:
+            lane['status'].setText(f"{session.status}\n{warning}")
+
+    def _cue(self, session):
+        # Play beep; the paddle's own LED and the lane label show which paddle it's for
         self.beep.play()
-        self.reaction_start_time = time.perf_counter()
-        self.reaction_active = True
-
-    def _start_speed(self):
-            # Clear any old force reading so it won't immediately trigger
-        self.last_valid_forces[0]['max_force'] = None
-        self.last_valid_forces[0]['accuracy']  = None
-
-        # Reset combo count and restore the default time limit
-        self.speed_combo       = 0
-        self.speed_time_limit  = 2.0
-        self.combo_lbl.setText("Combo: 0")
-
-        # Kick off the first prompt
-        self._next_kick()
+        if isinstance(session, ReactionDrill):
+            for esp_idx in session.paddles:
+                self.paddles[esp_idx].cue_led()
+                self.reaction_lanes[esp_idx]['status'].setText("KICK!")
+
+    def _start_speed(self, esp_idx):
+        lane = self.speed_lanes[esp_idx]
+        window_delay = self._use_drill_profile([esp_idx], "speed")
+        session = SpeedDrill([esp_idx], self._drill_threshold, self.kick_list,
+                             on_update=lambda s, lane=lane: self._update_speed_lane(lane, s),
+                             kick_check=self._check_kick, time_limit=self.speed_time_limit,
+                             window_delay=window_delay)
+        lane['combo'].setText("Combo: 0")
+        self._replace_session(lane, session)
+        warning = self._link_warning([esp_idx])
+        if warning:
+            lane['feedback'].setText(warning)
+
+    def _start_target(self):
+        paddles = [i for i, lane in self.target_lanes.items() if lane['enabled'].isChecked()]
+        if len(paddles) < 2:
+            self.target_status_lbl.setText("Put at least two paddles on the holder")
+            return
+        if self.target_session is not None:
+            self.target_session.stop()
+            self.drills.remove(self.target_session)
+        window_delay = self._use_drill_profile(paddles, "target")
+        self.target_session = TargetDrill(paddles, self._drill_threshold,
+                                          cue=self._cue_target,
+                                          on_update=self._update_target_lanes,
+                                          rounds=self.target_rounds.value(),
+                                          window_delay=window_delay)
+        self.drills.add(self.target_session)
+        self.target_session.start()
+        warning = self._link_warning(paddles)
+        if warning:
+            self.target_status_lbl.setText(f"{self.target_session.status}\n{warning}")
+
+    def _start_combo(self):
+        # Combos span paddles, so one session takes every connected paddle
+        paddles = [i for i, h in enumerate(self.paddles) if h.is_connected] or list(range(len(self.paddles)))
+        if self.combo_session is not None:
+            self.combo_session.stop()
+            self.drills.remove(self.combo_session)
+        window_delay = self._use_drill_profile(paddles, "combo")
+        self.combo_session = ComboDrill(paddles, self._drill_threshold, self.combo_matcher,
+                                        classify=self._classify_kick, cue=lambda s: self.beep.play(),
+                                        on_update=self._update_combo_screen,
+                                        rounds=self.combo_rounds.value(), window_delay=window_delay,
+                                        prompted=not self.combo_free_cb.isChecked())
+        self.drills.add(self.combo_session)
+        self.combo_session.start()
+        warning = self._link_warning(paddles)
+        if warning:
+            self.combo_feedback_lbl.setText(warning)
+
+    def _update_combo_screen(self, session):
+        self.combo_status_lbl.setText(session.status)
+        self.combo_score_lbl.setText(f"Completed: {session.completed}  Missed: {session.misses}")
+        self.combo_feedback_lbl.setText(session.feedback)
+
+    def _start_sparring(self):
+        red = [i for i, side in self.sparring_sides.items() if side.currentIndex() == 0]
+        blue = [i for i, side in self.sparring_sides.items() if side.currentIndex() == 1]
+        if not red or not blue:
+            self.sparring_feedback_lbl.setText("Give each competitor at least one paddle")
+            return
+        if self.sparring_session is not None:
+            self.sparring_session.stop()
+            self.drills.remove(self.sparring_session)
+        window_delay = self._use_drill_profile(red + blue, "sparring")
+        self.sparring_session = SparringDrill(red, blue, self._drill_threshold, classify=self._classify_kick,
+                                              cue=lambda s: self.beep.play(),
+                                              on_update=self._update_sparring_screen,
+                                              rounds=self.sparring_rounds.value(),
+                                              round_time=self.sparring_round_time.value(),
+                                              rest_time=self.sparring_rest_time.value(),
+                                              cancel_simultaneous=self.sparring_cancel_cb.isChecked(),
+                                              window_delay=window_delay, horizon=self.kicks.horizon)
+        self.drills.add(self.sparring_session)
+        self.sparring_session.start()
+        warning = self._link_warning(red + blue)
+        if warning:
+            self.sparring_feedback_lbl.setText(warning)
+
+    def _update_sparring_screen(self, session):
+        # Called only when the score, feedback or the clock's second changes
+        self.sparring_clock_lbl.setText(session.status)
+        for side, lbl in self.sparring_score_lbls.items():
+            lbl.setText(str(session.score[side]))
+        self.sparring_feedback_lbl.setText(session.feedback)
+
+    def _classify_kick(self, event):
+        # Kick type for combo matching; None (matches any kick) until the athlete has templates
+        if event.features is None:
+            return None
+        return self.kick_classifier.classify(self.athlete, event.features)[0]
+
+    def _cue_target(self, session):
+        self.beep.play()
+        self.paddles[session.target].cue_led()
+        self._update_target_lanes(session)
+
+    def _update_target_lanes(self, session):
+        self.target_status_lbl.setText(session.status)
+        for esp_idx, lane in self.target_lanes.items():
+            # Light the target paddle's box
+            lit = session.active and session.target == esp_idx and session.cue_time is not None
+            lane['box'].setStyleSheet("QGroupBox { background:#f1c40f; }" if lit else "")
+            if esp_idx in session.paddles:
+                avg = session.mean_reaction_ms(esp_idx)
+                avg_txt = f"{avg:.0f} ms" if avg is not None else "--"
+                lane['stats'].setText(f"Avg: {avg_txt}\nHits: {len(session.reaction_times[esp_idx])}"
+                                      f"  Wrong: {session.wrong_by_target[esp_idx]}")
+
+    def _update_speed_lane(self, lane, session):
+        lane['kick'].setText(session.status)
+        lane['combo'].setText(f"Combo: {session.combo}")
+        lane['feedback'].setText(session.feedback)
+        if not session.active and self.speed_record_cb.isChecked():
+            self.kick_classifier.save(self.kick_templates_path)
+
+    def _broadcast(self, topic, event, t=None):
+        # Scoreboards on this box, and the hub when several boxes share a class
+        if self.publisher is not None:
+            self.publisher.publish(topic, event)
+        if self.hub is not None:
+            self.hub.send(topic, event, t)
+
+    def _publish_drill(self, session):
+        self._note_reaction(session)
+        snapshot = session.snapshot()
+        self.leaderboard.add_drill(self.athlete, snapshot, time.perf_counter(),
+                                   detail=", ".join(f"ESP32 #{p+1}" for p in sorted(session.paddles)))
+        self._broadcast("drill", dict(snapshot, athlete=self.athlete))
+
+    def _note_reaction(self, session):
+        # Feed each new reaction time from a reaction/target drill to the athlete's stats
+        if isinstance(session, ReactionDrill):
+            n = len(session.results)
+        elif isinstance(session, TargetDrill):
+            n = session.hits
+        else:
+            return
+        if n > self._reactions_seen.get(session, 0) and session.last_rt_ms is not None:
+            self.analytics.add_reaction(self.athlete, session.last_rt_ms)
+        self._reactions_seen[session] = n
 
-    def _next_kick(self):
-        kick = random.choice(self.kick_list)
-        self.kick_lbl.setText(f"Perform: {kick}!")
-        self.speed_start_time = time.perf_counter()
-        self.speed_active = True
+    def _add_analytics_label(self, layout):
+        lbl = QtWidgets.QLabel("")
+        lbl.setFont(QtGui.QFont("Helvetica",14))
+        lbl.setAlignment(QtCore.Qt.AlignCenter)
+        lbl.setWordWrap(True)
+        layout.addWidget(lbl)
+        self.analytics_labels.append(lbl)
+
+    def _refresh_analytics(self):
+        # Session stats for the current athlete; orange once their power is fading
+        text = self.analytics.status_line(self.athlete)
+        style = "color:#e67e22;" if self.analytics.fatigue(self.athlete) is not None else ""
+        for lbl in self.analytics_labels:
+            if lbl.isVisible():
+                lbl.setText(text)
+                lbl.setStyleSheet(style)
+
+    def _set_athlete(self, text):
+        self.athlete = text.strip() or "Athlete 1"
+        # Each paddle keeps per-athlete hit statistics for its thresholds
+        for handler in self.paddles:
+            handler.thresholds.athlete = self.athlete
+
+    def _check_kick(self, expected, event):
+        """Classify a hit event against the expected kick: returns (accepted, predicted)."""
+        features = event.features
+        if features is None:
+            # Older firmware sends no waveform features; nothing to check against
+            return True, None
+        if self.speed_record_cb.isChecked():
+            self.kick_classifier.learn(self.athlete, expected, features)
+            return True, expected
+        return self.kick_classifier.verify(self.athlete, expected, features)
 
     # Connect/disconnect logic
     def _toggle_connection(self, handler, status_lbl, widgets, btn):
@@ -641,49 +1327,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.kicking_school_screen = self._create_kicking_school_screen()
             self.stack.addWidget(self.kicking_school_screen)
             
-        # Set initial display values based on last valid force if available
-        esp_idx = 0  # Default to first ESP32
-        if self.last_valid_forces[esp_idx]['max_force'] is not None and self.last_valid_forces[esp_idx]['max_force'] >= 220:
-            max_force = self.last_valid_forces[esp_idx]['max_force']
-            raw_accuracy = self.last_valid_forces[esp_idx]['accuracy'] # Get raw accuracy
-
-            # Apply the curve
-            adjusted_accuracy = round(100 * (raw_accuracy / 100) ** 1.7)
-
-            # Calculate force percentage (200N = 20%, 1000N = 100%, >1000N can exceed 100%)
-            force_percent = min(120, max(0, (max_force / 1000) * 100))
-
-            # Calculate grade as average of force percent and ADJUSTED accuracy
-            grade_percent = (force_percent + adjusted_accuracy) / 2
-
-            # Determine letter grade with new thresholds
-            letter_grade = "F"
-            if grade_percent >= 80:
-                letter_grade = "A"
-            elif grade_percent >= 65:
-                letter_grade = "B"
-            elif grade_percent >= 55:
-                letter_grade = "C"
-            elif grade_percent >= 40:
-                letter_grade = "D"
-                
-            self.grade_value.setText(letter_grade)
-            self.force_label.setText(f"{max_force} N")
-            self.force_percent.setText(f"{force_percent:.1f}%")
-            self.accuracy_label.setText(f"{adjusted_accuracy}%")
-            
-            # Set grade color
-            grade_colors = {
-                "A": "#27ae60",  # Green
-                "B": "#2980b9",  # Blue
-                "C": "#f39c12",  # Orange
-                "D": "#e67e22",  # Dark Orange
-                "F": "#e74c3c",  # Red
-            }
-            self.grade_value.setStyleSheet(f"color:{grade_colors[letter_grade]};")
-
+        # Show the last finished kick's grade if there is one
+        kick = self.state.last_kick[0]  # Default to first ESP32
+        if kick is not None:
+            self._update_kicking_grade(kick)
         else:
-            # No valid readings yet
+            # No kicks yet
             self.grade_value.setText("--")
             self.force_label.setText("0 N")
             self.force_percent.setText("0%")
@@ -710,372 +1359,277 @@ class MainWindow(QtWidgets.QMainWindow):
             self.force_percent.setText("--")
             self.accuracy_label.setText("--")
         else:
-            # If we have valid readings for this device, show them
-            esp_idx = self.active_kicking_esp_idx
-            if self.last_valid_forces[esp_idx]['max_force'] is not None and self.last_valid_forces[esp_idx]['max_force'] >= 220:
-                # Use existing values
-                max_force = self.last_valid_forces[esp_idx]['max_force']
-                raw_accuracy = self.last_valid_forces[esp_idx]['accuracy'] # Get raw accuracy
-
-                # Apply the curve
-                adjusted_accuracy = round(100 * (raw_accuracy / 100) ** 1.7)
-
-                # Calculate force percentage (200N = 20%, 1000N = 100%, >1000N can exceed 100%)
-                force_percent = min(120, max(0, (max_force / 1000) * 100))
-
-                # Calculate grade as average of force percent and ADJUSTED accuracy
-                grade_percent = (force_percent + adjusted_accuracy) / 2
-
-                # Determine letter grade with new thresholds
-                letter_grade = "F"
-                if grade_percent >= 80:
-                    letter_grade = "A"
-                elif grade_percent >= 65:
-                    letter_grade = "B"
-                elif grade_percent >= 55:
-                    letter_grade = "C"
-                elif grade_percent >= 40:
-                    letter_grade = "D"
-                    
-                self.grade_value.setText(letter_grade)
-                self.force_label.setText(f"{max_force} N")
-                self.force_percent.setText(f"{force_percent:.1f}%")
-                self.accuracy_label.setText(f"{adjusted_accuracy}%")
-                
-                # Set grade color
-                grade_colors = {
-                    "A": "#27ae60",  # Green
-                    "B": "#2980b9",  # Blue
-                    "C": "#f39c12",  # Orange
-                    "D": "#e67e22",  # Dark Orange
-                    "F": "#e74c3c",  # Red
-                }
-                self.grade_value.setStyleSheet(f"color:{grade_colors[letter_grade]};")
+            # If this device has a finished kick, show its grade
+            kick = self.state.last_kick[self.active_kicking_esp_idx]
+            if kick is not None:
+                self._update_kicking_grade(kick)
             else:
-                # No valid readings yet for this device
+                # No kicks yet for this device
                 self.grade_value.setText("Ready")
                 self.force_label.setText("0 N")
                 self.force_percent.setText("0%")
                 self.accuracy_label.setText("0%")
     
     def _update_readings(self):
-        # Group widgets by ESP32
-        widgets_by_esp = {}
-        for widget in self.force_widgets:
-            esp_idx = widget['esp_idx']
-            if esp_idx not in widgets_by_esp:
-                widgets_by_esp[esp_idx] = []
-            widgets_by_esp[esp_idx].append(widget)
+        widgets_by_esp = self.force_widgets_by_esp
+        state = self.state
         
-        # Current time for kick timing
-        current_time = QtCore.QTime.currentTime().msecsSinceStartOfDay()
-        
-        # Update ESP32 #1
-        if self.bt1.is_connected and 0 in widgets_by_esp:
+        # Gather one frame of readings from every connected paddle
+        frame = {}
+        timings = {}
+        shown = []
+        events = []
+        for esp_idx, handler in enumerate(self.paddles):
+            if not handler.is_connected or esp_idx not in widgets_by_esp:
+                continue
+            # Nothing new from this paddle since the last frame: nothing to redraw
+            rx_count = handler.rx_stats()[0]
+            if rx_count == state.seen_rx[esp_idx]:
+                continue
+            state.seen_rx[esp_idx] = rx_count
             try:
-                # Get both force readings and time since last detection from ESP32 #1
-                force1, force2, time_since_last, time_since_hit = self.bt1.get_both_force_readings()
-                
-                # Check if readings are valid numbers
-                if isinstance(force1, (int, float)) and isinstance(force2, (int, float)):
-                    # Apply calibration factor to force1 which reads consistently lower
-                    # This ensures compatibility even if the ESP32 firmware hasn't been updated
-                    force2 *= 1.35
-                    
-                    # Calculate current max force
-                    max_force = max(force1, force2)
-                    
-                    # Calculate accuracy if at least one reading is above threshold
-                    if max_force >= 220:
-                        accuracy = round((min(force1, force2) / max_force * 100))
-                    else:
-                        # If we have valid past readings, keep using that accuracy
-                        accuracy = self.last_valid_forces[0]['accuracy'] if self.last_valid_forces[0]['accuracy'] is not None else 100
-                    
-                    # Only update display and tracking if we have a real hit (above threshold)
-                    if max_force >= 220:
-                        # Update last valid forces with current readings for any hit above 200N
-                        self.last_valid_forces[0]['force1'] = force1
-                        self.last_valid_forces[0]['force2'] = force2
-                        self.last_valid_forces[0]['max_force'] = max_force
-                        self.last_valid_forces[0]['accuracy'] = accuracy
-                        # Store the time since last message for this hit
-                        self.last_valid_forces[0]['time_since_last'] = time_since_last
-                        # Store the time since hit detection for this hit
-                        self.last_valid_forces[0]['time_since_hit'] = time_since_hit
-                    
-                    # Always use last valid max force for display force
-                    if self.last_valid_forces[0]['max_force'] is not None:
-                        display_force = self.last_valid_forces[0]['max_force']
-                        display_force1 = self.last_valid_forces[0]['force1']
-                        display_force2 = self.last_valid_forces[0]['force2']
-                        # Get raw accuracy and apply the curve for display
-                        raw_accuracy = self.last_valid_forces[0]['accuracy']
-                        display_accuracy = round(100 * (raw_accuracy / 100) ** 1.7) if raw_accuracy is not None else 0 # Apply curve here
-                    else:
-                        display_force = 0
-                        display_force1 = 0
-                        display_force2 = 0
-                        display_accuracy = 0
-                    
-                    # Update widgets for ESP32 #1 with individual sensor readings
-                    for widget in widgets_by_esp[0]:
-                        sensor_idx = widget['sensor_idx']
-                        widget['force'].setText(f"Force {sensor_idx+1}:")
-                        
-                        # Set correct force value for each sensor's bar
-                        if sensor_idx == 0:
-                            widget['bar'].setValue(min(1500, max(0, int(display_force1))))
-                        else:
-                            widget['bar'].setValue(min(1500, max(0, int(display_force2))))
-                            
-                        # Both widgets show the same max force value and accuracy
-                        widget['force_value'].setText(f"{display_force} N")
-                        widget['accuracy_value'].setText(f"{display_accuracy}%")
-                else:
-                    # Invalid readings - but don't reset display
-                    # Keep displaying last valid reading
-                    if self.last_valid_forces[0]['max_force'] is not None:
-                        display_force = self.last_valid_forces[0]['max_force']
-                        display_force1 = self.last_valid_forces[0]['force1']
-                        display_force2 = self.last_valid_forces[0]['force2']
-                        # Get raw accuracy and apply the curve for display
-                        raw_accuracy = self.last_valid_forces[0]['accuracy']
-                        display_accuracy = round(100 * (raw_accuracy / 100) ** 1.7) if raw_accuracy is not None else 0 # Apply curve here
-                        
-                        for widget in widgets_by_esp[0]:
-                            sensor_idx = widget['sensor_idx']
-                            widget['force'].setText(f"Force {sensor_idx+1}:")
-                            
-                            # Set correct force value for each sensor's bar
-                            if sensor_idx == 0:
-                                widget['bar'].setValue(min(1500, max(0, int(display_force1))))
-                            else:
-                                widget['bar'].setValue(min(1500, max(0, int(display_force2))))
-                            
-                            # Both widgets show the same max force value and accuracy
-                            widget['force_value'].setText(f"{display_force} N")
-                            widget['accuracy_value'].setText(f"{display_accuracy}%")
-                    else:
-                        for widget in widgets_by_esp[0]:
-                            sensor_idx = widget['sensor_idx']
-                            widget['force'].setText(f"Force {sensor_idx+1}:")
-                            widget['force_value'].setText("N/A")
-                            widget['accuracy_value'].setText("N/A")
+                hit_id = handler.hit_count
+                waveform = handler.waveform
+                hit_time = handler.hit_time
+                forces, time_since_last, time_since_hit = handler.get_force_readings()
             except Exception as e:
-                print(f"Error reading from ESP32_1: {e}")
-                for widget in widgets_by_esp[0]:
+                log.warning("Error reading from %s: %s", handler.device_name, e)
+                for widget in widgets_by_esp[esp_idx]:
                     sensor_idx = widget['sensor_idx']
                     widget['force'].setText(f"Force {sensor_idx+1}:")
                     widget['force_value'].setText("Error")
                     widget['accuracy_value'].setText("N/A")
-        
-        # Update ESP32 #2
-        if self.bt2.is_connected and 1 in widgets_by_esp:
-            try:
-                # Get both force readings and time since last detection from ESP32 #2
-                force1, force2, time_since_last, time_since_hit = self.bt2.get_both_force_readings()
-                
-                # Check if readings are valid numbers
-                if isinstance(force1, (int, float)) and isinstance(force2, (int, float)):
-                    # Apply calibration factor to force1 which reads consistently lower
-                    # This ensures compatibility even if the ESP32 firmware hasn't been updated
-                    force2 *= 1.35
-                    
-                    # Calculate current max force
-                    max_force = max(force1, force2)
-                    
-                    # Calculate accuracy if at least one reading is above threshold
-                    if max_force >= 220:
-                        accuracy = round((min(force1, force2) / max_force * 100))
-                    else:
-                        # If we have valid past readings, keep using that accuracy
-                        accuracy = self.last_valid_forces[1]['accuracy'] if self.last_valid_forces[1]['accuracy'] is not None else 100
-                    
-                    # Only update display and tracking if we have a real hit (above threshold)
-                    if max_force >= 220:
-                        # Update last valid forces with current readings for any hit above 200N
-                        self.last_valid_forces[1]['force1'] = force1
-                        self.last_valid_forces[1]['force2'] = force2
-                        self.last_valid_forces[1]['max_force'] = max_force
-                        self.last_valid_forces[1]['accuracy'] = accuracy
-                        # Store the time since last message for this hit
-                        self.last_valid_forces[1]['time_since_last'] = time_since_last
-                        # Store the time since hit detection for this hit
-                        self.last_valid_forces[1]['time_since_hit'] = time_since_hit
-                    
-                    # Always use last valid max force for display
-                    if self.last_valid_forces[1]['max_force'] is not None:
-                        display_force = self.last_valid_forces[1]['max_force']
-                        display_force1 = self.last_valid_forces[1]['force1']
-                        display_force2 = self.last_valid_forces[1]['force2']
-                        # Get raw accuracy and apply the curve for display
-                        raw_accuracy = self.last_valid_forces[1]['accuracy']
-                        display_accuracy = round(100 * (raw_accuracy / 100) ** 1.7) if raw_accuracy is not None else 0 # Apply curve here
-                    else:
-                        display_force = 0
-                        display_force1 = 0
-                        display_force2 = 0
-                        display_accuracy = 0
-                    
-                    # Update widgets for ESP32 #2 with individual sensor readings
-                    for widget in widgets_by_esp[1]:
-                        sensor_idx = widget['sensor_idx']
-                        widget['force'].setText(f"Force {sensor_idx+1}:")
-                        
-                        # Set correct force value for each sensor's bar
-                        if sensor_idx == 0:
-                            widget['bar'].setValue(min(1500, max(0, int(display_force1))))
-                        else:
-                            widget['bar'].setValue(min(1500, max(0, int(display_force2))))
-                            
-                        # Both widgets show the same max force value and accuracy
-                        widget['force_value'].setText(f"{display_force} N")
-                        widget['accuracy_value'].setText(f"{display_accuracy}%")
-                else:
-                    # Invalid readings - but don't reset display
-                    # Keep displaying last valid reading
-                    if self.last_valid_forces[1]['max_force'] is not None:
-                        display_force = self.last_valid_forces[1]['max_force']
-                        display_force1 = self.last_valid_forces[1]['force1']
-                        display_force2 = self.last_valid_forces[1]['force2']
-                        # Get raw accuracy and apply the curve for display
-                        raw_accuracy = self.last_valid_forces[1]['accuracy']
-                        display_accuracy = round(100 * (raw_accuracy / 100) ** 1.7) if raw_accuracy is not None else 0 # Apply curve here
-                        
-                        for widget in widgets_by_esp[1]:
-                            sensor_idx = widget['sensor_idx']
-                            widget['force'].setText(f"Force {sensor_idx+1}:")
-                            
-                            # Set correct force value for each sensor's bar
-                            if sensor_idx == 0:
-                                widget['bar'].setValue(min(1500, max(0, int(display_force1))))
-                            else:
-                                widget['bar'].setValue(min(1500, max(0, int(display_force2))))
-                            
-                            # Both widgets show the same max force value and accuracy
-                            widget['force_value'].setText(f"{display_force} N")
-                            widget['accuracy_value'].setText(f"{display_accuracy}%")
-                    else:
-                        for widget in widgets_by_esp[1]:
-                            sensor_idx = widget['sensor_idx']
-                            widget['force'].setText(f"Force {sensor_idx+1}:")
-                            widget['force_value'].setText("N/A")
-                            widget['accuracy_value'].setText("N/A")
-            except Exception as e:
-                print(f"Error reading from ESP32_2: {e}")
-                for widget in widgets_by_esp[1]:
-                    sensor_idx = widget['sensor_idx']
-                    widget['force'].setText(f"Force {sensor_idx+1}:")
-                    widget['force_value'].setText("Error")
-                    widget['accuracy_value'].setText("N/A")
-                    
-        # Update Kicking School screen if visible
-        if hasattr(self, 'kicking_school_screen') and self.stack.currentWidget() == self.kicking_school_screen:
-            self._update_kicking_grade()
-
-        if self.stack.currentWidget() == self.reaction_screen and self.reaction_active:
-            lv = self.last_valid_forces[0]
-            if lv['max_force'] is not None and lv['max_force'] >= self.reaction_threshold:
-                rt_ms = ((time.perf_counter() - self.reaction_start_time)*1000)
-                # Get processing delay - the time between hit detection and data transmission
-                time_since_hit_ms = lv.get('time_since_hit', 0)
-                # Subtract the processing delay to get the true reaction time
-                true_rt_ms = rt_ms - time_since_hit_ms
-                
-                print(f"[DEBUG] Reaction time: {rt_ms:.0f}ms, Processing delay: {time_since_hit_ms}ms, True reaction time: {true_rt_ms:.0f}ms")
-                
-                # Show the corrected reaction time or "Invalid time" if it's too fast
-                if true_rt_ms < 50:
-                    self.reaction_time_lbl.setText("Reaction Time: Invalid time")
-                else:
-                    self.reaction_time_lbl.setText(f"Reaction Time: {true_rt_ms:.0f} ms")
-                self.reaction_active = False
-
-        # Speed combo drill detection using last_valid_forces[0]
-        if self.stack.currentWidget() == self.speed_screen and self.speed_active:
-            lv = self.last_valid_forces[0]
-            elapsed = time.perf_counter() - self.speed_start_time
-            
-            # Get the processing delay - time between hit detection and data transmission
-            time_since_hit_ms = lv.get('time_since_hit', 0) if lv.get('max_force') is not None else 0
+                continue
+            if forces is not None:
+                frame[esp_idx] = forces
+                timings[esp_idx] = (time_since_last, time_since_hit, hit_id, waveform, hit_time)
+            shown.append(esp_idx)
+
+        # Localise every paddle's reading in one batch (applies sensor calibration too)
+        locations = self.localiser.localise_batch(frame)
+
+        for esp_idx in shown:
+            loc = locations.get(esp_idx)
+
+            # Only update tracking if we have a real hit (above threshold)
+            if loc is not None and loc.max_force >= self.paddles[esp_idx].thresholds.hit:
+                time_since_last, time_since_hit, hit_id, waveform, hit_time = timings[esp_idx]
+                hit = HitEvent(
+                    paddle=esp_idx, hit_id=hit_id,
+                    t=hit_time if hit_time is not None else time.perf_counter(),
+                    forces=loc.forces, max_force=loc.max_force, accuracy=loc.accuracy, x=loc.x, y=loc.y,
+                    features=extract_features(loc.forces, waveform) if waveform else None,
+                    time_since_last=time_since_last, time_since_hit=time_since_hit)
+                state.record(esp_idx, hit)
+
+                # Each hit window becomes one event (heat map + drills), however many ticks it is shown
+                if hit_id != state.seen_hit[esp_idx]:
+                    state.seen_hit[esp_idx] = hit_id
+                    self.heatmaps[esp_idx].add_hit(loc.x, loc.y)
+                    events.append(hit)
+                    hit_log = self.hit_logs.get(self.athlete)
+                    if hit_log is None:
+                        hit_log = self.hit_logs[self.athlete] = HitLog()
+                    hit_log.append(hit)
+                    if self.hit_writer is not None:
+                        self.hit_writer.append(hit, self.athlete, self.paddles[esp_idx].device_name,
+                                               self.drills.drill_for(esp_idx))
+
+            self._refresh_force_widgets(widgets_by_esp[esp_idx], state.last_hit[esp_idx], esp_idx in frame)
+
+        # Merge this frame's hit windows into kicks and hand finished kicks to the
+        # drills in kick order, then drive their timers
+        kicks = []
+        if events:
+            kicks = self.kicks.add_frame(sorted(events, key=lambda e: e.t) if len(events) > 1 else events)
+        kicks += self.kicks.tick(time.perf_counter())
+        if kicks:
+            school = (hasattr(self, 'kicking_school_screen')
+                      and self.stack.currentWidget() == self.kicking_school_screen)
+            for k in kicks:
+                state.last_kick[k.paddle] = k
+                self.analytics.add_kick(self.athlete, k, self._classify_kick(k))
+                self.leaderboard.add_kick(self.athlete, k, detail=f"ESP32 #{k.paddle+1}")
+                # Scoreboards and the hub count kicks, not the hit windows they were merged from
+                if self.publisher is not None or self.hub is not None:
+                    self._broadcast("hit", {
+                        "paddle": k.paddle, "device": self.paddles[k.paddle].device_name,
+                        "hit_id": k.hit_id, "force": round(k.max_force, 1), "accuracy": k.accuracy,
+                        "forces": [round(f, 1) for f in k.forces], "x": round(k.x, 1), "y": round(k.y, 1),
+                        "athlete": self.athlete}, t=k.t)
+                # Kicking School grades each finished kick on the selected paddle
+                if school and k.paddle == getattr(self, 'active_kicking_esp_idx', None):
+                    self._update_kicking_grade(k)
+            self.drills.dispatch_frame(kicks)
+        self.drills.tick()
+        self.rate_control.tick(armed=self.drills.active_paddles())
+
+        self._refresh_waveforms()
+
+        # Link health changes slowly; redraw it twice a second
+        now = time.perf_counter()
+        if now - self._link_refresh >= 0.5:
+            self._link_refresh = now
+            self._refresh_link_status()
+            self._refresh_analytics()
+            self._refresh_leaderboard()
+            if self.profiler is not None:
+                self._refresh_profiler_overlay()
+            if self.export_job is not None:
+                self._refresh_export()
             
-            # Calculate the true elapsed time by subtracting the processing delay
-            true_elapsed = elapsed - (time_since_hit_ms / 1000.0)
-            
-            if lv['max_force'] is not None and lv['max_force'] >= self.speed_threshold:
-                # For debug, show all timing information
-                print(f"[DEBUG] Speed drill hit detected - Raw elapsed: {elapsed:.3f}s, Processing delay: {time_since_hit_ms}ms, True elapsed: {true_elapsed:.3f}s")
-                
-                # Update UI with the combo count
-                self.speed_combo += 1
-                self.combo_lbl.setText(f"Combo: {self.speed_combo}")
-                
-                # Make it harder every 5 kicks
-                if self.speed_combo % 5 == 0:
-                    self.speed_time_limit = max(0.1, self.speed_time_limit - 0.1)
-                    print(f"[DEBUG] Speed limit decreased to {self.speed_time_limit:.1f}s")
-                    
-                # Start the next kick
-                self._next_kick()
-            elif true_elapsed > self.speed_time_limit:
-                print(f"[DEBUG] Speed drill timeout - Raw elapsed: {elapsed:.3f}s, Processing delay: {time_since_hit_ms}ms, True elapsed: {true_elapsed:.3f}s, Limit: {self.speed_time_limit:.1f}s")
-                self.kick_lbl.setText("Drill ended!")
-                self.speed_active = False
-            
-    def _update_kicking_grade(self):
-        # Check if selected device is connected
-        if not hasattr(self, 'active_kicking_device') or not self.active_kicking_device.is_connected:
+    def _screen_name(self):
+        # "force_screen" etc. for the visible screen; cached, this runs on every profiled event
+        w = self.stack.currentWidget()
+        name = self._screen_names.get(w)
+        if name is None:
+            name = next((k[:-7] for k, v in vars(self).items() if k.endswith("_screen") and v is w), "?")
+            self._screen_names[w] = name
+        return name
+
+    def _refresh_profiler_overlay(self):
+        self.profiler_overlay.setText(self.profiler.overlay_text())
+        self.profiler_overlay.adjustSize()
+        self.profiler_overlay.raise_()
+
+    STREAM_BATCH = 5  # raw samples per notification while the force screen is showing
+
+    def _refresh_waveforms(self):
+        # The raw stream costs airtime, so paddles only send it while the force screen is up
+        visible = self.stack.currentWidget() == self.force_screen
+        for esp_idx, plot in self.waveforms.items():
+            handler = self.paddles[esp_idx]
+            if handler.simulated:
+                continue
+            want = visible and handler.is_connected
+            if want and esp_idx not in self._streaming:
+                self._streaming.add(esp_idx)
+                handler.set_stream(self.STREAM_BATCH)
+            elif not want and esp_idx in self._streaming:
+                self._streaming.discard(esp_idx)
+                if handler.is_connected:
+                    handler.set_stream(0)
+                recorder = self._recorders.pop(esp_idx, None)
+                if recorder is not None:
+                    recorder.close()
+            if want:
+                ring, rate_hz = handler.samples, 1000.0 / handler.profile.sample_interval_ms
+                plot.set_source(ring, rate_hz)
+                plot.set_threshold(handler.thresholds.hit)
+                plot.refresh()
+                if self.history is not None and ring is not None:
+                    self._record_stream(esp_idx, handler, ring, rate_hz)
+
+    def _record_stream(self, esp_idx, handler, ring, rate_hz):
+        recorder = self._recorders.get(esp_idx)
+        # A new ring (reconnect, different sensor count) or rate starts a new session
+        if recorder is not None and (recorder.channels != ring.channels or recorder.rate_hz != rate_hz):
+            recorder.close()
+            recorder = None
+        if recorder is None:
+            recorder = self._recorders[esp_idx] = self.history.recorder(handler.device_name, ring.channels, rate_hz)
+        if not recorder.extend_from_ring(ring):
+            # The ring lapped us (UI stalled): end the session at the gap, resume in a new one
+            log.warning("%s: %d raw samples lost, starting a new history session",
+                        handler.device_name, recorder.dropped)
+            recorder.close()
+            recorder = self._recorders[esp_idx] = self.history.recorder(handler.device_name, ring.channels, rate_hz)
+            recorder.extend_from_ring(ring)
+
+    def _refresh_force_widgets(self, widgets, hit, reading_valid):
+        # Always use last valid max force for display; don't reset on invalid readings
+        if hit is not None:
+            display_forces = hit.forces
+            display_force = hit.max_force
+            # Get raw accuracy and apply the curve for display
+            raw_accuracy = hit.accuracy
+            display_accuracy = round(100 * (raw_accuracy / 100) ** 1.7) if raw_accuracy is not None else 0 # Apply curve here
+        elif reading_valid:
+            display_forces = None
+            display_force = 0
+            display_accuracy = 0
+        else:
+            for widget in widgets:
+                sensor_idx = widget['sensor_idx']
+                widget['force'].setText(f"Force {sensor_idx+1}:")
+                widget['force_value'].setText("N/A")
+                widget['accuracy_value'].setText("N/A")
             return
+
+        for widget in widgets:
+            sensor_idx = widget['sensor_idx']
+            widget['force'].setText(f"Force {sensor_idx+1}:")
+
+            # Set correct force value for each sensor's bar
+            sensor_force = display_forces[sensor_idx] if display_forces and sensor_idx < len(display_forces) else 0
+            widget['bar'].setValue(min(1500, max(0, int(sensor_force))))
+
+            # All sensor widgets show the same max force value and accuracy
+            widget['force_value'].setText(f"{display_force} N")
+            widget['accuracy_value'].setText(f"{display_accuracy}%")
+
+    def _update_kicking_grade(self, kick):
+        """Show the grade of one finished kick (KickAggregator) on the Kicking School screen."""
+        # Only the selected kick earns a grade
+        if self.school_kick_combo.currentIndex() > 0:
+            expected = self.school_kick_combo.currentText()
+            accepted, predicted = (self.kick_classifier.verify(self.athlete, expected, kick.features)
+                                   if kick.features is not None else (True, None))
+            if not accepted:
+                self.grade_value.setText("✗")
+                self.grade_value.setStyleSheet("color:#e74c3c;")
+                self.force_label.setText(f"Looked like a {predicted}")
+                self.force_percent.setText("--")
+                self.accuracy_label.setText("--")
+                return
+
+        # Get values from the kick's best window
+        max_force = kick.max_force
+        raw_accuracy = kick.accuracy # Get raw accuracy
+
+        # Apply the curve
+        adjusted_accuracy = round(100 * (raw_accuracy / 100) ** 1.7)
+
+        # Calculate force percentage (200N = 20%, 1000N = 100%, >1000N can exceed 100%)
+        force_percent = min(120, max(0, (max_force / 1000) * 100))
+
+        # Calculate grade as average of force percent and ADJUSTED accuracy
+        grade_percent = (force_percent + adjusted_accuracy) / 2
+
+        # Determine letter grade with new thresholds
+        letter_grade = "F"
+        if grade_percent >= 80:
+            letter_grade = "A"
+        elif grade_percent >= 65:
+            letter_grade = "B"
+        elif grade_percent >= 55:
+            letter_grade = "C"
+        elif grade_percent >= 40:
+            letter_grade = "D"
             
-        esp_idx = self.active_kicking_esp_idx
+        # Update UI
+        self.grade_value.setText(letter_grade)
+        self.force_label.setText(f"{max_force} N")
+        self.force_percent.setText(f"{force_percent:.1f}%")
+        self.accuracy_label.setText(f"{adjusted_accuracy}%")
         
-        # Check if we have valid force readings
-        if self.last_valid_forces[esp_idx]['max_force'] is not None and self.last_valid_forces[esp_idx]['max_force'] >= 220:
-            # Get values from the best readings
-            max_force = self.last_valid_forces[esp_idx]['max_force']
-            raw_accuracy = self.last_valid_forces[esp_idx]['accuracy'] # Get raw accuracy
-
-            # Apply the curve
-            adjusted_accuracy = round(100 * (raw_accuracy / 100) ** 1.7)
-
-            # Calculate force percentage (200N = 20%, 1000N = 100%, >1000N can exceed 100%)
-            force_percent = min(120, max(0, (max_force / 1000) * 100))
-
-            # Calculate grade as average of force percent and ADJUSTED accuracy
-            grade_percent = (force_percent + adjusted_accuracy) / 2
-
-            # Determine letter grade with new thresholds
-            letter_grade = "F"
-            if grade_percent >= 80:
-                letter_grade = "A"
-            elif grade_percent >= 65:
-                letter_grade = "B"
-            elif grade_percent >= 55:
-                letter_grade = "C"
-            elif grade_percent >= 40:
-                letter_grade = "D"
-                
-            # Update UI
-            self.grade_value.setText(letter_grade)
-            self.force_label.setText(f"{max_force} N")
-            self.force_percent.setText(f"{force_percent:.1f}%")
-            self.accuracy_label.setText(f"{adjusted_accuracy}%")
-            
-            # Set grade color based on letter
-            grade_colors = {
-                "A": "#27ae60",  # Green
-                "B": "#2980b9",  # Blue
-                "C": "#f39c12",  # Orange
-                "D": "#e67e22",  # Dark Orange
-                "F": "#e74c3c",  # Red
-            }
-            self.grade_value.setStyleSheet(f"color:{grade_colors[letter_grade]};")
+        # Set grade color based on letter
+        grade_colors = {
+            "A": "#27ae60",  # Green
+            "B": "#2980b9",  # Blue
+            "C": "#f39c12",  # Orange
+            "D": "#e67e22",  # Dark Orange
+            "F": "#e74c3c",  # Red
+        }
+        self.grade_value.setStyleSheet(f"color:{grade_colors[letter_grade]};")
 
     def _show_force(self):       self.stack.setCurrentWidget(self.force_screen)
     def _show_training(self):    self.stack.setCurrentWidget(self.training_screen)
     def _show_games(self):       self.stack.setCurrentWidget(self.games_screen)
-    def _show_settings(self):    self.stack.setCurrentWidget(self.settings_screen)
+
+    def _show_settings(self):
+        self.stack.setCurrentWidget(self.settings_screen)
+        self._show_latest_history()
 
 
     # Connect/disconnect logic
@@ -1133,14 +1687,180 @@ class MainWindow(QtWidgets.QMainWindow):
         units_cb = QtWidgets.QComboBox()
         units_cb.addItems(["Newtons (N)", "Pounds (lbs)", "Kilograms (kg)"])
         form.addRow("Force Units:", units_cb)
+        # Paddle firmware profile: trade hit latency against radio airtime
+        profile_cb = QtWidgets.QComboBox()
+        profile_cb.addItem("Auto (per drill)", "auto")
+        profile_cb.addItem("Default", "default")
+        profile_cb.addItem("Low latency", "low_latency")
+        profile_cb.addItem("Low airtime (big classes)", "low_airtime")
+        profile_cb.currentIndexChanged.connect(lambda _: self._set_profile_mode(profile_cb.currentData()))
+        form.addRow("Paddle Profile:", profile_cb)
         save_btn = QtWidgets.QPushButton("Save Settings")
         save_btn.setStyleSheet("background:#9b59b6; color:white; padding:10px;")
         vlayout.addLayout(form)
         vlayout.addWidget(save_btn)
+
+        # Export recorded sessions (needs --history) for spreadsheets and notebooks
+        export_gb = QtWidgets.QGroupBox("Export Sessions")
+        export_form = QtWidgets.QFormLayout(export_gb)
+        self.export_athlete = QtWidgets.QLineEdit()
+        self.export_athlete.setPlaceholderText("All athletes")
+        export_form.addRow("Athlete:", self.export_athlete)
+        today = QtCore.QDate.currentDate()
+        self.export_since = QtWidgets.QDateEdit(today.addMonths(-1))
+        self.export_since.setCalendarPopup(True)
+        self.export_until = QtWidgets.QDateEdit(today)
+        self.export_until.setCalendarPopup(True)
+        dates = QtWidgets.QHBoxLayout()
+        dates.addWidget(self.export_since)
+        dates.addWidget(QtWidgets.QLabel("to"))
+        dates.addWidget(self.export_until)
+        export_form.addRow("Dates:", dates)
+        self.export_drill = QtWidgets.QComboBox()
+        self.export_drill.addItem("All", None)
+        for drill in ("ReactionDrill", "SpeedDrill", "TargetDrill", "ComboDrill", "SparringDrill"):
+            self.export_drill.addItem(drill, drill)
+        export_form.addRow("Drill:", self.export_drill)
+        self.export_samples_cb = QtWidgets.QCheckBox("Include raw sensor samples")
+        export_form.addRow("", self.export_samples_cb)
+        self.export_btn = QtWidgets.QPushButton("Export…")
+        self.export_btn.clicked.connect(self._start_export)
+        self.export_progress = QtWidgets.QProgressBar()
+        self.export_progress.setRange(0, 100)
+        self.export_status_lbl = QtWidgets.QLabel("" if self.history is not None
+                                                  else "Start with --history DIR to record sessions")
+        export_form.addRow(self.export_btn, self.export_progress)
+        export_form.addRow("", self.export_status_lbl)
+        export_gb.setEnabled(self.history is not None)
+        vlayout.addWidget(export_gb)
+
+        # Browse recorded raw streams: one pyramid query per view, at most a point per pixel
+        history_gb = QtWidgets.QGroupBox("Browse History")
+        history_layout = QtWidgets.QVBoxLayout(history_gb)
+        controls = QtWidgets.QHBoxLayout()
+        self.history_device = QtWidgets.QComboBox()
+        self.history_span = QtWidgets.QComboBox()
+        for label, seconds in (("10 s", 10), ("1 min", 60), ("10 min", 600), ("1 hour", 3600),
+                               ("1 day", 86400), ("1 week", 7 * 86400)):
+            self.history_span.addItem(label, seconds)
+        self.history_span.setCurrentIndex(1)
+        self.history_end = None   # unix time at the right edge of the view; None follows the latest data
+        earlier_btn = QtWidgets.QPushButton("◀")
+        later_btn = QtWidgets.QPushButton("▶")
+        latest_btn = QtWidgets.QPushButton("Latest")
+        earlier_btn.clicked.connect(lambda: self._show_history(-0.5))
+        later_btn.clicked.connect(lambda: self._show_history(0.5))
+        latest_btn.clicked.connect(self._show_latest_history)
+        self.history_device.activated.connect(lambda _: self._show_history())
+        self.history_span.activated.connect(lambda _: self._show_history())
+        for widget in (self.history_device, self.history_span, earlier_btn, later_btn, latest_btn):
+            controls.addWidget(widget)
+        self.history_range_lbl = QtWidgets.QLabel("")
+        controls.addWidget(self.history_range_lbl, 1)
+        history_layout.addLayout(controls)
+        self.history_plot = WaveformPlot()
+        self.history_plot.setMinimumHeight(160)
+        history_layout.addWidget(self.history_plot)
+        history_gb.setEnabled(self.history is not None)
+        vlayout.addWidget(history_gb)
         return w
 
+    def _show_latest_history(self):
+        self.history_end = None
+        self._show_history()
+
+    def _show_history(self, pan=0.0):
+        """Redraw the history plot, first moving the view by `pan` spans (negative = earlier)."""
+        if self.history is None:
+            return
+        devices = self.history.devices()
+        current = self.history_device.currentText()
+        if devices != [self.history_device.itemText(i) for i in range(self.history_device.count())]:
+            self.history_device.clear()
+            self.history_device.addItems(devices)
+            if current in devices:
+                self.history_device.setCurrentText(current)
+        device = self.history_device.currentText()
+        if not device:
+            self.history_range_lbl.setText("Nothing recorded yet")
+            return
+        for recorder in self._recorders.values():
+            recorder.flush()
+        span = self.history_span.currentData()
+        if self.history_end is None:
+            sessions = self.history.sessions(device)
+            self.history_end = max((r.end for r in sessions), default=time.time())
+        self.history_end += pan * span
+        t0, t1 = self.history_end - span, self.history_end
+        series = self.history.query(device, t0, t1, max_points=max(1, self.history_plot.width()))
+        self.history_plot.show_series(series, t0, t1)
+        self.history_range_lbl.setText(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t0))} – "
+                                       f"{time.strftime('%H:%M:%S', time.localtime(t1))}"
+                                       + ("" if series else "  (no data)"))
+
+    def _start_export(self):
+        if self.export_job is not None and not self.export_job.done:
+            self.export_job.cancel.set()
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export sessions", "sessions.csv",
+                                                        "CSV (*.csv);;NumPy archive (*.npz);;JSON lines (*.jsonl)")
+        if not path:
+            return
+        if self.hit_writer is not None:
+            self.hit_writer.flush()
+        athlete = self.export_athlete.text().strip()
+        flt = ExportFilter(athletes=[athlete] if athlete else None,
+                           since=self.export_since.date().toString("yyyy-MM-dd"),
+                           until=self.export_until.date().toString("yyyy-MM-dd"),
+                           drills=[self.export_drill.currentData()] if self.export_drill.currentData() else None)
+        # Runs on its own thread; _refresh_export() polls it twice a second
+        self.export_job = ExportJob(self.history.root, path, flt, samples=self.export_samples_cb.isChecked())
+        self.export_job.start()
+        self.export_btn.setText("Cancel")
+        self.export_status_lbl.setText(f"Exporting to {os.path.basename(path)}…")
+
+    def _refresh_export(self):
+        job = self.export_job
+        self.export_progress.setValue(int(job.progress * 100))
+        if not job.done:
+            return
+        self.export_job = None
+        self.export_btn.setText("Export…")
+        if job.error is not None:
+            self.export_status_lbl.setText(f"Export failed: {job.error}")
+        elif job.cancel.is_set():
+            self.export_status_lbl.setText("Export cancelled (file is incomplete)")
+        else:
+            self.export_progress.setValue(100)
+            self.export_status_lbl.setText(f"Exported {job.result['hits']} hits, {job.result['samples']} samples "
+                                           f"in {job.result['seconds']:.1f} s")
+
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    window = MainWindow()
+    # PADDLE_LOG_LEVEL=DEBUG shows every hit; PADDLE_LOG_JSON=run.jsonl records a session
+    setup_logging()
+    # --profile-ui or PADDLE_PROFILE_UI=<stall ms>: time every event dispatch, log stalls with stacks
+    profile_ui = os.environ.get("PADDLE_PROFILE_UI")
+    if "--profile-ui" in sys.argv:
+        profile_ui = profile_ui or "100"
+    profiler = None
+    if profile_ui:
+        try:
+            stall_ms = float(profile_ui)
+        except ValueError:
+            stall_ms = 0
+        # PADDLE_PROFILE_SAMPLE=1 (5 ms) or =<ms>: sampling profile on top of the stall watchdog
+        sample_ms = os.environ.get("PADDLE_PROFILE_SAMPLE")
+        try:
+            sample_ms = float(sample_ms) if sample_ms else 0
+        except ValueError:
+            sample_ms = 0
+        profiler = UiProfiler(threshold=(stall_ms if stall_ms > 1 else 100) / 1000.0,
+                              interval=(sample_ms if sample_ms > 1 else 5) / 1000.0,
+                              sample=bool(sample_ms)).start()
+        app = profiled_application(profiler, sys.argv)
+        app.aboutToQuit.connect(lambda: profiler.dump(os.environ.get("PADDLE_PROFILE_DUMP", "ui_profile.txt")))
+    else:
+        app = QtWidgets.QApplication(sys.argv)
+    window = MainWindow(profiler=profiler)
     window.show()
     sys.exit(app.exec())
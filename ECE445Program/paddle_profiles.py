@@ -0,0 +1,50 @@
+# paddle_profiles.py  – firmware sampling/windowing profiles pushed to paddles at connect time
+from dataclasses import dataclass, asdict
+
+@dataclass(frozen=True)
+class ParamProfile:
+    """Values that used to be compile-time constants in esp32sketch.ino."""
+    name:               str
+    sample_interval_ms: int   = 10      # READING_INTERVAL: how often the ADCs are read
+    window_ms:          int   = 300     # SEND_INTERVAL: hit window and heartbeat period
+    num_samples:        int   = 5       # ADC reads averaged per sample
+    max_force_n:        float = 1500.0  # MAX_FORCE_NEWTONS: force at full-scale ADC
+
+    def as_dict(self):
+        return asdict(self)
+
+
+PROFILES = {
+    # What the firmware shipped with
+    "default":     ParamProfile("default"),
+    # Reaction/target drills: short window so the hit reaches us ~150 ms sooner
+    "low_latency": ParamProfile("low_latency", sample_interval_ms=5, window_ms=150, num_samples=2),
+    # Big classes: fewer notifications per paddle so more paddles share the radio
+    "low_airtime": ParamProfile("low_airtime", sample_interval_ms=10, window_ms=600, num_samples=5),
+}
+
+# Profile each drill switches its paddles to when the profile setting is "Auto"
+DRILL_PROFILES = {
+    "reaction": "low_latency",
+    "target":   "low_latency",
+    "speed":    "default",
+    # Combos repeat paddles within a few hundred ms: short windows keep kicks apart
+    "combo":    "low_latency",
+    # Simultaneous-hit calls need first-contact times a few ms apart
+    "sparring": "low_latency",
+}
+
+
+def apply_profile(handler, profile: ParamProfile):
+    """Push every parameter of a profile to one paddle; returns the command futures.
+
+    The commands go out pipelined on the handler's command channel, so this
+    doesn't block – callers that care can wait on the futures.
+    """
+    handler.profile = profile
+    return [
+        handler.set_sample_interval(profile.sample_interval_ms),
+        handler.set_window(profile.window_ms),
+        handler.send_command("SAMPLES", profile.num_samples),
+        handler.send_command("MAXFORCE", f"{profile.max_force_n:.1f}"),
+    ]
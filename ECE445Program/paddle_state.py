@@ -0,0 +1,105 @@
+# paddle_state.py  – per-paddle UI state as typed columns, and a compact per-athlete hit log
+from array import array
+from drills import HitEvent
+from kick_classifier import NUM_FEATURES
+
+NAN = float("nan")
+
+
+class PaddleTable:
+    """What the 10 ms UI tick tracks for each paddle, one array per field, indexed by esp_idx.
+
+    Replaces the last_valid_forces / kick_timing dicts of dicts: every field
+    exists from the start with a fixed type, so the tick does index lookups
+    on flat arrays instead of string lookups on dicts that grow keys.
+    max_force stays 0.0 until a valid hit arrives, so "has a hit at or above
+    the threshold" is a single comparison.
+    """
+    def __init__(self, n):
+        self.n          = n
+        self.last_hit   = [None] * n             # HitEvent of the last valid hit shown
+        self.max_force  = array('d', [0.0] * n)  # of last_hit, 0.0 before the first
+        self.accuracy   = array('d', [0.0] * n)
+        self.last_kick  = [None] * n             # last finished kick (KickAggregator), for Kicking School
+        self.seen_hit   = array('l', [0] * n)    # last handler.hit_count turned into an event
+        self.seen_rx    = array('l', [-1] * n)   # rx count last drawn, to skip quiet paddles
+        # Kick sequence in progress (kick_timeout): start time of its first and latest
+        # window (perf_counter seconds) and the best hit so far
+        self.kick_active        = array('b', [0] * n)
+        self.kick_start         = array('d', [0.0] * n)
+        self.kick_last          = array('d', [0.0] * n)
+        self.kick_best_force    = array('d', [0.0] * n)
+        self.kick_best_accuracy = array('d', [0.0] * n)
+
+    def record(self, i, hit):
+        self.last_hit[i] = hit
+        self.max_force[i] = hit.max_force
+        self.accuracy[i] = hit.accuracy
+
+    def reset_kick(self, i):
+        self.kick_active[i] = 0
+        self.kick_start[i] = 0.0
+        self.kick_last[i] = 0.0
+        self.kick_best_force[i] = 0.0
+        self.kick_best_accuracy[i] = 0.0
+
+
+class HitLog:
+    """Growable columnar log of one athlete's hits.
+
+    Each hit is a row across typed arrays (about 90 bytes with 8 sensor slots,
+    against ~1 KB as a dict or object), so 10k+ hits per athlete stay small.
+    Columns can be read directly (log.max_force[i], sum(log.accuracy)...);
+    log[i] rebuilds a HitEvent.
+    """
+    def __init__(self, max_sensors=8):
+        self.max_sensors = max_sensors
+        self.t           = array('d')
+        self.paddle      = array('H')
+        self.hit_id      = array('l')
+        self.max_force   = array('f')
+        self.accuracy    = array('f')
+        self.x           = array('f')
+        self.y           = array('f')
+        self.n_sensors   = array('B')
+        self.forces      = array('f')   # max_sensors per hit, unused slots NaN
+        self.features    = array('f')   # NUM_FEATURES per hit, all NaN if the hit had none
+        self._pad_forces   = array('f', [NAN] * max_sensors)
+        self._pad_features = array('f', [NAN] * NUM_FEATURES)
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, e):
+        n = min(len(e.forces), self.max_sensors)
+        self.t.append(e.t)
+        self.paddle.append(e.paddle)
+        self.hit_id.append(e.hit_id)
+        self.max_force.append(e.max_force)
+        self.accuracy.append(e.accuracy)
+        self.x.append(e.x)
+        self.y.append(e.y)
+        self.n_sensors.append(n)
+        self.forces.extend(e.forces[:n])
+        self.forces.extend(self._pad_forces[n:])
+        self.features.extend(e.features if e.features is not None else self._pad_features)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        base = i * self.max_sensors
+        features = tuple(self.features[i * NUM_FEATURES:(i + 1) * NUM_FEATURES])
+        return HitEvent(paddle=self.paddle[i], hit_id=self.hit_id[i], t=self.t[i],
+                        forces=tuple(self.forces[base:base + self.n_sensors[i]]),
+                        max_force=self.max_force[i], accuracy=self.accuracy[i], x=self.x[i], y=self.y[i],
+                        features=None if features[0] != features[0] else features)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.t, self.paddle, self.hit_id, self.max_force, self.accuracy,
+                                                 self.x, self.y, self.n_sensors, self.forces, self.features))
@@ -0,0 +1,175 @@
+# profile_sweep.py  – measure the latency / airtime / loss trade‑off of paddle parameter profiles
+#
+#   python profile_sweep.py                      # named profiles against a virtual paddle
+#   python profile_sweep.py --grid --paddles 12  # sweep a parameter grid for a 12-paddle class
+#   python profile_sweep.py --device ESP32_1     # measure a real paddle over BLE
+#   python profile_sweep.py --json sweep.json    # also write machine-readable results
+import argparse, json, random, statistics, sys, time
+from paddle_profiles import ParamProfile, PROFILES, apply_profile
+from virtual_paddle import VirtualPaddle
+
+# Rough BLE 1M PHY link model, good for comparing profiles rather than absolute numbers
+CONN_INTERVAL_MS = 30.0      # typical central connection interval with several peripherals
+PACKET_OVERHEAD  = 14        # LL header + L2CAP + ATT bytes around each notification
+IFS_AND_ACK_US   = 380.0     # inter-frame spaces plus the empty ACK packet
+
+
+def packet_airtime_s(payload_len):
+    return ((payload_len + PACKET_OVERHEAD) * 8 + IFS_AND_ACK_US) / 1e6
+
+
+def sweep_virtual(profile, paddles=8, kicks=200, seed=1):
+    """Run one profile on a virtual paddle and model a class of `paddles` sharing the radio."""
+    rng = random.Random(seed)
+    vp = VirtualPaddle(sample_interval_ms=profile.sample_interval_ms, window_ms=profile.window_ms,
+                       num_samples=profile.num_samples, max_force_n=profile.max_force_n, seed=seed)
+    schedule = []
+    t = 1000.0
+    for _ in range(kicks):
+        t += rng.uniform(800, 2500)
+        start = int(t)
+        duration = rng.uniform(6, 40)        # foot contact time, ms
+        vp.kick(start, rng.uniform(250, 900), duration)
+        schedule.append((start, duration))
+    end_ms = int(t) + 2000
+    msgs = vp.run_until(end_ms)
+
+    # Airtime of this paddle's traffic, scaled to the whole class
+    seconds = end_ms / 1000.0
+    payload = sum(len(m) for _, m in msgs)
+    rate = len(msgs) / seconds
+    utilisation = paddles * sum(packet_airtime_s(len(m)) for _, m in msgs) / seconds
+    # Loaded radio: connection events get skipped, so packets wait and some are dropped
+    busy = utilisation / (1.0 - utilisation) if utilisation < 0.95 else 19.0
+    p_drop = min(0.5, 0.001 + 0.02 * busy)
+    queue_ms = 0.5 * CONN_INTERVAL_MS * busy
+
+    # Match hit notifications to the kicks that caused them
+    latencies = []
+    delivered = set()
+    k = 0
+    for t_ms, msg in msgs:
+        fields = msg.split(";")[0].split(",")
+        since_hit = int(fields[-1])
+        if not since_hit:
+            continue
+        if rng.random() < p_drop:
+            continue
+        hit_start = t_ms - since_hit
+        while k < len(schedule) and schedule[k][0] + schedule[k][1] + profile.sample_interval_ms < hit_start:
+            k += 1
+        if k < len(schedule) and schedule[k][0] <= hit_start and k not in delivered:
+            delivered.add(k)
+            link_ms = rng.uniform(0, CONN_INTERVAL_MS) + queue_ms
+            latencies.append(t_ms + link_ms - schedule[k][0])
+
+    return {
+        "profile": profile.name,
+        "sample_interval_ms": profile.sample_interval_ms,
+        "window_ms": profile.window_ms,
+        "num_samples": profile.num_samples,
+        "mode": "virtual",
+        "paddles": paddles,
+        "latency_ms_mean": statistics.fmean(latencies) if latencies else None,
+        "latency_ms_p95": sorted(latencies)[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        "notifications_per_s": rate,
+        "bytes_per_s": payload / seconds,
+        "class_airtime_pct": 100.0 * utilisation,
+        "kick_loss_pct": 100.0 * (1 - len(delivered) / len(schedule)),
+    }
+
+
+def sweep_real(handler, profile, seconds=20.0):
+    """Apply a profile to a connected paddle and measure it while nobody kicks."""
+    for fut in apply_profile(handler, profile):
+        fut.result(timeout=5)
+    # Command round trip approximates the link's share of the latency
+    rtts = []
+    for _ in range(10):
+        t0 = time.perf_counter()
+        handler.send_command("LED", 0).result(timeout=5)
+        rtts.append((time.perf_counter() - t0) * 1000)
+    count0, bytes0, beats0 = handler.rx_stats()
+    time.sleep(seconds)
+    count1, bytes1, beats1 = handler.rx_stats()
+    expected = seconds * 1000.0 / profile.window_ms
+    health = handler.link_health()
+    return {
+        "profile": profile.name,
+        "sample_interval_ms": profile.sample_interval_ms,
+        "window_ms": profile.window_ms,
+        "num_samples": profile.num_samples,
+        "mode": "real",
+        "paddles": 1,
+        # Kick onset → notification: rest of the window plus half a sample plus one-way link
+        "latency_ms_mean": profile.window_ms + profile.sample_interval_ms / 2 + statistics.median(rtts) / 2,
+        "latency_ms_p95": profile.window_ms + profile.sample_interval_ms + max(rtts) / 2,
+        "notifications_per_s": (count1 - count0) / seconds,
+        "bytes_per_s": (bytes1 - bytes0) / seconds,
+        "class_airtime_pct": None,
+        # Sequence-numbered firmware gives exact loss; otherwise count missing heartbeats
+        "kick_loss_pct": (health.loss_pct if health.state != "unknown"
+                          else 100.0 * max(0.0, 1 - (beats1 - beats0) / expected)),
+        "link_state": health.summary(),
+        "rssi": health.rssi,
+    }
+
+
+def grid_profiles():
+    for interval in (5, 10, 20):
+        for window in (150, 300, 600):
+            for samples in (2, 5):
+                yield ParamProfile(f"{interval}ms/{window}ms/x{samples}", interval, window, samples)
+
+
+def print_table(rows):
+    cols = [("profile", 18, "{}"), ("latency_ms_mean", 10, "{:.0f}"), ("latency_ms_p95", 10, "{:.0f}"),
+            ("notifications_per_s", 10, "{:.2f}"), ("bytes_per_s", 10, "{:.0f}"),
+            ("class_airtime_pct", 10, "{:.2f}"), ("kick_loss_pct", 10, "{:.1f}")]
+    heads = ["profile", "lat mean", "lat p95", "notif/s", "bytes/s", "airtime%", "loss%"]
+    print("".join(h.ljust(w) for h, (_, w, _) in zip(heads, cols)))
+    for row in rows:
+        line = ""
+        for key, width, fmt in cols:
+            v = row[key]
+            line += ("-" if v is None else fmt.format(v)).ljust(width)
+        print(line)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--device", help="measure a real paddle with this BLE name instead of a virtual one")
+    ap.add_argument("--seconds", type=float, default=20.0, help="measurement time per profile (real paddle)")
+    ap.add_argument("--paddles", type=int, default=8, help="class size sharing the radio (virtual)")
+    ap.add_argument("--kicks", type=int, default=200, help="kicks simulated per profile (virtual)")
+    ap.add_argument("--grid", action="store_true", help="sweep a parameter grid, not just named profiles")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args(argv)
+
+    profiles = list(grid_profiles()) if args.grid else list(PROFILES.values())
+    rows = []
+    if args.device:
+        from bluetooth_handler import BluetoothHandler
+        handler = BluetoothHandler(args.device)
+        if not handler.connect():
+            print(f"Could not connect to {args.device}")
+            return 1
+        try:
+            for profile in profiles:
+                rows.append(sweep_real(handler, profile, args.seconds))
+        finally:
+            apply_profile(handler, PROFILES["default"])
+            handler.disconnect()
+    else:
+        for profile in profiles:
+            rows.append(sweep_virtual(profile, args.paddles, args.kicks))
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# rate_controller.py  – host‑side adaptive heartbeat rate: sparse when idle, full rate when kicking
+import time
+
+class RateController:
+    """Keeps idle paddles on sparse heartbeats so airtime scales with active paddles.
+
+    A paddle is active while it is bound to an armed drill or has been hit in the
+    last `idle_after` seconds; active paddles heartbeat at their profile's window,
+    idle ones at `idle_heartbeat_ms`.  Hits are sent the moment their window
+    closes whatever the heartbeat rate, so going idle never delays a kick – it
+    only thins out the "nothing happened" traffic.
+
+    tick() reconciles every paddle's wanted rate with what its firmware was last
+    told (handler.heartbeat_ms) and sends HEARTBEAT over the command channel when
+    they differ, so profile switches and reconnects are picked up automatically.
+    """
+    def __init__(self, handlers, idle_after=8.0, idle_heartbeat_ms=3000):
+        self.handlers          = handlers
+        self.idle_after        = idle_after         # seconds without hits before a paddle goes idle
+        self.idle_heartbeat_ms = idle_heartbeat_ms
+        self._last_hits     = [None] * len(handlers)
+        self._last_activity = [0.0] * len(handlers)
+        self._active        = [False] * len(handlers)
+        self._pending       = set()   # paddles with a HEARTBEAT command in flight
+        self._unsupported   = set()   # paddles whose firmware NAKed HEARTBEAT
+
+    def is_active(self, idx):
+        return self._active[idx]
+
+    def active_paddles(self):
+        return [i for i, a in enumerate(self._active) if a]
+
+    def touch(self, idx, now=None):
+        """Count something other than a hit (e.g. opening the paddle's screen) as activity."""
+        self._last_activity[idx] = time.monotonic() if now is None else now
+
+    def tick(self, armed=(), now=None):
+        """Call from the UI timer; `armed` holds paddles bound to a running drill."""
+        now = time.monotonic() if now is None else now
+        for idx, handler in enumerate(self.handlers):
+            if not handler.is_connected or handler.simulated:
+                self._last_hits[idx] = None
+                self._active[idx] = False
+                continue
+            hits = handler.hit_count
+            if hits != self._last_hits[idx]:
+                # New hit, or a fresh connection: ramp up straight away
+                self._last_hits[idx] = hits
+                self._last_activity[idx] = now
+            active = idx in armed or now - self._last_activity[idx] < self.idle_after
+            self._active[idx] = active
+
+            window = handler.profile.window_ms
+            wanted = window if active else max(window, self.idle_heartbeat_ms)
+            if wanted != handler.heartbeat_ms and idx not in self._pending and idx not in self._unsupported:
+                self._pending.add(idx)
+                fut = handler.set_heartbeat(wanted)
+                fut.add_done_callback(lambda f, idx=idx: self._done(idx, f))
+
+    def _done(self, idx, fut):
+        # Runs on the handler's loop thread
+        self._pending.discard(idx)
+        exc = fut.exception()
+        handler = self.handlers[idx]
+        if isinstance(exc, RuntimeError):
+            # Older firmware: it stays at full rate
+            self._unsupported.add(idx)
+            handler.heartbeat_ms = handler.profile.window_ms
+        elif exc is not None:
+            handler.heartbeat_ms = None   # unknown – resend on the next tick
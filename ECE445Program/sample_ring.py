@@ -0,0 +1,50 @@
+# sample_ring.py  – fixed-size per-sensor ring of raw force samples (firmware STREAM mode)
+from array import array
+
+class SampleRing:
+    """Preallocated array('f') per channel; written by the BLE thread, read by plots.
+
+    `count` is the number of samples ever written and only advances after a
+    batch is stored, so a reader that asks for samples below count always gets
+    finished data (unless it lags a whole ring behind, which minmax() clamps).
+    """
+    def __init__(self, channels, capacity=8192):
+        self.channels = channels
+        self.capacity = capacity
+        self.data     = [array('f', bytes(4 * capacity)) for _ in range(channels)]
+        self._views   = [memoryview(a) for a in self.data]
+        self.count    = 0
+
+    def extend(self, values):
+        """Append interleaved samples: s0c0, s0c1, ..., s1c0, s1c1, ..."""
+        ch = self.channels
+        n = len(values) // ch
+        pos = self.count % self.capacity
+        for i in range(n):
+            for c in range(ch):
+                self.data[c][pos] = values[i * ch + c]
+            pos += 1
+            if pos == self.capacity:
+                pos = 0
+        self.count += n
+
+    def oldest(self):
+        return max(0, self.count - self.capacity)
+
+    def minmax(self, channel, start, stop):
+        """(min, max) of samples [start, stop) by absolute index, or None if none are held."""
+        start = max(start, self.oldest())
+        stop = min(stop, self.count)
+        if stop <= start:
+            return None
+        view = self._views[channel]
+        a, b = start % self.capacity, stop % self.capacity
+        if a < b or b == 0:
+            part = view[a:b or self.capacity]
+            return min(part), max(part)
+        # Wraps round the end of the buffer
+        head, tail = view[a:], view[:b]
+        return min(min(head), min(tail)), max(max(head), max(tail))
+
+    def latest(self, channel):
+        return self.data[channel][(self.count - 1) % self.capacity] if self.count else 0.0
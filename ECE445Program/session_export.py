@@ -0,0 +1,426 @@
+# session_export.py  – stream recorded hits and raw samples out of a history store as CSV, .npz or JSON lines
+#
+#   python session_export.py history/ hits.csv --athlete "Athlete 1" --since 2026-09-01 --until 2026-09-30
+#   python session_export.py history/ season.npz --samples          # hits plus every raw stream
+#   python session_export.py history/ reaction.jsonl --drill ReactionDrill
+#
+# Everything is read and written in chunks, so memory stays flat however much is exported.
+# .npz files are written directly in NumPy's format (numpy.load reads them; numpy itself is
+# not needed to write them).  With CSV and JSON lines, raw samples go to a sibling
+# "<name>.samples.<ext>" file.  With --athlete or --drill, raw samples are limited to the
+# stretches around the matching hits (SPAN_PAD either side, overlapping stretches merged).
+import argparse, csv, io, json, os, re, shutil, struct, sys, tempfile, threading, time, zipfile
+from array import array
+from history_store import HistoryStore
+from kick_classifier import NUM_FEATURES
+from app_log import get_logger
+
+log = get_logger("export")
+
+FORMATS = {".csv": "csv", ".npz": "npz", ".jsonl": "jsonl", ".json": "jsonl"}
+HIT_COLUMNS = ("t", "athlete", "device", "paddle", "hit_id", "force", "accuracy", "x", "y", "drill")
+MAX_SENSORS = 8
+CHUNK = 4096         # hits per chunk
+SAMPLE_CHUNK = 65536  # raw samples per chunk
+SPAN_PAD = 2.0       # seconds of raw samples kept either side of a matching hit
+
+
+def day_bounds(since=None, until=None):
+    """Unix times for "YYYY-MM-DD" dates: from the start of `since` to the end of `until`."""
+    t0 = time.mktime(time.strptime(since, "%Y-%m-%d")) if since else None
+    t1 = time.mktime(time.strptime(until, "%Y-%m-%d")) + 86400 if until else None
+    return t0, t1
+
+
+class ExportFilter:
+    """Which hits and samples to export; None means no restriction."""
+    def __init__(self, athletes=None, since=None, until=None, drills=None, devices=None):
+        self.athletes = set(athletes) if athletes else None
+        self.drills   = set(drills) if drills else None
+        self.devices  = set(devices) if devices else None
+        self.since, self.until = since, until
+        self.t0, self.t1 = day_bounds(since, until)
+
+    def day(self, day):
+        return (not self.since or day >= self.since) and (not self.until or day <= self.until)
+
+    def hit(self, h):
+        return ((self.athletes is None or h["athlete"] in self.athletes)
+                and (self.drills is None or h["drill"] in self.drills)
+                and (self.devices is None or h["device"] in self.devices)
+                and (self.t0 is None or h["t"] >= self.t0)
+                and (self.t1 is None or h["t"] < self.t1))
+
+
+# ---------- sources ----------
+def hit_files(store, flt):
+    return [path for day, path in store.hit_files() if flt.day(day)]
+
+
+def iter_hits(files, flt, progress=None):
+    """Chunks (lists) of matching hit dicts from the per-day files, in file order."""
+    chunk = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if progress is not None:
+                    progress(len(line))
+                h = json.loads(line)
+                if flt.hit(h):
+                    chunk.append(h)
+                    if len(chunk) >= CHUNK:
+                        yield chunk
+                        chunk = []
+    if chunk:
+        yield chunk
+
+
+def hit_spans(files, flt):
+    """{device: [(t0, t1)]} times within SPAN_PAD of a matching hit, merged and in order.
+
+    Sessions carry no athlete or drill, so this is how those filters reach raw samples."""
+    spans = {}
+    for chunk in iter_hits(files, flt):
+        for h in chunk:
+            spans.setdefault(h["device"], []).append((h["t"] - SPAN_PAD, h["t"] + SPAN_PAD))
+    for device, times in spans.items():
+        times.sort()
+        merged = [times[0]]
+        for t0, t1 in times[1:]:
+            if t0 <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], t1))
+            else:
+                merged.append((t0, t1))
+        spans[device] = merged
+    return spans
+
+
+def sample_ranges(store, flt, spans=None):
+    """[(PyramidReader, first, last)] raw-sample rows of every session inside the filter.
+
+    spans  hit_spans() – only rows inside these are kept (a session may give several ranges)."""
+    out = []
+    for reader in store.sessions():
+        if flt.devices is not None and reader.device not in flt.devices:
+            continue
+        windows = [(None, None)] if spans is None else spans.get(reader.device, [])
+        for t0, t1 in windows:
+            first, last = 0, reader.length(0)
+            for limit in (t0, flt.t0):
+                if limit is not None:
+                    first = max(first, int((limit - reader.start) * reader.rate_hz))
+            for limit in (t1, flt.t1):
+                if limit is not None:
+                    last = min(last, int((limit - reader.start) * reader.rate_hz))
+            if last > first:
+                out.append((reader, first, last))
+    return out
+
+
+def iter_samples(reader, first, last, progress=None):
+    """Raw rows [first, last) of one session as array('f') blocks of interleaved samples."""
+    ch = reader.channels
+    with open(os.path.join(reader.path, "L0.f32"), "rb") as f:
+        f.seek(first * ch * 4)
+        row = first
+        while row < last:
+            n = min(SAMPLE_CHUNK, last - row)
+            block = array('f')
+            block.fromfile(f, n * ch)
+            if progress is not None:
+                progress(n * ch * 4)
+            yield row, block
+            row += n
+
+
+# ---------- .npy members written without numpy ----------
+def _npy_header(descr, shape):
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': %r, }" % (descr, tuple(shape))
+    header += " " * (63 - (10 + len(header)) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def _write_member(zf, name, descr, shape, source):
+    """Add name.npy to the archive from a header and a file-like or bytes source."""
+    with zf.open(name + ".npy", "w", force_zip64=True) as out:
+        out.write(_npy_header(descr, shape))
+        if isinstance(source, (bytes, bytearray)):
+            out.write(source)
+        else:
+            shutil.copyfileobj(source, out, 1 << 20)
+
+
+def _strings(names):
+    width = max([1] + [len(n) for n in names])
+    return f"<U{width}", b"".join(n.ljust(width, "\0").encode("utf-32-le") for n in names)
+
+
+class _Column:
+    """One numeric column spooled to a temp file in chunks until its length is known."""
+    def __init__(self, typecode, descr, width=1):
+        self.typecode, self.descr, self.width = typecode, descr, width
+        self.rows = 0
+        self.file = tempfile.TemporaryFile()
+
+    def extend(self, values):
+        a = array(self.typecode, values)
+        self.rows += len(a) // self.width
+        a.tofile(self.file)
+
+    def write(self, zf, name):
+        self.file.seek(0)
+        shape = (self.rows,) if self.width == 1 else (self.rows, self.width)
+        _write_member(zf, name, self.descr, shape, self.file)
+        self.file.close()
+
+
+# ---------- sinks ----------
+class CsvSink:
+    def __init__(self, path, with_samples):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.out = csv.writer(self.file)
+        self.out.writerow(HIT_COLUMNS + tuple(f"f{i + 1}" for i in range(MAX_SENSORS)))
+        self.samples_path = _sibling(path, "samples") if with_samples else None
+        self.samples = None
+
+    def hits(self, chunk):
+        pad = [""] * MAX_SENSORS
+        self.out.writerows([h[c] for c in HIT_COLUMNS] + h["forces"][:MAX_SENSORS] + pad[len(h["forces"]):]
+                           for h in chunk)
+
+    def begin_samples(self, ranges):
+        self.samples_file = open(self.samples_path, "w", newline="", encoding="utf-8")
+        self.samples = csv.writer(self.samples_file)
+        channels = max(r.channels for r, _, _ in ranges)
+        self.samples.writerow(("t", "device", "session") + tuple(f"f{i + 1}" for i in range(channels)))
+
+    def sample_block(self, reader, row, block):
+        ch, session, step = reader.channels, os.path.basename(reader.path), 1.0 / reader.rate_hz
+        t0 = reader.start + row * step
+        self.samples.writerows((round(t0 + i * step, 4), reader.device, session, *block[i * ch:(i + 1) * ch])
+                               for i in range(len(block) // ch))
+
+    def close(self):
+        self.file.close()
+        if self.samples is not None:
+            self.samples_file.close()
+
+
+class JsonlSink:
+    def __init__(self, path, with_samples):
+        self.file = open(path, "w", encoding="utf-8")
+        self.samples_path = _sibling(path, "samples") if with_samples else None
+        self.samples_file = None
+
+    def hits(self, chunk):
+        self.file.write("".join(json.dumps(h) + "\n" for h in chunk))
+
+    def begin_samples(self, ranges):
+        self.samples_file = open(self.samples_path, "w", encoding="utf-8")
+
+    def sample_block(self, reader, row, block):
+        # One line per block: interleaved values from t0 at rate_hz
+        self.samples_file.write(json.dumps({
+            "device": reader.device, "session": os.path.basename(reader.path),
+            "t0": reader.start + row / reader.rate_hz, "rate_hz": reader.rate_hz,
+            "channels": reader.channels, "values": [round(v, 2) for v in block]}) + "\n")
+
+    def close(self):
+        self.file.close()
+        if self.samples_file is not None:
+            self.samples_file.close()
+
+
+class NpzSink:
+    """Hit columns as hit_<column> arrays (names in athletes/devices/drills, indexed by
+    hit_athlete etc.), each raw session as samples_<device>_<session> (rows × sensors)."""
+    def __init__(self, path, with_samples):
+        self.zf = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.cols = {"t": _Column('d', '<f8'), "paddle": _Column('h', '<i2'), "hit_id": _Column('q', '<i8'), "force": _Column('f', '<f4'),
+                     "accuracy": _Column('f', '<f4'), "x": _Column('f', '<f4'), "y": _Column('f', '<f4'),
+                     "forces": _Column('f', '<f4', MAX_SENSORS), "features": _Column('f', '<f4', NUM_FEATURES),
+                     "athlete": _Column('h', '<i2'), "device": _Column('h', '<i2'), "drill": _Column('h', '<i2')}
+        self.names = {"athlete": {}, "device": {}, "drill": {}}
+        self.pad_forces = [float("nan")] * MAX_SENSORS
+        self.pad_features = [float("nan")] * NUM_FEATURES
+
+    def _index(self, kind, name):
+        table = self.names[kind]
+        name = "" if name is None else name
+        i = table.get(name)
+        if i is None:
+            i = table[name] = len(table)
+        return i
+
+    def hits(self, chunk):
+        cols = self.cols
+        for key in ("t", "paddle", "hit_id", "force", "accuracy", "x", "y"):
+            cols[key].extend([h[key] for h in chunk])
+        forces = []
+        features = []
+        for h in chunk:
+            f = h["forces"][:MAX_SENSORS]
+            forces += f + self.pad_forces[len(f):]
+            features += h["features"] if h["features"] is not None else self.pad_features
+        cols["forces"].extend(forces)
+        cols["features"].extend(features)
+        for kind in ("athlete", "device", "drill"):
+            cols[kind].extend([self._index(kind, h[kind]) for h in chunk])
+
+    def begin_samples(self, ranges):
+        self.ranges = ranges
+
+    def sample_block(self, reader, row, block):
+        pass   # copied straight from L0 files in write_samples()
+
+    def write_samples(self, progress=None, cancel=None):
+        """Copy each range's raw rows straight into the archive (no decoding).
+        Returns the rows written; stops early (the last member cut short) on `cancel`."""
+        rows = 0
+        for reader, first, last in self.ranges:
+            if cancel is not None and cancel.is_set():
+                break
+            # A session split by hit_spans() gets one member per range, named by its first row
+            name = f"samples_{reader.device}_{os.path.basename(reader.path)}" + (f"_{first}" if first else "")
+            name = re.sub(r"[^\w-]", "_", name)
+            ch = reader.channels
+            with open(os.path.join(reader.path, "L0.f32"), "rb") as f:
+                f.seek(first * ch * 4)
+                source = _Limited(f, (last - first) * ch * 4, progress, cancel)
+                _write_member(self.zf, name, "<f4", (last - first, ch), source)
+            rows += source.read_bytes // (ch * 4)
+            _write_member(self.zf, name + "_t0", "<f8", (), struct.pack("<d", reader.start + first / reader.rate_hz))
+            _write_member(self.zf, name + "_rate_hz", "<f8", (), struct.pack("<d", reader.rate_hz))
+        return rows
+
+    def close(self):
+        for key, col in self.cols.items():
+            col.write(self.zf, f"hit_{key}")
+        for kind, table in self.names.items():
+            descr, data = _strings(list(table))
+            _write_member(self.zf, kind + "s", descr, (len(table),), data)
+        self.zf.close()
+
+
+class _Limited(io.RawIOBase):
+    """The next `size` bytes of a file, reporting progress as they are read.
+    Reads end early (as at end of file) once `cancel` is set."""
+    def __init__(self, f, size, progress=None, cancel=None):
+        self.f, self.left, self.progress, self.cancel = f, size, progress, cancel
+        self.read_bytes = 0
+
+    def read(self, n=-1):
+        if self.cancel is not None and self.cancel.is_set():
+            return b""
+        n = self.left if n is None or n < 0 else min(n, self.left)
+        data = self.f.read(n)
+        self.left -= len(data)
+        self.read_bytes += len(data)
+        if self.progress is not None:
+            self.progress(len(data))
+        return data
+
+
+def _sibling(path, tag):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{tag}{ext}"
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "npz": NpzSink}
+
+
+# ---------- driver ----------
+def export(root, path, flt=None, fmt=None, samples=False, progress=None, cancel=None):
+    """Export matching hits (and raw samples) from history store `root` to `path`.
+
+    progress  callable(fraction done) – called as input bytes are consumed
+    cancel    threading.Event; the export stops early (leaving a partial file) when set
+    Returns {"hits": n, "samples": n, "seconds": s}.
+    """
+    t_start = time.perf_counter()
+    flt = flt or ExportFilter()
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+    store = HistoryStore(root)
+    files = hit_files(store, flt)
+    spans = hit_spans(files, flt) if samples and (flt.athletes or flt.drills) else None
+    ranges = sample_ranges(store, flt, spans) if samples else []
+    total = sum(os.path.getsize(p) for p in files) + sum((b - a) * r.channels * 4 for r, a, b in ranges)
+    done = [0]
+    def advance(n):
+        done[0] += n
+        if progress is not None and total:
+            progress(min(1.0, done[0] / total))
+
+    sink = SINKS[fmt](path, samples and bool(ranges))
+    n_hits = n_samples = 0
+    try:
+        for chunk in iter_hits(files, flt, advance):
+            if cancel is not None and cancel.is_set():
+                break
+            sink.hits(chunk)
+            n_hits += len(chunk)
+        if ranges and not (cancel is not None and cancel.is_set()):
+            sink.begin_samples(ranges)
+            if fmt == "npz":
+                n_samples = sink.write_samples(advance, cancel)
+            else:
+                for reader, first, last in ranges:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    for row, block in iter_samples(reader, first, last, advance):
+                        if cancel is not None and cancel.is_set():
+                            break
+                        sink.sample_block(reader, row, block)
+                        n_samples += len(block) // reader.channels
+    finally:
+        sink.close()
+    seconds = time.perf_counter() - t_start
+    log.info("Exported %d hits and %d samples to %s in %.1f s", n_hits, n_samples, path, seconds)
+    return {"hits": n_hits, "samples": n_samples, "seconds": seconds}
+
+
+class ExportJob(threading.Thread):
+    """export() on a background thread; poll progress / done / result / error from the UI."""
+    def __init__(self, root, path, flt=None, fmt=None, samples=False):
+        super().__init__(name="export", daemon=True)
+        self.args     = (root, path, flt, fmt, samples)
+        self.progress = 0.0
+        self.result   = None
+        self.error    = None
+        self.done     = False
+        self.cancel   = threading.Event()
+
+    def run(self):
+        try:
+            self.result = export(*self.args, progress=self._progress, cancel=self.cancel)
+        except Exception as e:
+            log.warning("Export to %s failed: %s", self.args[1], e)
+            self.error = e
+        finally:
+            self.done = True
+
+    def _progress(self, fraction):
+        self.progress = fraction
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export recorded sessions")
+    ap.add_argument("root", help="history directory (main.py --history)")
+    ap.add_argument("output", help=".csv, .npz or .jsonl")
+    ap.add_argument("--format", choices=sorted(SINKS), help="default: from the output's extension")
+    ap.add_argument("--athlete", action="append", help="only these athletes (repeatable)")
+    ap.add_argument("--drill", action="append", help="only hits during these drills, e.g. ReactionDrill")
+    ap.add_argument("--device", action="append", help="only these paddles, e.g. ESP32_1")
+    ap.add_argument("--since", help="YYYY-MM-DD, inclusive")
+    ap.add_argument("--until", help="YYYY-MM-DD, inclusive")
+    ap.add_argument("--samples", action="store_true",
+                    help="also export raw sensor samples (with --athlete/--drill: only around their hits)")
+    args = ap.parse_args(argv)
+    flt = ExportFilter(args.athlete, args.since, args.until, args.drill, args.device)
+    result = export(args.root, args.output, flt, args.format, args.samples)
+    print(f"{result['hits']} hits, {result['samples']} samples in {result['seconds']:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+# conftest.py  – the app's modules are flat files in ECE445Program/; make them importable
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
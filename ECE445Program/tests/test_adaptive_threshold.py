@@ -0,0 +1,73 @@
+# test_adaptive_threshold.py  – P² quantiles and the per-paddle adaptive hit thresholds
+import random
+from adaptive_threshold import AdaptiveThreshold, P2Quantile
+
+
+def test_p2_quantiles_track_the_sample_quantiles():
+    rng = random.Random(1)
+    values = [rng.gauss(500, 100) for _ in range(5000)]
+    for p in (0.1, 0.5, 0.9):
+        est = P2Quantile(p)
+        for v in values:
+            est.add(v)
+        exact = sorted(values)[int(p * len(values))]
+        assert abs(est.value - exact) < 10
+
+
+def test_p2_before_five_samples():
+    est = P2Quantile(0.5)
+    assert est.value is None
+    for v in (3, 1, 2):
+        est.add(v)
+    assert est.value == 2
+
+
+def test_threshold_lowers_for_an_athlete_kicking_under_the_default():
+    th = AdaptiveThreshold()
+    th.athlete = "kid"
+    rng = random.Random(2)
+    for _ in range(20):                       # quiet paddle: noise floor well under 40 N
+        th.observe_noise(rng.uniform(2, 6))
+    assert th.hit == th.default_hit
+    # The kid's kicks peak at 110-170 N: the firmware (220 N) reports none of them as
+    # hits, they only show up as idle peaks in the heartbeats
+    for _ in range(30):
+        th.observe_noise(rng.uniform(110, 170))
+    assert th.hit < 100
+    assert th.stats().count == 30
+    assert th.noise.mean < 10                 # kicks kept out of the noise estimate
+
+
+def test_threshold_rises_for_hard_kicks_and_never_below_the_noise_floor():
+    th = AdaptiveThreshold()
+    th.athlete = "adult"
+    for _ in range(20):
+        th.observe_noise(30.0 + (_ % 2))
+    for _ in range(20):
+        th.observe_hit(1200.0)
+    assert th.hit > th.default_hit
+    assert th.drill >= th.hit
+    th.athlete = "nobody"
+    assert th.hit == th.default_hit
+
+
+def test_pushes_are_rate_limited():
+    pushed = []
+    th = AdaptiveThreshold(warmup=1, push_interval=3600, on_push=pushed.append)
+    th.athlete = "a"
+    th.observe_hit(1000.0)
+    th.observe_hit(2000.0)
+    assert len(pushed) == 1
+
+
+def test_idle_peaks_from_a_reported_hit_dont_raise_the_noise_floor():
+    pushed = []
+    th = AdaptiveThreshold(on_push=pushed.append)
+    th.athlete = "adult"
+    for _ in range(20):
+        th.observe_noise(5.0 + (_ % 3))
+    for _ in range(5):
+        th.observe_hit(600.0)
+        th.observe_noise(600.0)   # the hit's first sample, reported as idle by older firmware
+    assert th.hit == th.default_hit
+    assert th.noise.mean < 10 and not pushed
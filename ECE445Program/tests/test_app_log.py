@@ -0,0 +1,35 @@
+# test_app_log.py  – the background log writer: one write and one flush per batch
+import io, logging, queue
+from app_log import LogWriter
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = self.flushes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def record(msg, level=logging.INFO):
+    return logging.LogRecord("paddle.test", level, __file__, 1, msg, None, None)
+
+
+def test_batch_is_written_and_flushed_once_per_sink():
+    stream = CountingStream()
+    sink = logging.StreamHandler(stream)
+    sink.setLevel(logging.INFO)
+    q = queue.SimpleQueue()
+    for i in range(100):
+        q.put(record(f"hit {i}"))
+    q.put(record("noise", logging.DEBUG))
+    q.put(None)
+    LogWriter(q, [sink]).run()    # drains everything queued as one batch, then stops
+    assert stream.writes == 1 and stream.flushes == 1
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "hit 0" and lines[-1] == "hit 99" and len(lines) == 100
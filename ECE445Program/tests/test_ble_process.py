@@ -0,0 +1,81 @@
+# test_ble_process.py  – shared-memory rings between the ingest process and the GUI
+import pytest
+from ble_process import KIND_HEARTBEAT, KIND_HIT, ShmRing, ShmSamples
+
+
+@pytest.fixture
+def ring():
+    producer = ShmRing.create(capacity=8)
+    consumer = ShmRing.attach(producer.name)
+    yield producer, consumer
+    consumer.close()
+    producer.close()
+
+
+def write_hit(r, n, forces=(100.0, 200.0)):
+    r.write(KIND_HIT, float(n), forces, 5, 300, (10, 20, 1.5), None, n, n)
+
+
+def test_records_round_trip(ring):
+    producer, consumer = ring
+    write_hit(producer, 1)
+    producer.write(KIND_HEARTBEAT, 0.0, (1.0, 2.0), 300, 0, None, 4.5, 2, 1)
+    records, pos, dropped = consumer.read(0)
+    assert pos == 2 and dropped == 0
+    t, kind, n, tsl, tsh, rise, duration, impulse, idle, seq, hits, *forces = records[0]
+    assert (t, kind, n, tsl, tsh, rise, duration, seq, hits) == (1.0, KIND_HIT, 2, 5, 300, 10, 20, 1, 1)
+    assert impulse == pytest.approx(1.5) and forces[:2] == [100.0, 200.0]
+    assert records[1][1] == KIND_HEARTBEAT and records[1][8] == pytest.approx(4.5)
+    assert records[1][6] == -1                 # no waveform
+    assert consumer.read(pos) == ((), 2, 0)
+
+
+def test_a_lapped_reader_skips_what_was_overwritten(ring):
+    producer, consumer = ring
+    for n in range(1, 21):
+        write_hit(producer, n)
+    records, pos, dropped = consumer.read(0)
+    assert pos == 20 and dropped == 12
+    assert [r[9] for r in records] == list(range(13, 21))
+
+
+def test_a_record_being_written_is_not_returned(ring):
+    producer, consumer = ring
+    write_hit(producer, 1)
+    write_hit(producer, 2)
+    # The writer zeroes a slot's stamp before filling it (seqlock): a reader must skip it
+    ShmRing.STAMP.pack_into(producer.shm.buf, ShmRing.HEADER_SIZE + ShmRing.SLOT_SIZE, 0)
+    records, pos, dropped = consumer.read(0)
+    assert [r[9] for r in records] == [1] and dropped == 1 and pos == 2
+
+
+def test_forces_are_padded_and_capped():
+    producer = ShmRing.create(capacity=4)
+    try:
+        producer.write(KIND_HIT, 0.0, tuple(float(i) for i in range(12)), 0, 1, None, None, None, 1)
+        [record], _pos, _dropped = producer.read(0)
+        assert record[2] == 8 and record[9] == -1
+        assert record[11:] == tuple(float(i) for i in range(8))
+    finally:
+        producer.close()
+
+
+def test_shared_samples_follow_the_producers_streams():
+    gui = ShmSamples.create(capacity=16)
+    child = ShmSamples.attach(gui.name, capacity=16)
+    try:
+        assert gui.current() is None
+        w = child.start(2)
+        w.extend([1.0, 10.0, 2.0, 20.0, 3.0, 30.0])
+        r = gui.current()
+        assert (r.channels, r.count) == (2, 3)
+        assert r.minmax(1, 0, 3) == (10.0, 30.0) and r.latest(0) == 3.0
+        assert gui.current() is r                 # same stream, same ring
+        w.extend([float(i) for i in range(40)])
+        assert r.count == 23 and r.oldest() == 7
+        child.start(3)
+        r2 = gui.current()
+        assert r2 is not r and (r2.channels, r2.count) == (3, 0)
+    finally:
+        child.close()
+        gui.close()
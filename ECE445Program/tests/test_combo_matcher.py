@@ -0,0 +1,52 @@
+# test_combo_matcher.py  – combo pattern parsing and the trie NFA
+import pytest
+from combo_matcher import ANY, ComboMatcher, parse_combo
+
+KICKS = {"left": 0, "right": 1}
+
+
+def feed(matcher, hits):
+    state, done = matcher.start(), []
+    for paddle, kick, t in hits:
+        done += matcher.advance(state, paddle, kick, t)
+    return done, state
+
+
+def test_parse_combo():
+    steps = parse_combo("1, 2/Back Kick <400ms, * <300")
+    assert [(s.paddle, s.kick, s.gap) for s in steps] == [(0, ANY, None), (1, "Back Kick", 0.4), (ANY, ANY, 0.3)]
+    assert parse_combo("left, right <200", KICKS)[1].paddle == 1
+    with pytest.raises(ValueError):
+        parse_combo("0, 1")
+
+
+def test_gaps_are_enforced():
+    m = ComboMatcher({"Double": "1, 2 <500"})
+    assert feed(m, [(0, None, 0.0), (1, None, 0.4)])[0] == ["Double"]
+    assert feed(m, [(0, None, 0.0), (1, None, 0.6)])[0] == []
+
+
+def test_shared_prefixes_and_overlapping_attempts():
+    m = ComboMatcher({"Double": "1, 2 <500", "Triple": "1, 2 <500, 1 <500"})
+    done, _ = feed(m, [(0, None, 0.0), (1, None, 0.3), (0, None, 0.6), (1, None, 0.9)])
+    # 1,2 -> Double; 1,2,1 -> Triple; the third hit also starts a new 1,2 -> Double
+    assert done == ["Double", "Triple", "Double"]
+
+
+def test_kick_types_and_wildcards():
+    m = ComboMatcher({"Round-Back": "1/Roundhouse Kick, 2/Back Kick <800",
+                      "Axe Finish": "*/Axe Kick, * <300"})
+    assert feed(m, [(0, "Roundhouse Kick", 0.0), (1, "Back Kick", 0.5)])[0] == ["Round-Back"]
+    assert feed(m, [(0, "Front Kick", 0.0), (1, "Back Kick", 0.5)])[0] == []
+    assert feed(m, [(1, "Axe Kick", 0.0), (0, "Front Kick", 0.2)])[0] == ["Axe Finish"]
+    # Unknown kick type (untrained athlete) matches any kick
+    assert feed(m, [(0, None, 0.0), (1, None, 0.5)])[0] == ["Round-Back"]
+
+
+def test_a_wrong_hit_ends_the_attempt_and_progress_reports_steps():
+    m = ComboMatcher({"Triple": "1, 2 <500, 1 <500"})
+    done, state = feed(m, [(0, None, 0.0), (1, None, 0.2)])
+    assert m.progress(state, "Triple") == 2
+    assert m.progress(state, "Triple", t=5.0) == 0          # timed out by then
+    done, state = feed(m, [(0, None, 0.0), (0, None, 0.2), (1, None, 0.4), (0, None, 0.6)])
+    assert done == ["Triple"]
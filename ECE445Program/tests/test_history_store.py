@@ -0,0 +1,102 @@
+# test_history_store.py  – the min/max/mean pyramid: writing, folding and range queries
+from array import array
+import pytest
+from history_store import HistoryStore, PyramidReader, PyramidWriter
+from sample_ring import SampleRing
+
+RATE = 100.0
+FANOUT = 4
+
+
+def ramp(n, channels=2):
+    """Interleaved samples: channel c of sample i is i * (c + 1), plus a spike every 37."""
+    values = array('f')
+    for i in range(n):
+        for c in range(channels):
+            values.append(i * (c + 1) + (500.0 if i % 37 == 0 else 0.0))
+    return values
+
+
+def write(path, values, channels=2, chunk=13, levels=3):
+    w = PyramidWriter(str(path), "ESP32_1", channels, RATE, fanout=FANOUT, levels=levels)
+    for i in range(0, len(values), chunk * channels):   # uneven chunks cross bucket edges
+        w.extend(values[i:i + chunk * channels])
+    w.close()
+    return w, PyramidReader(str(path))
+
+
+def expected(values, channels, c, first, last):
+    col = values[c::channels][first:last]
+    return min(col), max(col), sum(col) / len(col)
+
+
+def test_level_zero_is_the_raw_stream(tmp_path):
+    values = ramp(1000)
+    w, r = write(tmp_path, values)
+    assert r.length(0) == 1000 and w.count == 1000
+    s = r.query(r.start, r.start + 2.0, max_points=1000)
+    assert s.level == 0 and len(s) in (200, 201)
+    assert list(s.means[1][:5]) == list(values[1::2][:5])
+
+
+@pytest.mark.parametrize("level", [1, 2, 3])
+def test_coarser_levels_fold_min_max_mean(tmp_path, level):
+    values = ramp(1000)
+    _w, r = write(tmp_path, values)
+    span = FANOUT ** level
+    assert r.length(level) == 1000 // span
+    max_points = -(-1000 // span)
+    s = r.query(r.start, r.start + 1000 / RATE, max_points=max_points)
+    assert s.level == level
+    assert s.step == pytest.approx(span / RATE)
+    for c in range(2):
+        for k in (0, len(s) // 2, len(s) - 1):
+            lo, hi, mean = expected(values, 2, c, k * span, (k + 1) * span)
+            assert s.mins[c][k] == pytest.approx(lo)
+            assert s.maxs[c][k] == pytest.approx(hi)
+            assert s.means[c][k] == pytest.approx(mean, rel=1e-5)
+
+
+def test_query_reads_only_the_asked_range(tmp_path):
+    values = ramp(2000)
+    _w, r = write(tmp_path, values)
+    s = r.query(r.start + 5.005, r.start + 6.005, max_points=200)   # mid-sample: no rounding at the edges
+    assert s.level == 0
+    assert s.t0 == pytest.approx(r.start + 5.0)
+    assert s.means[0][0] == values[0::2][500]
+    assert len(s) == 101
+
+
+def test_query_past_the_top_level_still_respects_max_points(tmp_path):
+    values = ramp(4096)
+    _w, r = write(tmp_path, values, levels=2)
+    s = r.query(r.start, r.end, max_points=10)
+    assert len(s) <= 10
+    assert max(s.maxs[0]) == pytest.approx(max(values[0::2]))
+    assert min(s.mins[1]) == pytest.approx(min(values[1::2]))
+
+
+def test_extend_from_ring_copies_new_samples_and_stops_at_a_gap(tmp_path):
+    ring = SampleRing(2, capacity=64)
+    w = PyramidWriter(str(tmp_path), "ESP32_1", 2, RATE, fanout=FANOUT, levels=2)
+    ring.extend([1.0, 2.0] * 10)
+    assert w.extend_from_ring(ring)     # first sight of a ring: starts from its current end
+    ring.extend([3.0, 4.0] * 10)
+    assert w.extend_from_ring(ring)
+    assert w.count == 10
+    ring.extend([5.0, 6.0] * 100)       # laps the 64-sample ring
+    assert not w.extend_from_ring(ring)
+    assert w.dropped == 100 - 64
+    assert w.count == 10                # nothing after the gap: its timestamps would be wrong
+    w.close()
+
+
+def test_store_lists_and_queries_sessions(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    w = store.recorder("ESP32_2", 2, RATE)
+    w.extend(ramp(500))
+    w.close()
+    store.hit_writer().close()
+    assert store.devices() == ["ESP32_2"]
+    s = store.query("ESP32_2", 0, 2e10, max_points=50)
+    assert s is not None and 0 < len(s) <= 50
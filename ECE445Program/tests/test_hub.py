@@ -0,0 +1,80 @@
+# test_hub.py  – clock sync and the hub's time-ordered jitter buffer
+import asyncio, heapq
+import pytest
+from hub import ClockSync, HubAggregator, _Box
+
+
+def test_clock_sync_uses_the_fastest_round_trip():
+    sync = ClockSync(keep=4)
+    assert not sync.ready and sync.offset == 0.0
+    # Box clock is 100 s ahead; the slow exchange's midpoint is skewed by queueing
+    sync.add(0.0, 100.0 + 0.005, 0.010)
+    sync.add(1.0, 101.0 + 0.050, 1.300)
+    assert sync.offset == pytest.approx(100.0)
+    assert sync.rtt == pytest.approx(0.010)
+    for k in range(4):                           # the good sample ages out
+        sync.add(2.0 + k, 102.0 + k + 0.1, 2.2 + k)
+    assert sync.rtt == pytest.approx(0.2)
+
+
+def test_events_are_mapped_to_hub_time_and_released_in_order():
+    hub = HubAggregator(delay=0.1)
+    a, b = _Box("a", None), _Box("b", None)
+    a.clock.add(0.0, 50.0, 0.0)     # a's clock 50 s ahead
+    b.clock.add(0.0, -20.0, 0.0)    # b's 20 s behind
+    hub._accept(b, {"op": "event", "topic": "hit", "paddle": 0, "t": -19.0})   # hub 1.0
+    hub._accept(a, {"op": "event", "topic": "hit", "paddle": 1, "t": 50.5})    # hub 0.5
+    released = [heapq.heappop(hub._heap)[2] for _ in range(2)]
+    assert [(e["box"], e["t_hub"]) for e in released] == [("a", 0.5), ("b", 1.0)]
+    assert released[0]["paddle_id"] == "a:1" and "op" not in released[0]
+
+
+def test_events_behind_the_watermark_are_flagged_late():
+    hub = HubAggregator()
+    box = _Box("a", None)
+    box.clock.add(0.0, 0.0, 0.0)
+    hub._watermark = 5.0
+    hub._accept(box, {"op": "event", "topic": "hit", "t": 4.0})
+    hub._accept(box, {"op": "event", "topic": "hit", "t": 6.0})
+    events = sorted((e for _t, _n, e in hub._heap), key=lambda e: e["t_hub"])
+    assert events[0].get("late") is True and "late" not in events[1]
+    assert box.late == 1 and box.events == 2
+
+
+class _Lines:
+    """StreamReader stand-in: returns the given lines, then end of stream."""
+    def __init__(self, lines, before_eof=None):
+        self.lines, self.before_eof = list(lines), before_eof
+
+    async def readline(self):
+        if self.lines:
+            return self.lines.pop(0)
+        if self.before_eof is not None:
+            self.before_eof()
+        return b""
+
+
+class _Writer:
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_box_events_go_through_the_buffer_and_dropout_reports_down_once():
+    hub = HubAggregator()
+    emitted = []
+    hub.on_event = emitted.append
+
+    def dropout():
+        # What _ping_loop does for a box that went silent, before the socket closes
+        box = hub.boxes["a"]
+        box.connected = False
+        box.writer.close()
+        hub._box_event(box, "down")
+
+    asyncio.run(hub._serve(_Lines([b'{"op": "hello", "box": "a"}\n'], dropout), _Writer()))
+    assert emitted == []
+    states = [heapq.heappop(hub._heap)[2]["state"] for _ in range(len(hub._heap))]
+    assert states == ["up", "down"]
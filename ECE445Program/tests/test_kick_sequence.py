@@ -0,0 +1,74 @@
+# test_kick_sequence.py  – KickAggregator merging hit windows into kicks
+from drills import HitEvent
+from kick_sequence import KickAggregator
+from paddle_state import PaddleTable
+
+WINDOW = 0.3      # firmware hit window, s
+TIMEOUT = 0.5     # window + kick_timeout, as main.py's _kick_span
+
+
+def hit(t, force, paddle=0, accuracy=50, hit_id=1):
+    return HitEvent(paddle=paddle, hit_id=hit_id, t=t, forces=[force], max_force=force, accuracy=accuracy)
+
+
+def aggregator(n=1):
+    return KickAggregator(PaddleTable(n), TIMEOUT, report_delay=WINDOW)
+
+
+def run(agg, windows, until, step=0.01):
+    """Deliver each (t, event) a hit window after it starts, ticking every 10 ms like the UI."""
+    pending = sorted(windows, key=lambda w: w.t)
+    kicks, now = [], 0.0
+    while now <= until:
+        while pending and pending[0].t + WINDOW <= now:
+            kicks += agg.add_frame([pending.pop(0)])
+        kicks += agg.tick(now)
+        now = round(now + step, 6)
+    return kicks
+
+
+def test_windows_a_hit_window_apart_merge_despite_ticks():
+    agg = aggregator()
+    kicks = run(agg, [hit(0.0, 400, accuracy=70), hit(WINDOW + 0.01, 900, accuracy=40)], until=3.0)
+    assert len(kicks) == 1
+    kick = kicks[0]
+    assert kick.t == 0.0                # timed from first contact
+    assert kick.max_force == 900        # strongest window
+    assert kick.accuracy == 70          # best accuracy across the kick
+    assert agg.merged == 1
+
+
+def test_chain_of_windows_stays_one_kick():
+    agg = aggregator()
+    kicks = run(agg, [hit(0.0, 300), hit(0.31, 500), hit(0.62, 400)], until=3.0)
+    assert [k.max_force for k in kicks] == [500]
+
+
+def test_separate_kicks_stay_separate():
+    agg = aggregator()
+    kicks = run(agg, [hit(0.0, 300), hit(1.2, 600)], until=4.0)
+    assert [(k.t, k.max_force) for k in kicks] == [(0.0, 300), (1.2, 600)]
+
+
+def test_tick_waits_for_the_last_window_to_report():
+    agg = aggregator()
+    agg.add(hit(0.0, 300))
+    assert agg.tick(TIMEOUT + WINDOW - 0.01) == []
+    [kick] = agg.tick(TIMEOUT + WINDOW + 0.01)
+    assert kick.max_force == 300
+    assert agg.flush() == []
+
+
+def test_paddles_are_independent_and_come_out_in_kick_order():
+    agg = aggregator(2)
+    agg.add(hit(0.2, 300, paddle=1))
+    agg.add(hit(0.0, 500, paddle=0))
+    kicks = agg.tick(5.0)
+    assert [k.paddle for k in kicks] == [0, 1]
+
+
+def test_on_kick_callback_and_flush():
+    seen = []
+    agg = KickAggregator(PaddleTable(1), TIMEOUT, on_kick=seen.append, report_delay=WINDOW)
+    agg.add(hit(0.0, 300))
+    assert agg.flush() == seen and len(seen) == 1
@@ -0,0 +1,64 @@
+# test_session_export.py  – exporting hits and raw samples: filters, sample spans and cancelling
+import csv, json, os, threading, zipfile
+from array import array
+from history_store import PyramidWriter
+from session_export import SPAN_PAD, ExportFilter, export
+
+RATE = 100.0
+SECONDS = 60
+
+
+def make_store(root):
+    """One 60 s two-sensor session on ESP32_1 and two hits: Ann at +10 s, Ben at +40 s."""
+    path = os.path.join(root, "ESP32_1", "s1")
+    w = PyramidWriter(path, "ESP32_1", 2, RATE, levels=2)
+    w.extend(array('f', [float(i // 2) for i in range(int(SECONDS * RATE) * 2)]))
+    w.close()
+    hits = os.path.join(root, "_hits")
+    os.makedirs(hits)
+    with open(os.path.join(hits, "2026-09-01.jsonl"), "w", encoding="utf-8") as f:
+        for t, athlete, drill in ((w.start + 10, "Ann", "ReactionDrill"), (w.start + 40, "Ben", None)):
+            f.write(json.dumps({"t": t, "athlete": athlete, "device": "ESP32_1", "paddle": 0, "hit_id": 1,
+                                "force": 500.0, "accuracy": 90.0, "x": 0.0, "y": 0.0, "forces": [500.0, 400.0],
+                                "features": None, "drill": drill}) + "\n")
+    return w.start
+
+
+def sample_times(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return [float(r["t"]) for r in rows]
+
+
+def test_all_samples_without_athlete_or_drill(tmp_path):
+    make_store(str(tmp_path))
+    result = export(str(tmp_path), str(tmp_path / "out.csv"), samples=True)
+    assert result["hits"] == 2
+    assert result["samples"] == SECONDS * RATE
+
+
+def test_athlete_limits_samples_to_their_hits(tmp_path):
+    start = make_store(str(tmp_path))
+    result = export(str(tmp_path), str(tmp_path / "out.csv"), ExportFilter(athletes=["Ann"]), samples=True)
+    assert result["hits"] == 1
+    assert result["samples"] == 2 * SPAN_PAD * RATE
+    times = sample_times(tmp_path / "out.samples.csv")
+    assert min(times) >= start + 10 - SPAN_PAD - 0.01
+    assert max(times) <= start + 10 + SPAN_PAD
+
+
+def test_drill_limits_npz_samples(tmp_path):
+    make_store(str(tmp_path))
+    result = export(str(tmp_path), str(tmp_path / "out.npz"), ExportFilter(drills=["ReactionDrill"]), samples=True)
+    assert result["samples"] == 2 * SPAN_PAD * RATE
+    with zipfile.ZipFile(tmp_path / "out.npz") as zf:
+        names = [n for n in zf.namelist() if n.startswith("samples_")]
+    assert names == ["samples_ESP32_1_s1_800.npy", "samples_ESP32_1_s1_800_t0.npy", "samples_ESP32_1_s1_800_rate_hz.npy"]
+
+
+def test_cancel_stops_npz_samples(tmp_path):
+    make_store(str(tmp_path))
+    cancel = threading.Event()
+    cancel.set()
+    result = export(str(tmp_path), str(tmp_path / "out.npz"), samples=True, cancel=cancel)
+    assert result["samples"] == 0
@@ -0,0 +1,107 @@
+# test_sparring.py  – SparringDrill scoring order, simultaneous kicks and rounds
+import random
+from drills import HitEvent, SparringDrill
+from kick_sequence import KickAggregator
+from paddle_state import PaddleTable
+
+RED, BLUE = 0, 1
+SETTLE = 0.5          # window_delay: how late kicks can arrive without a KickAggregator horizon
+
+
+def kick(paddle, t, force=600.0, hit_id=1):
+    return HitEvent(paddle=paddle, hit_id=hit_id, t=t, forces=[force], max_force=force, accuracy=80)
+
+
+def drill(**kw):
+    classify = kw.pop("classify", None)
+    d = SparringDrill([RED], [BLUE], threshold=lambda _p: 300.0, classify=classify,
+                      rounds=kw.pop("rounds", 1), round_time=kw.pop("round_time", 10.0),
+                      rest_time=kw.pop("rest_time", 2.0), **kw)
+    d.start(now=0.0)
+    return d
+
+
+def play(d, kicks, until, step=0.01, delays=None):
+    """Deliver each kick `delay` after its first contact, ticking like the UI."""
+    arrivals = sorted((k.t + (delays[i] if delays else 0.3), i) for i, k in enumerate(kicks))
+    now = 0.0
+    while now <= until:
+        while arrivals and arrivals[0][0] <= now:
+            d.on_hit(kicks[arrivals.pop(0)[1]])
+        d.tick(now)
+        now = round(now + step, 6)
+
+
+def test_scores_by_technique_and_ignores_weak_kicks():
+    d = drill(classify=lambda e: "Back Kick" if e.hit_id == 2 else None)
+    play(d, [kick(RED, 1.0), kick(BLUE, 2.0, hit_id=2), kick(RED, 3.0, force=100)], until=5.0)
+    assert d.score == {"red": 2, "blue": 4}
+    assert d.hits == {"red": 1, "blue": 1}
+
+
+def test_simultaneous_kicks_both_score():
+    d = drill()
+    play(d, [kick(RED, 1.00), kick(BLUE, 1.03)], until=3.0)
+    assert d.score == {"red": 2, "blue": 2}
+    assert "both score" in d.feedback
+
+
+def test_cancelled_simultaneous_kicks_take_back_points_and_hits():
+    d = drill(cancel_simultaneous=True)
+    play(d, [kick(RED, 1.00), kick(BLUE, 1.03), kick(RED, 2.0)], until=4.0)
+    assert d.score == {"red": 2, "blue": 0}
+    assert d.hits == {"red": 1, "blue": 0}
+    assert d.round_score == d.score
+
+
+def test_result_does_not_depend_on_delivery_order():
+    rng = random.Random(3)
+    kicks = [kick(rng.choice((RED, BLUE)), rng.uniform(0.5, 9.0), hit_id=i) for i in range(60)]
+    results = set()
+    for seed in range(5):
+        jitter = random.Random(seed)
+        d = drill(cancel_simultaneous=True)
+        play(d, kicks, until=12.0, delays=[jitter.uniform(0.2, 0.5) for _ in kicks])
+        results.add((tuple(sorted(d.score.items())), tuple(sorted(d.hits.items()))))
+    assert len(results) == 1
+
+
+def test_kick_on_the_bell_counts_and_bout_ends():
+    d = drill(round_time=5.0)
+    play(d, [kick(BLUE, 4.99), kick(RED, 5.2)], until=5.0 + SETTLE + 0.1)
+    assert d.score == {"red": 0, "blue": 2}
+    assert d.phase == "done" and d.winner == "blue" and not d.active
+
+
+def test_rounds_and_rest():
+    d = drill(rounds=2, round_time=3.0, rest_time=1.0)
+    play(d, [kick(RED, 1.0)], until=3.0 + SETTLE + 0.5)
+    assert d.phase == "rest" and d.round == 1
+    d.tick(3.0 + SETTLE + 1.5)
+    assert d.phase == "fight" and d.round == 2
+    assert d.round_score == {"red": 0, "blue": 0}
+    assert d.score == {"red": 2, "blue": 0}
+
+
+def test_multi_window_kicks_are_committed_in_first_contact_order():
+    window, timeout = 0.3, 0.5
+    agg = KickAggregator(PaddleTable(2), timeout, report_delay=window)
+    d = drill(cancel_simultaneous=False, simultaneous=0.05, horizon=agg.horizon)
+    committed = []
+    score = d._score
+    d._score = lambda e: committed.append(e.t) or score(e)
+    # Red's kick bounces (windows at 1.0 and 1.31) and is finalised at 2.11; blue's single
+    # window at 1.2 is finalised at 2.0 – before red's earlier kick is known
+    windows = [kick(RED, 1.0, hit_id=1), kick(RED, 1.31, hit_id=2), kick(BLUE, 1.2, hit_id=3)]
+    now = 0.0
+    while now <= 4.0:
+        for w in [w for w in windows if w.t + window <= now]:
+            windows.remove(w)
+            for k in agg.add_frame([w]):
+                d.on_hit(k)
+        for k in agg.tick(now):
+            d.on_hit(k)
+        d.tick(now)
+        now = round(now + 0.01, 6)
+    assert committed == [1.0, 1.2]
+    assert d.score == {"red": 2, "blue": 2}
@@ -0,0 +1,48 @@
+# test_ui_profiler.py  – stall watchdog and the optional sampling profiler, without Qt
+import time
+from ui_profiler import UiProfiler
+
+
+class Receiver:
+    def objectName(self):
+        return "update_readings"
+
+
+class Event:
+    def type(self):
+        return 0
+
+
+def dispatch(profiler, seconds):
+    profiler.dispatch_begin(Receiver(), Event())
+    try:
+        time.sleep(seconds)
+    finally:
+        profiler.dispatch_end()
+
+
+def test_watchdog_catches_a_stall_without_sampling():
+    profiler = UiProfiler(threshold=0.02).start()
+    try:
+        dispatch(profiler, 0.01)
+        assert not profiler.stalls
+        dispatch(profiler, 0.12)
+    finally:
+        profiler.stop()
+    assert len(profiler.stalls) == 1
+    stall = profiler.stalls[0]
+    assert stall["handler"] == "update_readings" and stall["ms"] >= 100
+    assert "dispatch" in stall["stack"]
+    assert not profiler.samples
+
+
+def test_sampling_records_collapsed_stacks():
+    profiler = UiProfiler(threshold=10.0, interval=0.002, sample=True).start()
+    try:
+        dispatch(profiler, 0.1)
+    finally:
+        profiler.stop()
+    assert not profiler.stalls
+    stack = profiler.samples.most_common(1)[0][0]
+    assert "test_sampling_records_collapsed_stacks" in stack
+    assert stack.index("dispatch (") > stack.index("test_sampling_records_collapsed_stacks")
@@ -0,0 +1,255 @@
+# ui_harness.py  – unattended offscreen UI regression run: scripted screens, hit bursts, latency/frames/memory
+#
+#   python ui_harness.py                                   # 2 paddles, 4 s per screen, 3 cycles
+#   python ui_harness.py --paddles 4 --seconds 5 --cycles 4
+#   python ui_harness.py --json ui.json --baseline ui_baseline.json   # exit status 1 on a regression
+#   python ui_harness.py --save-baseline ui_baseline.json
+#
+# Builds the real MainWindow (QT_QPA_PLATFORM=offscreen, no display or paddles needed)
+# against BluetoothHandlers fed by VirtualPaddles, and walks SCRIPT: force display,
+# reaction drills, speed drills, Kicking School, round and round.  On every screen each
+# paddle's traffic – a kick about once a second plus a burst of fast kicks on all paddles
+# together every `burst_every` seconds – goes through _notify_cb at its due time while the
+# window ticks every 10 ms like update_timer.  Per screen it reports:
+#   latency   hit notification in -> that hit seen by _update_readings and painted
+#   frame     one tick: _update_readings plus the events it posted (repaints)
+#   switch    navigating to the screen until the event queue is idle
+#   rss, objects  growth per cycle after the first (warm-up) cycle – leaks show up here
+# The report and baseline are bench.py's format, so --baseline and the history tooling
+# work the same way.  Latency numbers include waiting for the next tick, as in the app.
+import argparse, gc, os, platform, random, statistics, sys, time
+from bench import _p99, _result, add_report_args, finish_report
+from bluetooth_handler import BluetoothHandler
+from virtual_paddle import VirtualPaddle
+
+TICK = 0.01
+MISS_AFTER = 1.0   # a hit not on screen after this long (e.g. under the hit threshold) is counted as missed
+
+
+def _enter_force(window):
+    window._show_force()
+
+
+def _enter_reaction(window):
+    window._show_reaction()
+    window._start_all(window.reaction_lanes, window._start_reaction)
+
+
+def _enter_speed(window):
+    window._show_speed()
+    window._start_all(window.speed_lanes, window._start_speed)
+
+
+def _enter_kicking_school(window):
+    window._show_games()
+    window._show_kicking_school()
+
+
+# screen name -> what a user does to get there
+SCRIPT = (("force", _enter_force), ("reaction", _enter_reaction),
+          ("speed", _enter_speed), ("kicking_school", _enter_kicking_school))
+
+
+def burst_notifications(seconds, seed=1, burst_every=3.0, burst_kicks=5, num_sensors=2):
+    """[(time_ms, text)] from a virtual paddle kicked about once a second, plus a
+    burst of `burst_kicks` kicks 150 ms apart every `burst_every` seconds.  Burst
+    times don't depend on the seed, so every paddle bursts at the same moment."""
+    rng = random.Random(seed)
+    vp = VirtualPaddle(num_sensors=num_sensors, seed=seed)
+    end = seconds * 1000
+    bursts = [b * burst_every * 1000 for b in range(1, int(seconds / burst_every) + 1)]
+    t = 500.0
+    for start in bursts + [end]:
+        while t < start - 300:
+            vp.kick(int(t), rng.uniform(250, 1200), rng.uniform(6, 40))
+            t += rng.uniform(400, 1600)
+        if start < end:
+            for k in range(burst_kicks):
+                vp.kick(int(start + k * 150), rng.uniform(400, 1200), rng.uniform(6, 20))
+            t = max(t, start + burst_kicks * 150 + 300)
+    return vp.run_until(int(end))
+
+
+def rss_kb():
+    """Resident set size in KiB (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Harness:
+    """One MainWindow, its virtual paddles and the measurements taken so far."""
+    def __init__(self, app, paddles=2, seconds=4.0, cycles=3, burst_every=3.0, burst_kicks=5):
+        from main import MainWindow
+        self.app = app
+        self.seconds = seconds
+        self.cycles = cycles
+        self.handlers = [BluetoothHandler(f"ESP32_{i+1}") for i in range(paddles)]
+        self.window = MainWindow(paddles=self.handlers)
+        self.window.update_timer.stop()   # the harness ticks instead, so it can time each tick
+        for handler in self.handlers:
+            handler.is_connected = True
+        # Traffic for the whole run, delivered against the harness clock
+        total = cycles * len(SCRIPT) * (seconds + 1) + 10
+        self.feeds = [burst_notifications(total, seed=i + 1, burst_every=burst_every, burst_kicks=burst_kicks)
+                      for i in range(paddles)]
+        self.cursors = [0] * paddles
+        self.pending = [None] * paddles      # (hit_count, perf_counter it arrived) not yet on screen
+        self.stats = {name: {"latency": [], "frame": [], "switch": [], "rss": [], "objects": [],
+                             "missed": 0, "superseded": 0} for name, _enter in SCRIPT}
+        self.start = None
+
+    def _idle(self):
+        # Let queued events (layouts, repaints, deferred deletes) run, including ones they post
+        app = self.app
+        app.processEvents()
+        app.sendPostedEvents(None, 0)
+        app.processEvents()
+
+    def _wait_for_menu(self, timeout=5.0):
+        # The splash screen fades into the main menu on a timer; let it finish before scripting
+        window = self.window
+        deadline = time.perf_counter() + timeout
+        while window.stack.currentWidget() is not window.main_menu_screen and time.perf_counter() < deadline:
+            self.app.processEvents()
+            time.sleep(TICK)
+
+    def _deliver(self, now):
+        # Hand every notification that is due to its handler, noting when new hits arrive
+        until = (now - self.start) * 1000
+        for i, feed in enumerate(self.feeds):
+            handler = self.handlers[i]
+            c = self.cursors[i]
+            while c < len(feed) and feed[c][0] <= until:
+                before = handler.hit_count
+                handler._notify_cb(None, bytearray(feed[c][1].encode()))
+                c += 1
+                if handler.hit_count != before:
+                    if self.pending[i] is not None:
+                        self._stat["superseded"] += 1   # a newer hit window replaced it first
+                    self.pending[i] = (handler.hit_count, time.perf_counter())
+            self.cursors[i] = c
+
+    def _check_latency(self, now):
+        seen = self.window.state.seen_hit
+        for i, pending in enumerate(self.pending):
+            if pending is None:
+                continue
+            hit_count, arrived = pending
+            if seen[i] == hit_count:
+                self._stat["latency"].append((now - arrived) * 1000)
+                self.pending[i] = None
+            elif now - arrived > MISS_AFTER:
+                self._stat["missed"] += 1
+                self.pending[i] = None
+
+    def run_screen(self, name, enter):
+        window, app = self.window, self.app
+        self._stat = stat = self.stats[name]
+        self.pending = [None] * len(self.handlers)
+
+        t0 = time.perf_counter()
+        enter(window)
+        self._idle()
+        stat["switch"].append((time.perf_counter() - t0) * 1000)
+
+        ticks = int(self.seconds / TICK)
+        due = time.perf_counter()
+        for _ in range(ticks):
+            # Notifications arrive between ticks, as they do from the BLE thread
+            due += TICK
+            while True:
+                now = time.perf_counter()
+                self._deliver(now)
+                if now >= due:
+                    break
+                time.sleep(min(0.001, due - now))
+            t0 = time.perf_counter()
+            window._update_readings()
+            app.processEvents()
+            t1 = time.perf_counter()
+            stat["frame"].append((t1 - t0) * 1000)
+            self._check_latency(t1)
+            if t1 - due > TICK:
+                due = t1   # fell behind: don't fire a backlog of ticks back to back
+
+    def run(self):
+        window = self.window
+        window.show()
+        self._wait_for_menu()
+        self.start = time.perf_counter()
+        for cycle in range(self.cycles):
+            for name, enter in SCRIPT:
+                gc.collect()
+                rss0, objects0 = rss_kb(), len(gc.get_objects())
+                self.run_screen(name, enter)
+                gc.collect()
+                if cycle:   # the first cycle builds screens and warms caches
+                    rss1 = rss_kb()
+                    if rss0 is not None and rss1 is not None:
+                        self.stats[name]["rss"].append(rss1 - rss0)
+                    self.stats[name]["objects"].append(len(gc.get_objects()) - objects0)
+        window.close()
+        window.deleteLater()
+        self._idle()
+
+    def results(self):
+        results = []
+        for name, _enter in SCRIPT:
+            s = self.stats[name]
+            params = dict(paddles=len(self.handlers), seconds=self.seconds, cycles=self.cycles)
+            if s["latency"]:
+                results.append(_result(f"ui_{name}_latency", statistics.mean(s["latency"]), "ms", "lower",
+                                       p99_ms=_p99(s["latency"]), hits=len(s["latency"]),
+                                       missed=s["missed"], superseded=s["superseded"], **params))
+            else:
+                results.append({"name": f"ui_{name}_latency", "skipped": f"no hits shown ({s['missed']} missed)"})
+            results.append(_result(f"ui_{name}_frame", statistics.mean(s["frame"]), "ms", "lower",
+                                   p99_ms=_p99(s["frame"]), max_ms=max(s["frame"]), ticks=len(s["frame"]), **params))
+            results.append(_result(f"ui_{name}_switch", statistics.mean(s["switch"]), "ms", "lower",
+                                   max_ms=max(s["switch"]), **params))
+            if s["rss"]:
+                results.append(_result(f"ui_{name}_rss", statistics.mean(s["rss"]), "KiB", "lower",
+                                       per="cycle", max_kib=max(s["rss"]), **params))
+            if s["objects"]:
+                results.append(_result(f"ui_{name}_objects", statistics.mean(s["objects"]), "objects", "lower",
+                                       per="cycle", max=max(s["objects"]), **params))
+        return results
+
+
+def run(paddles=2, seconds=4.0, cycles=3, burst_every=3.0, burst_kicks=5):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    report = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+              "machine": platform.node(), "platform": platform.platform()}
+    try:
+        from PySide6 import QtWidgets
+    except ImportError as e:
+        report["results"] = [{"name": "ui_harness", "skipped": f"needs PySide6 ({e})"}]
+        return report
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    harness = Harness(app, paddles, seconds, cycles, burst_every, burst_kicks)
+    harness.run()
+    report["results"] = harness.results()
+    return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offscreen UI latency, frame time and memory regression run")
+    ap.add_argument("--paddles", type=int, default=2, help="virtual paddles")
+    ap.add_argument("--seconds", type=float, default=4.0, help="time on each screen per cycle")
+    ap.add_argument("--cycles", type=int, default=3, help="passes through the script (the first is warm-up for memory)")
+    ap.add_argument("--burst-every", type=float, default=3.0, help="seconds between hit bursts")
+    ap.add_argument("--burst-kicks", type=int, default=5, help="kicks per burst, 150 ms apart")
+    add_report_args(ap)
+    args = ap.parse_args(argv)
+    if args.cycles < 2:
+        ap.error("--cycles must be at least 2 (the first is warm-up)")
+
+    report = run(args.paddles, args.seconds, args.cycles, args.burst_every, args.burst_kicks)
+    return finish_report(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# ui_profiler.py  – opt-in Qt event-loop stall detector, per-handler frame times and a sampling profile
+#
+#   python main.py --profile-ui                 # or PADDLE_PROFILE_UI=1
+#   PADDLE_PROFILE_UI=50 python main.py         # stall threshold in ms (default 100)
+#   PADDLE_PROFILE_SAMPLE=1                     # also sample the GUI stack every 5 ms (or =<ms>)
+#   PADDLE_PROFILE_DUMP=ui_profile.txt          # where the profile goes (F12 or exit)
+#
+# Nothing here is created unless profiling is switched on, so the normal app pays nothing.
+# The stall watchdog alone only looks at a timestamp; stacks are taken when a stall is
+# caught, or continuously when sampling is on.  The sampled profile is in collapsed-stack
+# format ("outer;inner;leaf count" per line), which flamegraph.pl and speedscope read directly.
+import sys, threading, time, traceback
+from collections import Counter, deque
+from app_log import get_logger
+
+log = get_logger("ui")
+
+
+class FrameStat:
+    """Dispatch times of one handler on one screen."""
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count  = 0
+        self.total  = 0.0
+        self.max    = 0.0
+        self.recent = 0.0   # EWMA, seconds
+
+    def add(self, dt):
+        self.count += 1
+        self.total += dt
+        if dt > self.max:
+            self.max = dt
+        self.recent = dt if self.count == 1 else self.recent + 0.1 * (dt - self.recent)
+
+
+class UiProfiler:
+    """Times every top-level Qt event dispatch and watches for the event loop stalling.
+
+    The app routes QApplication.notify through dispatch_begin/dispatch_end
+    (profiled_application() below); only the outermost dispatch is timed, so
+    each measurement is one whole trip out of the event loop – a frame.  It is
+    filed under (screen, handler), the handler being the receiver's
+    objectName (e.g. the "update_readings" timer) or class plus the event type.
+
+    A daemon thread watches for stalls: every threshold / 4 it checks how
+    long the current dispatch has run, and past `threshold` it captures the
+    GUI thread's stack and logs it once – catching a blocking connect() or
+    time.sleep() in the act.  With sample=True it instead wakes every
+    `interval` seconds and also adds the stack (function and line number
+    only, no source lookups) to a collapsed-stack profile.
+    """
+    def __init__(self, threshold=0.1, interval=0.005, screen=None, max_stalls=50, sample=False):
+        self.threshold = threshold
+        self.interval  = interval
+        self.sample    = sample
+        self.screen    = screen or (lambda: "")   # callable -> name of the visible screen
+        self.stats     = {}                      # (screen, handler) -> FrameStat
+        self.samples   = Counter()               # collapsed stack -> samples
+        self.stalls    = deque(maxlen=max_stalls)  # {"handler", "screen", "ms", "stack"}
+        self._depth    = 0
+        self._key      = None
+        self._screen   = ""
+        self._since    = None                    # perf_counter() the current dispatch began
+        self._stalled  = None                    # stall record of the current dispatch
+        self._gui_id   = threading.get_ident()
+        self._running  = False
+        self._thread   = None
+
+    # ---------- GUI thread ----------
+    def dispatch_begin(self, receiver, event):
+        self._depth += 1
+        if self._depth == 1:
+            name = receiver.objectName() if hasattr(receiver, "objectName") else ""
+            self._key = name or f"{type(receiver).__name__}:{getattr(event.type(), 'name', event.type())}"
+            self._screen = self.screen()
+            self._since = time.perf_counter()
+
+    def dispatch_end(self):
+        self._depth -= 1
+        if self._depth:
+            return
+        dt = time.perf_counter() - self._since
+        self._since = None
+        key = (self._screen, self._key)
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = FrameStat()
+        stat.add(dt)
+        stall, self._stalled = self._stalled, None
+        if stall is not None:
+            stall["ms"] = dt * 1000
+            log.warning("UI stall: %.0f ms in %s on %s", stall["ms"], stall["handler"], stall["screen"],
+                        extra={"stall_ms": stall["ms"], "handler": stall["handler"], "screen": stall["screen"]})
+
+    # ---------- sampler thread ----------
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ui-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        period = self.interval if self.sample else self.threshold / 4
+        while self._running:
+            time.sleep(period)
+            since = self._since
+            stalled = since is not None and self._stalled is None and time.perf_counter() - since > self.threshold
+            if not (stalled or self.sample):
+                continue
+            frame = sys._current_frames().get(self._gui_id)
+            if frame is None:
+                continue
+            if self.sample:
+                stack = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+                self.samples[";".join(f"{f.name} ({f.filename.rsplit('/', 1)[-1]}:{f.lineno})"
+                                      for f in reversed(stack))] += 1
+            if stalled:
+                stall = {"handler": self._key, "screen": self._screen, "ms": None,
+                         "stack": "".join(traceback.format_stack(frame))}
+                self._stalled = stall
+                self.stalls.append(stall)
+                log.warning("UI stalled > %.0f ms in %s; GUI thread is at:\n%s",
+                            self.threshold * 1000, stall["handler"], stall["stack"])
+
+    # ---------- reports ----------
+    def top(self, n=8):
+        """The n (screen, handler, FrameStat) with the slowest recent dispatch times."""
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1].recent, reverse=True)[:n]
+        return [(screen, handler, stat) for (screen, handler), stat in rows]
+
+    def overlay_text(self, n=6):
+        lines = []
+        if self.stalls:
+            last = self.stalls[-1]
+            ms = f"{last['ms']:.0f} ms" if last["ms"] is not None else "ongoing"
+            lines.append(f"stalls: {len(self.stalls)}  last: {ms} in {last['handler']} @{last['screen']}")
+        for screen, handler, stat in self.top(n):
+            lines.append(f"{handler[:28]:28} @{screen[:10]:10} {stat.recent * 1000:6.2f} ms  "
+                         f"max {stat.max * 1000:6.1f}  n={stat.count}")
+        return "\n".join(lines)
+
+    def report(self):
+        """Text table of every handler's frame times, slowest total first."""
+        rows = sorted(self.stats.items(), key=lambda kv: kv[1].total, reverse=True)
+        lines = [f"{'handler':36}{'screen':16}{'count':>8}{'mean ms':>10}{'max ms':>10}{'total s':>10}"]
+        for (screen, handler), s in rows:
+            lines.append(f"{handler[:35]:36}{screen[:15]:16}{s.count:8d}{s.total / s.count * 1000:10.3f}"
+                         f"{s.max * 1000:10.1f}{s.total:10.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write the sampled profile (collapsed stacks) to path and the frame-time table next to it."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(path + ".frames.txt", "w", encoding="utf-8") as f:
+            f.write(self.report() + "\n")
+            for stall in self.stalls:
+                f.write(f"\nStall {stall['ms'] or 0:.0f} ms in {stall['handler']} @{stall['screen']}\n{stall['stack']}")
+        log.info("UI profile written to %s (%d samples)", path, sum(self.samples.values()))
+
+
+def profiled_application(profiler, argv):
+    """A QApplication whose notify() reports every dispatch to `profiler`."""
+    from PySide6 import QtWidgets
+
+    class ProfiledApplication(QtWidgets.QApplication):
+        def notify(self, receiver, event):
+            profiler.dispatch_begin(receiver, event)
+            try:
+                return super().notify(receiver, event)
+            finally:
+                profiler.dispatch_end()
+
+    return ProfiledApplication(argv)
@@ -0,0 +1,147 @@
+# virtual_paddle.py  – pure‑Python model of esp32sketch.ino for tools that run without hardware
+import math, random
+from collections import deque
+
+class VirtualPaddle:
+    """Steps the sketch's sampling and hit-window logic one millisecond at a time.
+
+    Kicks are half-sine force pulses; each sample averages num_samples ADC
+    reads 0.5 ms apart, exactly like loop().  Notifications come out in the
+    same text format the real paddle sends, and CMD:... strings are answered
+    with ACK/NAK like handleCommand().
+    """
+    def __init__(self, num_sensors=2, sample_interval_ms=10, window_ms=300, num_samples=5,
+                 max_force_n=1500.0, threshold=220.0, noise_n=5.0, seed=None):
+        self.num_sensors        = num_sensors
+        self.sample_interval_ms = sample_interval_ms
+        self.window_ms          = window_ms
+        self.heartbeat_ms       = window_ms
+        self.num_samples        = num_samples
+        self.max_force_n        = max_force_n
+        self.threshold          = threshold
+        self.noise_n            = noise_n
+        self.rng                = random.Random(seed)
+        self.now                = 0
+        self._kicks             = []   # (start_ms, duration_ms, peak_n, weights)
+        self._recent_seqs       = deque(maxlen=16)   # commands run, for dropping resends
+        self._reset_window()
+        self._last_read = 0
+        self._last_send = 0
+        self._idle_peak = 0.0
+        self._seq = 0
+
+    def _reset_window(self):
+        self._in_window = False
+        self._hit_start = 0
+        self._peaks     = [0.0] * self.num_sensors
+        self._peak_total = 0.0
+        self._peak_time = 0
+        self._above     = 0
+        self._impulse   = 0.0
+
+    # ---------- inputs ----------
+    def kick(self, at_ms, peak_n, duration_ms=25, weights=None):
+        """Schedule a kick: half-sine pulse of the given contact duration.
+
+        weights  share of the force each sensor sees (defaults to an even split
+                 with a little jitter, i.e. a roughly central hit)
+        """
+        if weights is None:
+            weights = [1.0 + self.rng.uniform(-0.2, 0.2) for _ in range(self.num_sensors)]
+        self._kicks.append((at_ms, duration_ms, peak_n, weights))
+
+    def handle_command(self, text):
+        """Apply a host command; returns the ACK/NAK string the paddle would notify."""
+        text = text.strip()
+        if not text.startswith("CMD:"):
+            return None
+        parts = text.split(":", 3)
+        seq, name = int(parts[1]), parts[2]
+        args = parts[3] if len(parts) > 3 else ""
+        if seq in self._recent_seqs:
+            return f"ACK:{seq}"
+        try:
+            if name == "RATE":
+                self.sample_interval_ms = int(args)
+            elif name == "WINDOW":
+                self.window_ms = self.heartbeat_ms = int(args)
+            elif name == "HEARTBEAT":
+                self.heartbeat_ms = int(args)
+            elif name == "SAMPLES":
+                self.num_samples = int(args)
+            elif name == "MAXFORCE":
+                self.max_force_n = float(args)
+            elif name == "THRESHOLD":
+                self.threshold = float(args)
+            elif name not in ("LED", "BUZZ"):
+                return f"NAK:{seq}:unknown"
+        except ValueError:
+            return f"NAK:{seq}:args"
+        self._recent_seqs.append(seq)
+        return f"ACK:{seq}"
+
+    def _next_seq(self):
+        seq, self._seq = self._seq, (self._seq + 1) % 65536
+        return seq
+
+    # ---------- model ----------
+    def force_at(self, t_ms):
+        """True (noise-free) per-sensor force at time t_ms."""
+        forces = [0.0] * self.num_sensors
+        for start, dur, peak, weights in self._kicks:
+            if start <= t_ms < start + dur:
+                f = peak * math.sin(math.pi * (t_ms - start) / dur)
+                for s in range(self.num_sensors):
+                    forces[s] += f * weights[s]
+        return forces
+
+    def _sample(self, t_ms):
+        # numSamples reads, 0.5 ms apart, averaged; clipped to the ADC range
+        acc = [0.0] * self.num_sensors
+        for i in range(self.num_samples):
+            f = self.force_at(t_ms + 0.5 * i)
+            for s in range(self.num_sensors):
+                acc[s] += f[s] + abs(self.rng.gauss(0.0, self.noise_n))
+        return [min(self.max_force_n, max(0.0, a / self.num_samples)) for a in acc]
+
+    def run_until(self, t_ms):
+        """Advance to t_ms; returns [(time_ms, notification text), ...] sent on the way."""
+        out = []
+        # Kicks that are fully in the past can be dropped
+        self._kicks = [k for k in self._kicks if k[0] + k[1] >= self.now - 1]
+        while self.now < t_ms:
+            self.now += 1
+            now = self.now
+            if now - self._last_read >= self.sample_interval_ms:
+                self._last_read = now
+                forces = self._sample(now)
+                above = any(f >= self.threshold for f in forces)
+                if not self._in_window:
+                    self._idle_peak = max([self._idle_peak] + [f for f in forces if f < self.threshold])
+                if above and not self._in_window:
+                    self._in_window = True
+                    self._hit_start = now
+                    self._peaks = list(forces)
+                    self._peak_total, self._peak_time, self._above, self._impulse = 0.0, now, 0, 0.0
+                elif above:
+                    self._peaks = [max(p, f) for p, f in zip(self._peaks, forces)]
+                if self._in_window:
+                    total = sum(forces)
+                    self._impulse += total * self.sample_interval_ms / 1000.0
+                    if above:
+                        self._above += 1
+                    if total > self._peak_total:
+                        self._peak_total, self._peak_time = total, now
+                if self._in_window and now - self._hit_start >= self.window_ms:
+                    msg = ",".join(f"{p:.1f}" for p in self._peaks)
+                    msg += (f",{self._hit_start - self._last_send},{now - self._hit_start}"
+                            f";w={self._peak_time - self._hit_start},"
+                            f"{self._above * self.sample_interval_ms},{self._impulse:.2f};s={self._next_seq()}")
+                    out.append((now, msg))
+                    self._reset_window()
+                    self._last_send = now
+            if not self._in_window and now - self._last_send >= self.heartbeat_ms:
+                out.append((now, "0.0," * self.num_sensors + f"0,0;n={self._idle_peak:.1f};s={self._next_seq()}"))
+                self._idle_peak = 0.0
+                self._last_send = now
+        return out
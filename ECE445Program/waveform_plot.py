@@ -0,0 +1,156 @@
+# waveform_plot.py  – scrolling raw-force strip chart for the force screen
+from PySide6 import QtWidgets, QtGui, QtCore
+
+CHANNEL_COLORS = ["#3498db", "#e67e22", "#2ecc71", "#e74c3c", "#9b59b6", "#f1c40f", "#1abc9c", "#ecf0f1"]
+
+
+class WaveformPlot(QtWidgets.QWidget):
+    """Live force trace of every sensor on one paddle, fed from a SampleRing.
+
+    The trace lives in an off-screen pixmap that is scrolled left in place;
+    refresh() only draws the pixel columns that new samples filled, each one a
+    single vertical min/max line per channel (so spikes between pixels are
+    never lost), and paintEvent just blits the pixmap.  Nothing is rebuilt per
+    frame except on resize, so the cost follows the column rate, not the
+    sample rate or the window length.
+    """
+    BACKGROUND = QtGui.QColor("#1b1b1b")
+
+    def __init__(self, seconds=4.0, full_scale=1500.0, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(240, 90)
+        self.seconds    = seconds
+        self.full_scale = full_scale
+        self.threshold  = None
+        self._ring      = None
+        self._series    = None   # history Series shown instead of a live ring
+        self._rate_hz   = 100.0
+        self._pixmap    = None
+        self._next      = 0.0    # absolute sample index where the next column starts
+        self._pens      = [QtGui.QPen(QtGui.QColor(c), 1) for c in CHANNEL_COLORS]
+        self._prev_y    = [None] * len(CHANNEL_COLORS)   # joins each column to the one before
+
+    def set_source(self, ring, rate_hz):
+        """Plot `ring` (a SampleRing, or None to blank the plot) sampled at rate_hz."""
+        if ring is self._ring and rate_hz == self._rate_hz:
+            return
+        self._ring = ring
+        self._series = None
+        self._rate_hz = float(rate_hz)
+        self._redraw()
+
+    def show_series(self, series, t0, t1):
+        """Static view of recorded history: Series from HistoryStore.query() over [t0, t1).
+
+        Query with max_points = width() so there is at most one point per column.
+        """
+        self._ring = None
+        self._series = (list(series), t0, max(t1, t0 + 1e-6))
+        self._redraw()
+
+    def set_threshold(self, newtons):
+        self.threshold = newtons
+        self.update()
+
+    # ---------- drawing into the pixmap ----------
+    def _samples_per_column(self):
+        return self._rate_hz * self.seconds / max(1, self.width())
+
+    def _y(self, value, h):
+        y = int((h - 1) * (1.0 - value / self.full_scale))
+        return 0 if y < 0 else h - 1 if y >= h else y
+
+    def _draw_columns(self, p, x0, columns):
+        """Draw `columns` pixel columns starting at x0, consuming samples from self._next."""
+        ring, h = self._ring, self._pixmap.height()
+        spp = self._samples_per_column()
+        channels = min(ring.channels, len(self._pens))
+        p.fillRect(x0, 0, columns, h, self.BACKGROUND)
+        for x in range(x0, x0 + columns):
+            start = int(self._next)
+            stop = max(start + 1, int(self._next + spp))
+            self._next += spp
+            for c in range(channels):
+                span = ring.minmax(c, start, stop)
+                if span is None:
+                    self._prev_y[c] = None
+                    continue
+                top, bottom = self._y(span[1], h), self._y(span[0], h)
+                prev = self._prev_y[c]
+                if prev is not None:
+                    # Extend to the previous column's end so steep edges stay joined
+                    top, bottom = min(top, prev), max(bottom, prev)
+                p.setPen(self._pens[c])
+                p.drawLine(x, top, x, bottom)
+                self._prev_y[c] = self._y(ring.data[c][(stop - 1) % ring.capacity], h)
+
+    def _redraw(self):
+        """Rebuild the whole pixmap (new source or new size)."""
+        size = self.size()
+        if size.width() < 1 or size.height() < 1:
+            return
+        if self._pixmap is None or self._pixmap.size() != size:
+            self._pixmap = QtGui.QPixmap(size)
+        self._pixmap.fill(self.BACKGROUND)
+        self._prev_y = [None] * len(self._pens)
+        if self._ring is not None:
+            width = self._pixmap.width()
+            self._next = self._ring.count - width * self._samples_per_column()
+            p = QtGui.QPainter(self._pixmap)
+            self._draw_columns(p, 0, width)
+            p.end()
+        elif self._series is not None:
+            p = QtGui.QPainter(self._pixmap)
+            self._draw_series(p)
+            p.end()
+        self.update()
+
+    def _draw_series(self, p):
+        series, t0, t1 = self._series
+        w, h = self._pixmap.width(), self._pixmap.height()
+        scale = w / (t1 - t0)
+        for s in series:
+            for c in range(min(len(s.mins), len(self._pens))):
+                p.setPen(self._pens[c])
+                mins, maxs = s.mins[c], s.maxs[c]
+                for i in range(len(mins)):
+                    x = int((s.t0 + i * s.step - t0) * scale)
+                    if 0 <= x < w:
+                        p.drawLine(x, self._y(maxs[i], h), x, self._y(mins[i], h))
+
+    def refresh(self):
+        """Draw whatever arrived since the last call; cheap when nothing did.  Call from the UI timer."""
+        if self._ring is None or self._pixmap is None:
+            return
+        spp = self._samples_per_column()
+        columns = int((self._ring.count - self._next) / spp)
+        if columns <= 0:
+            return
+        width = self._pixmap.width()
+        if columns >= width:
+            self._redraw()   # fell a whole window behind: start over at the live edge
+            return
+        # Slide the old trace left and draw only the new columns on the right
+        self._pixmap.scroll(-columns, 0, self._pixmap.rect())
+        p = QtGui.QPainter(self._pixmap)
+        self._draw_columns(p, width - columns, columns)
+        p.end()
+        self.update()
+
+    # ---------- Qt events ----------
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._redraw()
+
+    def paintEvent(self, _event):
+        p = QtGui.QPainter(self)
+        if self._pixmap is not None:
+            p.drawPixmap(0, 0, self._pixmap)
+        if self._ring is None and self._series is None:
+            p.setPen(QtGui.QColor("#7f8c8d"))
+            p.drawText(self.rect(), QtCore.Qt.AlignCenter, "No raw stream")
+        elif self.threshold:
+            y = self._y(self.threshold, self.height())
+            p.setPen(QtGui.QPen(QtGui.QColor("#c0392b"), 1, QtCore.Qt.DashLine))
+            p.drawLine(0, y, self.width(), y)
+        p.end()